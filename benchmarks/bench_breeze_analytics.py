@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+bench_breeze_analytics.py
+-------------------------
+Cost of rebuilding the ``breeze_analytics`` table from the OBS
+``obs_breeze`` table (``CREATE TABLE … AS BREEZE_QUERY``, as ``build``
+does) and how it grows with the number of rows (``--scale`` copies of every
+sale year, each under its own year), against reading ``obs_breeze`` into
+pandas and computing the same columns with ``groupby().rank()``.
+
+Every derived column (seconds, furlongs, seconds per furlong, the four
+``*_n`` / ``*_rank`` / ``*_pct`` fields, price over the year median) is
+first checked against the pandas reference on the real nine years.
+
+Usage
+-----
+python benchmarks/bench_breeze_analytics.py [--scale 1 10 50] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from breeze_analytics import (BREEZE_QUERY, FIELDS, INFERRED_FURLONGS,  # noqa: E402
+                              LONGEST_INFERRED, breeze_analytics)
+from catalog_db import ingest  # noqa: E402
+
+TOLERANCE = 1e-9
+KEY = ["sale", "sale_year", "hip"]
+
+
+def pandas_reference(raw: pd.DataFrame) -> pd.DataFrame:
+    """The analytics columns, one pandas step at a time."""
+    sold = raw[raw.status == "Sold"]
+    medians = sold.groupby(["sale", "sale_year"]).hammer_price.median().rename("median")
+    df = raw[raw.ut_time > 0].copy()
+    whole = np.floor(df.ut_time)
+    df["ut_seconds"] = whole + np.round((df.ut_time - whole) * 10) / 5
+    frac = df.ut_distance.str.split("/", expand=True)
+    stated = pd.to_numeric(frac[0], errors="coerce") * 8 / pd.to_numeric(frac[1], errors="coerce")
+    inferred = np.select([df.ut_seconds < t for t, _ in INFERRED_FURLONGS],
+                         [f for _, f in INFERRED_FURLONGS], LONGEST_INFERRED)
+    df["furlongs"] = stated.fillna(pd.Series(inferred, index=df.index, dtype=float))
+    df["sec_per_furlong"] = df.ut_seconds / df.furlongs
+    for field, cols in FIELDS.items():
+        keys = ["sale", "sale_year", "furlongs"] + cols
+        known = df[cols].notna().all(axis=1) if cols else pd.Series(True, index=df.index)
+        g = df[known].groupby(keys).sec_per_furlong
+        n = g.transform("size")
+        slower = g.rank(method="min", ascending=False) - 1
+        df[f"{field}_n"] = n
+        df[f"{field}_rank"] = g.rank(method="min")
+        df[f"{field}_pct"] = (slower / (n - 1)).where(n > 1)
+    df = df.join(medians, on=["sale", "sale_year"])
+    df["price_to_year_median"] = (df.hammer_price / df["median"]).where(df.status == "Sold")
+    return df.sort_values(KEY).reset_index(drop=True)
+
+
+def scaled(db: str, k: int) -> duckdb.DuckDBPyConnection:
+    """In‑memory ``obs_breeze`` with ``k`` copies of every sale year."""
+    con = duckdb.connect()
+    con.execute(f"ATTACH '{db}' AS src (READ_ONLY)")
+    con.execute("CREATE TABLE obs_breeze AS "
+                "SELECT * REPLACE (sale_year + 100 * CAST(c.range AS INTEGER) AS sale_year) "
+                f"FROM src.obs_breeze, range({k}) c")
+    con.execute("DETACH src")
+    return con
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50],
+                    help="copies of every sale year")
+    ap.add_argument("--repeat", type=int, default=3, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "catalog.duckdb")
+        ingest(db)
+        con = scaled(db, 1)
+        got = breeze_analytics(con)
+        ref = pandas_reference(con.execute("SELECT * FROM obs_breeze").df())
+        if list(got[KEY].itertuples(index=False)) != list(ref[KEY].itertuples(index=False)):
+            sys.exit("✗ breeze_analytics rows differ from the pandas reference")
+        checked = ["ut_seconds", "furlongs", "sec_per_furlong", "price_to_year_median"] + [
+            f"{f}_{c}" for f in FIELDS for c in ("n", "rank", "pct")]
+        for col in checked:
+            a, b = got[col].to_numpy(float), ref[col].to_numpy(float)
+            if not np.allclose(a, b, rtol=0, atol=TOLERANCE, equal_nan=True):
+                sys.exit(f"✗ {col} differs from the pandas reference")
+        print(f"{len(got):,} works, {len(checked)} columns checked\n")
+
+        print(f"{'scale':>6}{'rows':>10}{'pandas':>12}{'duckdb':>12}{'ns/row':>9}")
+        for k in args.scale:
+            con = scaled(db, k)
+            rows = con.execute("SELECT count(*) FROM obs_breeze").fetchone()[0]
+            t_before = min(timeit.repeat(
+                lambda: pandas_reference(con.execute("SELECT * FROM obs_breeze").df()),
+                number=1, repeat=args.repeat))
+            t_after = min(timeit.repeat(
+                lambda: con.execute(f"CREATE OR REPLACE TABLE breeze_analytics AS {BREEZE_QUERY}"),
+                number=1, repeat=args.repeat))
+            print(f"{k:>6}{rows:>10,}{t_before * 1e3:>10.1f}ms{t_after * 1e3:>10.1f}ms"
+                  f"{t_after / rows * 1e9:>9.0f}")
+    print("\n✓ breeze_analytics matches the pandas reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+bench_catalog_db.py
+-------------------
+Cost of getting the Keeneland lots into a notebook, before (``read_csv_auto``
+over every ``lots.csv`` in a fresh in‑memory connection, as
+``seller_buyer_parse.load_lots`` and the notebooks did) and after
+(``catalog_db.lots`` from an up‑to‑date ``catalog.duckdb``), plus the cost
+of a full ingest and of a re‑run with nothing changed.
+
+The database is built in a temporary directory; ``lots()`` is first checked
+against ``load_lots()`` column for column (``filename`` aside, which is now
+relative to the repository root, and ``Price``, now numeric with NULL for
+"---"), and ``parse_buyers`` must write the same table from either.
+
+Usage
+-----
+python benchmarks/bench_catalog_db.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from catalog_db import ingest, lots  # noqa: E402
+from seller_buyer_parse import load_lots, parse_buyers  # noqa: E402
+
+LOTS = str(ROOT / "data" / "keeneland" / "sept-yearling" / "*" / "lots.csv")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=5, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "catalog.duckdb")
+        t0 = time.perf_counter()
+        loaded = ingest(db)
+        t_ingest = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ingest(db)
+        t_noop = time.perf_counter() - t0
+
+        ref = load_lots(LOTS)
+        got = lots(db)
+        cols = [c for c in ref.columns if c != "filename"]
+        expected = ref.assign(Price=pd.to_numeric(ref["Price"], errors="coerce").astype("Int64"))
+        try:
+            pd.testing.assert_frame_equal(got[cols], expected[cols], check_dtype=False)
+        except AssertionError as e:
+            sys.exit(f"✗ lots() differs from load_lots(): {e}")
+        if parse_buyers(got).to_csv(index=False) != parse_buyers(ref).to_csv(index=False):
+            sys.exit("✗ parse_buyers(lots()) differs from parse_buyers(load_lots())")
+        print(f"{len(loaded)} files, {len(got):,} Keeneland lots checked\n")
+
+        t_before = min(timeit.repeat(lambda: load_lots(LOTS), number=1, repeat=args.repeat))
+        t_after = min(timeit.repeat(lambda: lots(db), number=1, repeat=args.repeat))
+
+    print(f"{'full ingest (once)':<24}{t_ingest * 1e3:>9.1f} ms")
+    print(f"{'re-run, nothing changed':<24}{t_noop * 1e3:>9.1f} ms")
+    print(f"{'load: read_csv_auto':<24}{t_before * 1e3:>9.1f} ms")
+    print(f"{'load: catalog.duckdb':<24}{t_after * 1e3:>9.1f} ms   ({t_before / t_after:.1f}x)")
+    print("\n✓ lots() matches load_lots()")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+bench_corr_cube.py
+------------------
+Cost of one redraw of the "Gini vs Median Price Correlation" widget, before
+(filter ``sire_data`` and ``groupby("years_active").apply(... .corr ...)``)
+and after (``CorrCube.corr_by_years_active``), plus the per‑years‑active
+``.corr()`` matrices of ``intro_analysis.ipynb``.
+
+Every ``foal_min`` from 0 to past the largest ``foals_per_year``, with the
+full years‑active range and a narrowed one, is first checked against the
+pandas result, and each matrix against ``DataFrame.corr``.
+
+Usage
+-----
+python benchmarks/bench_corr_cube.py [--repeat 20]
+"""
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from corr_cube import DEFAULT_COLUMNS, CorrCube  # noqa: E402
+
+SIRE_DATA = ROOT / "notebooks" / "sire_data.csv"
+TOLERANCE = 1e-9
+
+
+def widget_corr(sire_data: pd.DataFrame, foal_min: int, years_range) -> pd.DataFrame:
+    """The widget's ``corr_by_year`` as written in ``notebook.py``."""
+    lo, hi = years_range
+    d = sire_data.loc[(sire_data.foals_per_year >= foal_min)
+                      & (sire_data.years_active.between(lo, hi))]
+    if d.empty:                     # apply() on no groups returns a DataFrame
+        return pd.DataFrame({"years_active": [], "corr": []})
+    return (d.groupby("years_active")
+             .apply(lambda g: g["gini_coef"].corr(g["median_price"]))
+             .dropna()
+             .reset_index(name="corr")
+             .sort_values("years_active"))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=20, help="timing runs (best kept)")
+    args = ap.parse_args()
+    warnings.simplefilter("ignore")     # single‑sire groups: .corr of one row
+
+    sire_data = pd.read_csv(SIRE_DATA)
+    cube = CorrCube.build(sire_data)
+    full = (int(sire_data.years_active.min()), int(sire_data.years_active.max()))
+    ranges = [full, (full[0] + 1, full[1] - 1)]
+    checked = 0
+    for foal_min in range(int(sire_data.foals_per_year.max()) + 2):
+        for years_range in ranges:
+            ref = widget_corr(sire_data, foal_min, years_range)
+            got = cube.corr_by_years_active(foal_min, years_range)
+            if list(got.years_active) != list(ref.years_active) \
+                    or not np.allclose(got["corr"], ref["corr"], rtol=0, atol=TOLERANCE):
+                sys.exit(f"✗ cube differs at foal_min={foal_min}, years_active={years_range}")
+            checked += 1
+    for year, m in cube.matrices().items():
+        ref = sire_data.loc[sire_data.years_active == year, DEFAULT_COLUMNS].corr()
+        if not np.allclose(m, ref, rtol=0, atol=TOLERANCE, equal_nan=True):
+            sys.exit(f"✗ correlation matrix differs for years_active={year}")
+    print(f"{len(sire_data)} sires, {checked} threshold combinations checked\n")
+
+    t_build = min(timeit.repeat(lambda: CorrCube.build(sire_data), number=1, repeat=args.repeat))
+    t_before = min(timeit.repeat(lambda: widget_corr(sire_data, 10, full),
+                                 number=1, repeat=args.repeat))
+    t_after = min(timeit.repeat(lambda: cube.corr_by_years_active(10, full),
+                                number=1, repeat=args.repeat))
+    print(f"{'cube build (once)':<20}{t_build * 1e3:>9.2f} ms")
+    print(f"{'redraw: groupby':<20}{t_before * 1e3:>9.2f} ms")
+    print(f"{'redraw: cube':<20}{t_after * 1e3:>9.2f} ms   ({t_before / t_after:.0f}x)")
+    print("\n✓ cube matches groupby/apply correlations and DataFrame.corr matrices")
+
+
+if __name__ == "__main__":
+    main()
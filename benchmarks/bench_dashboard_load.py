@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""
+bench_dashboard_load.py
+-----------------------
+Headless load test of the dashboards: many simulated sessions applying
+random filters, reporting rerun latency (p50 / p95 / p99), peak RSS and
+throughput.  No browser, server or network is involved.
+
+streamlit   ``notebooks/hosted.py`` through Streamlit's ``AppTest``: one
+            AppTest per session, ``--concurrency`` sessions at a time on
+            threads of this process, sharing ``st.cache_resource`` /
+            ``st.cache_data`` as sessions of one Streamlit server do.  A
+            rerun sets every widget (box‑plot data and sires, scatter
+            thresholds and sires, table price / year range, sires,
+            statuses, sort) from ``bench_suite.random_filters`` and calls
+            ``AppTest.run()``.  AppTest swaps process‑global runtime state
+            on every run, so runs are serialised on ``RUN_LOCK``: latency
+            is wait + run, as sessions queue on one busy server process
+            (script runs are CPU‑bound and share one GIL there too), and
+            "service" is the run alone.  The process RSS is sampled every
+            ``RSS_INTERVAL``; "per session" is its rise over the warmed‑up
+            process divided by the concurrent sessions.
+voila       ``notebooks/hosted_v1.ipynb`` the way a voila kernel runs it
+            (what the Docker image serves): one process per session
+            executes the notebook's code cells, then a rerun sets the data
+            toggle, sire selection, foal minimum and years‑active range, whose
+            observers redraw synchronously.  Plotly renders to JSON
+            instead of a browser.  "Per session" is the session
+            process's own peak RSS; kernels run in parallel, so latency
+            is service time.  Skipped when ipywidgets is missing.
+
+Each session's first run (script or notebook start) is reported apart from
+its reruns.  Any script exception fails the run.
+
+Usage
+-----
+python benchmarks/bench_dashboard_load.py [--app streamlit voila] [--sessions 40]
+                                          [--concurrency 8] [--reruns 10]
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import streamlit.logger
+
+streamlit.logger.set_log_level("error")         # bare‑mode "no runtime" warnings
+# worker threads have no ScriptRunContext outside AppTest runs; AppTest
+# resets log levels per run, so silence that logger outright
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+import dashboard_data  # noqa: E402
+from bench_suite import random_filters  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+HOSTED = ROOT / "notebooks" / "hosted.py"
+HOSTED_V1 = ROOT / "notebooks" / "hosted_v1.ipynb"
+TIMEOUT = 120                       # seconds per AppTest run
+RSS_INTERVAL = 0.02
+DATA_TOGGLE = ("Full", "Excluding >95th Percentile")      # by exclude_top
+RUN_LOCK = threading.Lock()
+
+Session = Tuple[float, List[float], List[float], float]
+# first run, rerun latencies, rerun service times (s), peak RSS MB
+
+# ---------------------------------------------------------------------------
+# MEMORY
+# ---------------------------------------------------------------------------
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:                 # not Linux: peak so far is the best we have
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1e6 if sys.platform == "darwin" else kb / 1e3     # bytes on macOS
+
+
+class RssSampler(threading.Thread):
+    """Peak RSS of this process while running."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = rss_mb()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(RSS_INTERVAL):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self) -> float:
+        self._done.set()
+        self.join()
+        return self.peak
+
+# ---------------------------------------------------------------------------
+# STREAMLIT
+# ---------------------------------------------------------------------------
+def set_widgets(at: AppTest, f: dict) -> None:
+    """Put one ``random_filters`` draw into ``hosted.py``'s widgets."""
+    next(r for r in at.radio if r.label.startswith("Data:")).set_value(
+        DATA_TOGGLE[f["exclude_top"]])
+    at.multiselect(key="options1").set_value([str(s) for s in f["box_sires"]])
+    at.number_input(key="foal1").set_value(f["foal_min"])
+    at.slider(key="range1").set_value(f["years_active"])
+    at.multiselect(key="options3").set_value([str(s) for s in f["scatter_sires"]])
+    at.slider(key="range3").set_value(f["price_range"])
+    at.slider(key="range4").set_value(f["year_range"])
+    at.multiselect(key="options2").set_value([str(s) for s in f["sires"]])
+    at.multiselect(key="options4").set_value([str(s) for s in f["statuses"]])
+    at.selectbox(key="sort1").set_value(f["sort_by"] or "Catalogue order")
+    at.radio(key="order1").set_value("Descending" if f["descending"] else "Ascending")
+
+
+def _run(at: AppTest) -> Tuple[float, float]:
+    """(latency incl. waiting for the lock, service time) of one script run."""
+    t0 = time.perf_counter()
+    with RUN_LOCK:
+        t1 = time.perf_counter()
+        at.run()
+    t2 = time.perf_counter()
+    if at.exception:
+        raise RuntimeError(f"hosted.py raised: {at.exception[0].value}")
+    return t2 - t0, t2 - t1
+
+
+def streamlit_session(lk: dashboard_data.Lookups, seed: int, reruns: int) -> Session:
+    rng = np.random.default_rng(seed)
+    at = AppTest.from_file(str(HOSTED), default_timeout=TIMEOUT)
+    first = _run(at)[0]
+    latencies, service = [], []
+    for _ in range(reruns):
+        set_widgets(at, random_filters(lk, rng))
+        latency, busy = _run(at)
+        latencies.append(latency)
+        service.append(busy)
+    return first, latencies, service, 0.0
+
+
+def run_streamlit(args) -> dict:
+    os.chdir(ROOT)                  # hosted.py reads notebooks/markdown/ relative to it
+    t0 = time.perf_counter()
+    _run(AppTest.from_file(str(HOSTED), default_timeout=TIMEOUT))
+    warm_up = time.perf_counter() - t0
+    lk = dashboard_data.lookups()
+    base = rss_mb()
+    sampler = RssSampler()
+    sampler.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        sessions = list(pool.map(lambda s: streamlit_session(lk, s, args.reruns),
+                                 range(args.seed, args.seed + args.sessions)))
+    wall = time.perf_counter() - t0
+    peak = sampler.stop()
+    return {"sessions": sessions, "wall": wall, "warm_up": warm_up, "peak_rss": peak,
+            "per_session_rss": (peak - base) / min(args.concurrency, args.sessions)}
+
+# ---------------------------------------------------------------------------
+# VOILA
+# ---------------------------------------------------------------------------
+def voila_session(task: Tuple[int, int]) -> Session:
+    """One kernel: run the notebook, then drive its widgets (own process)."""
+    import plotly.io as pio
+    pio.renderers.default = "json"
+    seed, reruns = task
+    os.chdir(HOSTED_V1.parent)      # voila starts kernels in the notebook's directory
+    cells = [c["source"] for c in json.loads(HOSTED_V1.read_text())["cells"]
+             if c["cell_type"] == "code"]
+    cells = ["".join(src) if isinstance(src, list) else src for src in cells]
+    ns = {"__name__": "__main__"}
+    rng = np.random.default_rng(seed)
+    latencies = []
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        t0 = time.perf_counter()
+        for src in cells:
+            exec(compile(src, str(HOSTED_V1), "exec"), ns)
+        first = time.perf_counter() - t0
+        lo, hi = ns["yr_min"], ns["yr_max"]
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            ns["data_toggle"].value = DATA_TOGGLE[int(rng.integers(2))]
+            ns["sire_multiselect"].value = tuple(str(s) for s in rng.choice(
+                ns["all_sires"], size=rng.integers(0, 4), replace=False))
+            ns["foal_min"].value = int(rng.integers(1, 20))
+            ns["year_range"].value = sorted(int(v) for v in rng.integers(lo, hi + 1, size=2))
+            latencies.append(time.perf_counter() - t0)
+    return first, latencies, latencies, peak_rss_mb()
+
+
+def run_voila(args) -> dict:
+    tasks = [(s, args.reruns) for s in range(args.seed, args.seed + args.sessions)]
+    ctx = multiprocessing.get_context("spawn")
+    t0 = time.perf_counter()
+    with ctx.Pool(args.concurrency, maxtasksperchild=1) as pool:
+        sessions = pool.map(voila_session, tasks, chunksize=1)
+    wall = time.perf_counter() - t0
+    return {"sessions": sessions, "wall": wall, "warm_up": None,
+            "peak_rss": max(s[3] for s in sessions),
+            "per_session_rss": float(np.mean([s[3] for s in sessions]))}
+
+# ---------------------------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------------------------
+APPS = {"streamlit": run_streamlit, "voila": run_voila}
+
+
+def report(app: str, r: dict) -> None:
+    first = np.array([s[0] for s in r["sessions"]]) * 1e3
+    lat = np.concatenate([s[1] for s in r["sessions"]]) * 1e3
+    service = np.concatenate([s[2] for s in r["sessions"]]) * 1e3
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print(f"{app:<10}{len(first):>9}{len(lat):>8}{np.median(first):>10.0f}"
+          f"{p50:>8.0f}{p95:>8.0f}{p99:>8.0f}{np.median(service):>9.0f}"
+          f"{len(lat) / r['wall']:>10.1f}"
+          f"{r['peak_rss']:>10.0f}{r['per_session_rss']:>12.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--app", nargs="+", choices=sorted(APPS), default=["streamlit", "voila"],
+                    help="dashboards to load")
+    ap.add_argument("--sessions", type=int, default=40, help="simulated sessions per app")
+    ap.add_argument("--concurrency", type=int, default=8, help="sessions running at once")
+    ap.add_argument("--reruns", type=int, default=10, help="filter changes per session")
+    ap.add_argument("--seed", type=int, default=0, help="first session's filter seed")
+    args = ap.parse_args()
+
+    results = {}
+    for app in args.app:
+        if app == "voila" and importlib.util.find_spec("ipywidgets") is None:
+            print("voila     skipped (ipywidgets not installed)")
+            continue
+        print(f"{app}: {args.sessions} sessions × {args.reruns} reruns, "
+              f"{args.concurrency} at a time …", flush=True)
+        results[app] = APPS[app](args)
+        if results[app]["warm_up"] is not None:
+            print(f"  warm‑up (tables, lookups, caches): {results[app]['warm_up'] * 1e3:.0f} ms")
+    if not results:
+        sys.exit("✗ no dashboard could be loaded")
+
+    print(f"\n{'app':<10}{'sessions':>9}{'reruns':>8}{'first ms':>10}{'p50':>8}{'p95':>8}"
+          f"{'p99':>8}{'service':>9}{'reruns/s':>10}{'peak MB':>10}{'MB/session':>12}")
+    for app, r in results.items():
+        report(app, r)
+    print(f"\n✓ {sum(len(r['sessions']) for r in results.values())} sessions, "
+          f"no script exceptions; {os.cpu_count()} CPUs available")
+
+
+if __name__ == "__main__":
+    main()
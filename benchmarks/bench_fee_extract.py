@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+bench_fee_extract.py
+--------------------
+Per‑page CPU cost of the BloodHorse extractors, before (full BeautifulSoup
+tree) and after (fee_extract fast paths), on the saved auctions page
+``notebooks/response.txt``.
+
+The script first checks that both paths return identical results on the
+page (the golden values below), then times each one.
+
+Usage
+-----
+python benchmarks/bench_fee_extract.py [--number 50] [--repeat 5]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from fee_extract import (  # noqa: E402
+    first_stallion_link,
+    first_stallion_link_soup,
+    stud_fee_from_weanlings,
+    stud_fee_from_weanlings_soup,
+)
+
+PAGE = ROOT / "notebooks" / "response.txt"
+GOLDEN_WEANLINGS = {2020: 20000}
+GOLDEN_LINK = ("170525", "accelerate")
+
+CASES = [
+    ("weanlings stud fee", stud_fee_from_weanlings_soup, stud_fee_from_weanlings,
+     GOLDEN_WEANLINGS),
+    ("first stallion link", first_stallion_link_soup, first_stallion_link,
+     GOLDEN_LINK),
+]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--number", type=int, default=50, help="calls per timing run")
+    ap.add_argument("--repeat", type=int, default=5, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    html = PAGE.read_text(encoding="utf-8")
+    print(f"page: {PAGE.name}  {len(html):,} chars\n")
+    print(f"{'extractor':<22}{'soup ms':>10}{'fast ms':>10}{'speed‑up':>10}")
+    for name, before, after, golden in CASES:
+        got_before, got_after = before(html), after(html)
+        if not (got_before == got_after == golden):
+            sys.exit(f"✗ {name}: soup={got_before!r} fast={got_after!r} "
+                     f"golden={golden!r}")
+        t_before = min(timeit.repeat(lambda: before(html), number=args.number,
+                                     repeat=args.repeat)) / args.number
+        t_after = min(timeit.repeat(lambda: after(html), number=args.number,
+                                    repeat=args.repeat)) / args.number
+        print(f"{name:<22}{t_before * 1e3:>10.2f}{t_after * 1e3:>10.3f}"
+              f"{t_before / t_after:>9.0f}x")
+    print("\n✓ fast paths match the BeautifulSoup reference on the golden page")
+
+
+if __name__ == "__main__":
+    main()
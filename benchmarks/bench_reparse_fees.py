@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+bench_reparse_fees.py
+---------------------
+Offline re‑parse throughput of ``reparse_fees.py`` over a page archive, one
+process against a pool.
+
+A synthetic archive is built from the saved auctions page
+``notebooks/response.txt``: ``--sires`` stallions × 20 sales years, each
+page carrying its own Weanlings stud fee and every seventh page without a
+Weanlings section.  For each parser the re‑parse result is first checked
+against the scraper's own harvest function fed the same pages through a
+stub crawler (scrapers whose imports are missing here are skipped).
+
+Usage
+-----
+python benchmarks/bench_reparse_fees.py [--sires 100] [--processes 4]
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from crawl_metrics import CrawlMetrics  # noqa: E402
+from page_archive import PageArchive  # noqa: E402
+from reparse_fees import PARSERS, plan, reparse  # noqa: E402
+from stallion_index import StallionIndex  # noqa: E402
+
+PAGE = ROOT / "notebooks" / "response.txt"
+YEARS = range(2006, 2026)
+URL = "https://www.bloodhorse.com/stallion-register/stallions/{}/{}/auctions/{}"
+HARVESTERS = {                       # parser -> (scraper module, harvest function)
+    "weanlings": ("bloodhorse_stud_fee_scraper", "harvest_sire_fees"),
+    "native": ("bloodhorse_native_scraper", "harvest_fees_for_sire"),
+    "native_2": ("bloodhorse_native_2", "harvest_sire_fees"),
+}
+
+
+class ArchiveCrawler:
+    """Just enough of ``Crawler`` for the harvest functions."""
+
+    def __init__(self, archive: PageArchive):
+        self.archive = archive
+        self.metrics = CrawlMetrics()
+
+    def get_many_text(self, urls):
+        return [(b.decode("utf-8") if (b := self.archive.latest(u)) else None) for u in urls]
+
+
+def build(tmp: str, n_sires: int):
+    html = PAGE.read_text(encoding="utf-8")
+    archive = PageArchive(os.path.join(tmp, "archive"))
+    index = StallionIndex(os.path.join(tmp, "index.sqlite"))
+    sires, raw = [], 0
+    for i in range(n_sires):
+        sire, sid, slug = f"Sire {i}", f"{100000 + i}", f"sire-{i}"
+        index.record(sire, (sid, slug), source="bench")
+        sires.append((sire, sid, slug))
+        for k, year in enumerate(YEARS):
+            page = html.replace("2020 Stud Fee: $20,000",
+                                f"{year - 1} Stud Fee: ${(i + 1) * 1000 + k * 250:,}")
+            if (i + k) % 7 == 0:
+                page = page.replace("Weanlings", "Yearlings")
+            body = page.encode("utf-8")
+            raw += len(body)
+            archive.append(URL.format(sid, slug, year), body)
+    return archive, index, sires, raw
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sires", type=int, default=100, help="stallions in the archive")
+    ap.add_argument("--processes", type=int, default=max(2, os.cpu_count() or 1),
+                    help="pool size to compare against one process")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive, index, sires, raw = build(tmp, args.sires)
+        size = archive.path.stat().st_size
+        n_pages = len(sires) * len(YEARS)
+        print(f"{n_pages:,} pages, {raw / 1e6:.1f} MB raw -> {size / 1e6:.1f} MB archived\n")
+
+        for parser in PARSERS:
+            tasks, unresolved = plan([s for s, _, _ in sires], archive, index, parser)
+            if unresolved:
+                sys.exit(f"✗ {len(unresolved)} sires not resolved from the index")
+            module, func = HARVESTERS[parser]
+            try:
+                harvest = getattr(importlib.import_module(module), func)
+            except ImportError as e:
+                print(f"{parser:<10} parity skipped ({e.name} not installed)")
+            else:
+                crawler = ArchiveCrawler(archive)
+                got = dict(reparse(tasks[:10]))
+                for sire, sid, slug in sires[:10]:
+                    if got[sire] != harvest(sid, slug, crawler, YEARS):
+                        sys.exit(f"✗ {parser}: re‑parse differs from {module}.{func} for {sire}")
+
+            t0 = time.perf_counter()
+            serial = reparse(tasks, 1)
+            t_serial = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            pooled = reparse(tasks, args.processes)
+            t_pool = time.perf_counter() - t0
+            if pooled != serial:
+                sys.exit(f"✗ {parser}: pooled re‑parse differs from one process")
+            rows = sum(len(p) for _, p in serial)
+            print(f"{parser:<10}{rows:>7,} rows   1 process {n_pages / t_serial:>7,.0f} pages/s"
+                  f"   {args.processes} processes {n_pages / t_pool:>7,.0f} pages/s")
+        archive.close()
+        index.close()
+    print(f"\n✓ re‑parse matches the harvest functions; {os.cpu_count()} CPUs available")
+
+
+if __name__ == "__main__":
+    main()
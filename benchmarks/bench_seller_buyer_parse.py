@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+bench_seller_buyer_parse.py
+---------------------------
+Cost of building the seller and buyer tables from the Keeneland September
+catalogues, before (row‑wise ``iterrows`` loops) and after (column‑wise
+``seller_buyer_parse`` parsers).
+
+The script first checks that both paths write byte‑identical CSVs and that
+they match the committed ``notebooks/sellers.csv`` / ``buyers.csv`` (compared
+on (sale_year, Hip) order, since those were written in glob order), then
+times each one.
+
+Usage
+-----
+python benchmarks/bench_seller_buyer_parse.py [--repeat 3]
+"""
+import argparse
+import io
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from seller_buyer_parse import (  # noqa: E402
+    load_lots,
+    parse_buyers,
+    parse_buyers_loop,
+    parse_sellers,
+    parse_sellers_loop,
+)
+
+LOTS = str(ROOT / "data" / "keeneland" / "sept-yearling" / "*" / "lots.csv")
+
+CASES = [
+    ("sellers", parse_sellers_loop, parse_sellers, ROOT / "notebooks" / "sellers.csv"),
+    ("buyers", parse_buyers_loop, parse_buyers, ROOT / "notebooks" / "buyers.csv"),
+]
+
+
+def _read(csv) -> pd.DataFrame:
+    df = pd.read_csv(csv, dtype=str, keep_default_na=False)
+    return df.sort_values(["sale_year", "Hip"]).reset_index(drop=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=3, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    df = load_lots(LOTS)
+    print(f"lots: {len(df):,} rows from {df['sale_year'].nunique()} sales\n")
+    print(f"{'table':<10}{'loop ms':>10}{'fast ms':>10}{'speed‑up':>10}")
+    for name, before, after, golden in CASES:
+        csv_before = before(df).to_csv(index=False)
+        csv_after = after(df).to_csv(index=False)
+        if csv_before != csv_after:
+            sys.exit(f"✗ {name}: vectorised output differs from the iterrows loop")
+        if not _read(io.StringIO(csv_after)).equals(_read(golden)):
+            sys.exit(f"✗ {name}: output differs from {golden.relative_to(ROOT)}")
+        t_before = min(timeit.repeat(lambda: before(df), number=1, repeat=args.repeat))
+        t_after = min(timeit.repeat(lambda: after(df), number=1, repeat=args.repeat))
+        print(f"{name:<10}{t_before * 1e3:>10.0f}{t_after * 1e3:>10.1f}"
+              f"{t_before / t_after:>9.0f}x")
+    print("\n✓ vectorised parsers match the loops and the committed CSVs")
+
+
+if __name__ == "__main__":
+    main()
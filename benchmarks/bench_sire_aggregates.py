@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+bench_sire_aggregates.py
+------------------------
+Cost of bringing ``sire_data`` up to date when a new sale year arrives,
+before (re‑read every ``lots.csv`` and run the notebook's full
+``groupby('Sire').agg``) and after (open the ``SireAggregateStore`` and merge
+the new year's ``lots.csv`` only).  The store's own share – folding the
+year into the per‑sire state and deriving the touched rows, with the file
+already read – is reported on its own line.
+
+The store is seeded with every Keeneland September sale but the last, the
+last year is merged in, and the finished table must be byte‑identical to the
+committed ``notebooks/sire_data.csv`` before anything is timed.
+
+Usage
+-----
+python benchmarks/bench_sire_aggregates.py [--repeat 5]
+"""
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from seller_buyer_parse import load_lots  # noqa: E402
+from sire_aggregates import SireAggregateStore, sire_rows, sold_lots  # noqa: E402
+
+LOTS = str(ROOT / "data" / "keeneland" / "sept-yearling" / "*" / "lots.csv")
+GOLDEN = ROOT / "notebooks" / "sire_data.csv"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=5, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    lots = load_lots(LOTS)
+    last = int(lots["sale_year"].max())
+    new_file = LOTS.replace("*", str(last))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = SireAggregateStore(tmp)
+        for _, year in lots[lots["sale_year"] < last].groupby("sale_year"):
+            seeded.add_lots(year)
+        seeded.save()
+
+        store = SireAggregateStore(tmp)           # round‑trip through Parquet
+        touched = store.add_lots(load_lots(new_file))
+        if store.sire_data().to_csv() != GOLDEN.read_text():
+            sys.exit(f"✗ incremental sire_data differs from {GOLDEN.relative_to(ROOT)}")
+        print(f"sale year {last}: {int((lots['sale_year'] == last).sum()):,} lots, "
+              f"{len(touched)} of {len(store.sire_data())} sires touched\n")
+
+        def full():
+            sire_rows(sold_lots(load_lots(LOTS)))
+
+        def incremental():
+            s = SireAggregateStore(tmp)
+            s.add_lots(load_lots(new_file))
+            s.sire_data()
+
+        new_lots = load_lots(new_file)
+
+        def fold_only():
+            s = SireAggregateStore(tmp)
+            s.add_lots(new_lots)
+            s.sire_data()
+
+        t_full = min(timeit.repeat(full, number=1, repeat=args.repeat))
+        t_incr = min(timeit.repeat(incremental, number=1, repeat=args.repeat))
+        t_fold = min(timeit.repeat(fold_only, number=1, repeat=args.repeat))
+    print(f"{'full rebuild':<16}{t_full * 1e3:>9.1f} ms")
+    print(f"{'incremental':<16}{t_incr * 1e3:>9.1f} ms   ({t_full / t_incr:.1f}x)")
+    print(f"{'  store only':<16}{t_fold * 1e3:>9.1f} ms   (file read excluded)")
+    print("\n✓ incremental store matches the committed sire_data.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+bench_sire_panel.py
+-------------------
+Cost of the per (Sire, sale_year) metrics, before (the notebook's style: one
+``groupby().agg`` per cell with the Gini callable, a merge against
+``first_crop``, a merge per lag and a reindexed ``rolling`` per window) and
+after (one ``sire_panel.sire_panel`` pass).
+
+Every panel column is first checked against the pandas reference.
+
+Usage
+-----
+python benchmarks/bench_sire_panel.py [--repeat 5]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from gini import gini_coefficient  # noqa: E402
+from sire_panel import LAG_METRICS, sire_panel  # noqa: E402
+
+ONLY_SOLD = ROOT / "notebooks" / "only_sold.csv"
+LAGS, WINDOWS = (1, 2), (2, 3)
+
+
+def reference(sold: pd.DataFrame) -> pd.DataFrame:
+    """The same panel built from pandas groupby / merge / rolling."""
+    p = (sold.groupby(["Sire", "sale_year"])["Price"]
+         .agg(foal_count="count", total_sales="sum", median_price="median",
+              gini=gini_coefficient)
+         .reset_index())
+    p["avg_price"] = p.total_sales / p.foal_count
+    first_crop = sold.groupby("Sire")["sale_year"].min().rename("first_year")
+    p = p.merge(first_crop, on="Sire")
+    p["years_since_first_crop"] = p.sale_year - p.first_year
+    p["crop_number"] = p.groupby("Sire").cumcount() + 1
+    p["cum_foals"] = p.groupby("Sire")["foal_count"].cumsum()
+    for k in LAGS:
+        prev = p[["Sire", "sale_year"] + LAG_METRICS].assign(sale_year=p.sale_year + k)
+        p = p.merge(prev, on=["Sire", "sale_year"], how="left", suffixes=("", f"_lag{k}"))
+    years = range(p.sale_year.min(), p.sale_year.max() + 1)
+    full = (p.set_index(["Sire", "sale_year"])[["foal_count", "total_sales", "gini"]]
+            .reindex(pd.MultiIndex.from_product([p.Sire.unique(), years],
+                                                names=["Sire", "sale_year"])))
+    for w in WINDOWS:
+        roll = full.groupby(level="Sire").rolling(w, min_periods=1)
+        sums = roll.sum().droplevel(0)
+        gini_mean = roll["gini"].mean().droplevel(0)
+        at = pd.MultiIndex.from_frame(p[["Sire", "sale_year"]])
+        p[f"foals_{w}y"] = sums["foal_count"].reindex(at).to_numpy()
+        p[f"avg_price_{w}y"] = (sums["total_sales"] / sums["foal_count"]).reindex(at).to_numpy()
+        p[f"gini_mean_{w}y"] = gini_mean.reindex(at).to_numpy()
+    return p
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=5, help="timing runs (best kept)")
+    args = ap.parse_args()
+
+    sold = pd.read_csv(ONLY_SOLD, usecols=["Sire", "sale_year", "Price"])
+    panel = sire_panel(sold, LAGS, WINDOWS)
+    ref = reference(sold)
+    if list(panel["Sire"].astype(str)) != list(ref["Sire"]) \
+            or list(panel["sale_year"]) != list(ref["sale_year"]):
+        sys.exit("✗ panel rows differ from the groupby reference")
+    for col in panel.columns[2:]:
+        if not np.allclose(panel[col], ref[col], rtol=1e-12, equal_nan=True):
+            sys.exit(f"✗ panel column {col} differs from the groupby reference")
+    print(f"{len(sold):,} sold lots -> {len(panel):,} (Sire, sale_year) rows, "
+          f"{len(panel.columns)} columns\n")
+
+    t_before = min(timeit.repeat(lambda: reference(sold), number=1, repeat=args.repeat))
+    t_after = min(timeit.repeat(lambda: sire_panel(sold, LAGS, WINDOWS),
+                                number=1, repeat=args.repeat))
+    print(f"{'groupby/merge':<16}{t_before * 1e3:>9.1f} ms")
+    print(f"{'sire_panel':<16}{t_after * 1e3:>9.1f} ms   ({t_before / t_after:.1f}x)")
+    print("\n✓ sire_panel matches the groupby / merge / rolling reference")
+
+
+if __name__ == "__main__":
+    main()
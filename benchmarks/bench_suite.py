@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""
+bench_suite.py
+--------------
+Scaling curves for the ETL and dashboard paths over synthetic catalogues
+(``synthetic_catalog.py``) ``--scale`` times the size of ``data/``, with a
+saved baseline to catch regressions.
+
+Cases, each timed at every scale (best of ``--repeat``):
+
+    ingest: load_lots         read_csv_auto over every Keeneland lots.csv
+    ingest: catalog_db        full ``catalog_db.ingest`` (Keeneland + OBS)
+    parse: sellers / buyers   ``seller_buyer_parse.parse_sellers`` / ``parse_buyers``
+    sire_data                 ``sire_aggregates.sire_rows`` (Gini via ``gini_by``)
+    dashboard: load           ``dashboard_data`` tables, lookups, table query
+    dashboard: cold rerun     ``hosted.py``'s box plot, scatter and table page
+                              for ``--sessions`` random filter sets (cache misses)
+    dashboard: warm rerun     the same filter sets again (cache hits)
+    stud-fee pages            ``fee_extract.stud_fee_from_weanlings`` over one
+                              auctions page (``notebooks/response.txt``) per
+                              sold (Sire, sale year)
+
+At scale 1 the synthetic Keeneland lots must equal ``load_lots()`` and
+``sire_data`` the committed ``notebooks/sire_data.csv`` before anything is
+timed.  After the per‑scale table, each case's growth exponent is printed
+(log time / log rows between the smallest and largest scale; ~1 is linear).
+
+``--save`` writes the timings as JSON; ``--baseline`` compares against such
+a file (same case and scale) and fails when a case is more than
+``--tolerance`` slower.  Rows grow ~30,000 Keeneland lots per scale unit, so
+1000× needs a machine with tens of GB of memory.
+
+Usage
+-----
+python benchmarks/bench_suite.py [--scale 1 10 100] [--repeat 3] [--save bench.json]
+python benchmarks/bench_suite.py --baseline bench.json [--tolerance 0.25]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.logger
+
+streamlit.logger.set_log_level("error")         # bare‑mode "no runtime" warnings
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+import dashboard_data  # noqa: E402
+import data_store  # noqa: E402
+from catalog_db import ingest  # noqa: E402
+from fee_extract import stud_fee_from_weanlings  # noqa: E402
+from sale_status import classify_status  # noqa: E402
+from seller_buyer_parse import load_lots, parse_buyers, parse_sellers  # noqa: E402
+from sire_aggregates import sire_rows, sold_lots  # noqa: E402
+from synthetic_catalog import scale_catalog  # noqa: E402
+from table_query import COLUMNS  # noqa: E402
+
+LOTS = "data/keeneland/sept-yearling/*/lots.csv"
+PAGE = ROOT / "notebooks" / "response.txt"
+GOLDEN_SIRE_DATA = ROOT / "notebooks" / "sire_data.csv"
+PAGE_VARIANTS = 16
+
+Timings = Dict[str, Tuple[int, float]]          # case -> (rows, seconds)
+
+
+def best(fn: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def random_filters(lk: dashboard_data.Lookups, rng: np.random.Generator) -> dict:
+    """One session's worth of ``hosted.py`` widget values."""
+    def pick(values, most):
+        return list(rng.choice(values, size=rng.integers(0, most + 1), replace=False))
+
+    def span(lo, hi):
+        a, b = sorted(int(v) for v in rng.integers(lo, hi + 1, size=2))
+        return a, b
+
+    return {
+        "exclude_top": bool(rng.integers(2)),
+        "box_sires": pick(lk.box_sires, 3),
+        "foal_min": int(rng.integers(1, 20)),
+        "years_active": span(*lk.years_active_bounds),
+        "scatter_sires": pick(lk.scatter_sires, 3),
+        "sires": pick(lk.table_sires, 3),
+        "price_range": span(*lk.price_bounds),
+        "year_range": span(*lk.year_bounds),
+        "statuses": pick(lk.statuses, 2),
+        "sort_by": [None, *COLUMNS][rng.integers(len(COLUMNS) + 1)],
+        "descending": bool(rng.integers(2)),
+    }
+
+
+def rerun(f: dict) -> None:
+    """The cached calls ``hosted.py`` makes on one script run."""
+    dashboard_data.box_figure(f["exclude_top"], f["box_sires"])
+    dashboard_data.scatter_frame(f["foal_min"], f["years_active"], f["scatter_sires"])
+    dashboard_data.table_page(f["sires"], f["price_range"], f["year_range"], f["statuses"],
+                              sort_by=f["sort_by"], descending=f["descending"])
+
+
+def dashboard_store(lots: pd.DataFrame, sire_data: pd.DataFrame, tmp: Path) -> Path:
+    """Typed Parquet tables for ``lots`` the way ``data_store`` builds them."""
+    data_dir, store_dir = tmp / "csv", tmp / "parquet"
+    data_dir.mkdir()
+    all_data = lots.assign(Price=pd.to_numeric(lots["Price"], errors="coerce"),
+                           status=classify_status(lots["Purchaser"]))
+    all_data.to_csv(data_dir / "all_data.csv")
+    all_data[all_data.status == "Sold"].to_csv(data_dir / "only_sold.csv")
+    sire_data.to_csv(data_dir / "sire_data.csv")
+    data_store.build_store(data_dir, store_dir)
+    return store_dir
+
+
+def point_dashboard_at(store_dir: Path) -> None:
+    """Serve ``dashboard_data`` from ``store_dir`` with empty caches."""
+    dashboard_data.load_table = partial(data_store.load_table, store_dir=store_dir)
+    dashboard_data.table_path = partial(data_store.table_path, store_dir=store_dir)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def fee_pages() -> List[str]:
+    html = PAGE.read_text(encoding="utf-8")
+    return [html.replace("2020 Stud Fee: $20,000", f"2020 Stud Fee: ${(i + 1) * 5000:,}")
+            for i in range(PAGE_VARIANTS)]
+
+
+def run_scale(k: int, tmp: Path, args) -> Timings:
+    root = tmp / f"x{k}"
+    scale_catalog(k, root, seed=args.seed)
+    pattern = str(root / LOTS)
+    out: Timings = {}
+
+    lots = load_lots(pattern)
+    out["ingest: load_lots"] = len(lots), best(lambda: load_lots(pattern), args.repeat)
+    db = root / "catalog.duckdb"
+    t0 = time.perf_counter()
+    ingest(db, root=root)
+    t_ingest = time.perf_counter() - t0
+    with duckdb.connect(str(db), read_only=True) as con:
+        n_obs = con.execute("SELECT count(*) FROM obs_breeze").fetchone()[0]
+    out["ingest: catalog_db"] = len(lots) + n_obs, min(
+        [t_ingest] + timeit.repeat(lambda: ingest(db, root=root, force=True),
+                                   number=1, repeat=args.repeat - 1))
+
+    out["parse: sellers"] = len(lots), best(lambda: parse_sellers(lots), args.repeat)
+    out["parse: buyers"] = len(lots), best(lambda: parse_buyers(lots), args.repeat)
+
+    sold = sold_lots(lots)
+    sire_data = sire_rows(sold)
+    if k == 1:
+        ref = load_lots(str(ROOT / LOTS))
+        cols = [c for c in ref.columns if c != "filename"]
+        if not lots[cols].equals(ref[cols]):
+            sys.exit("✗ the 1× synthetic catalogue differs from data/")
+        if sire_data.to_csv() != GOLDEN_SIRE_DATA.read_text():
+            sys.exit(f"✗ 1× sire_data differs from {GOLDEN_SIRE_DATA.relative_to(ROOT)}")
+    out["sire_data"] = len(sold), best(lambda: sire_rows(sold), args.repeat)
+
+    point_dashboard_at(dashboard_store(lots, sire_data, root))
+    t0 = time.perf_counter()
+    lk = dashboard_data.lookups()
+    dashboard_data.table_query()
+    out["dashboard: load"] = len(lots), time.perf_counter() - t0
+    rng = np.random.default_rng(args.seed)
+    sessions = [random_filters(lk, rng) for _ in range(args.sessions)]
+    for label in ("cold", "warm"):
+        t0 = time.perf_counter()
+        for f in sessions:
+            rerun(f)
+        out[f"dashboard: {label} rerun"] = len(lots), (time.perf_counter() - t0) / len(sessions)
+
+    pages = fee_pages()
+    n_pages = len(sold[["Sire", "sale_year"]].drop_duplicates())
+    out["stud-fee pages"] = n_pages, best(
+        lambda: [stud_fee_from_weanlings(pages[i % PAGE_VARIANTS]) for i in range(n_pages)],
+        args.repeat)
+    return out
+
+
+def report(results: Dict[int, Timings]) -> None:
+    scales = sorted(results)
+    cases = list(results[scales[0]])
+    print(f"{'case':<24}" + "".join(f"{f'{k}×':>12}" for k in scales) + f"{'exponent':>10}")
+    for case in cases:
+        cells = []
+        for k in scales:
+            t = results[k][case][1]
+            cells.append(f"{t * 1e3:>10.1f}ms" if t < 10 else f"{t:>11.1f}s")
+        (n0, t0), (n1, t1) = results[scales[0]][case], results[scales[-1]][case]
+        slope = f"{math.log(t1 / t0) / math.log(n1 / n0):>10.2f}" if n1 > n0 else f"{'':>10}"
+        print(f"{case:<24}" + "".join(cells) + slope)
+    print(f"{'rows (Keeneland lots)':<24}"
+          + "".join(f"{results[k]['ingest: load_lots'][0]:>12,}" for k in scales))
+
+
+def regressions(results: Dict[int, Timings], baseline: dict, tolerance: float) -> List[str]:
+    slower = []
+    for k, timings in results.items():
+        for case, (_, t) in timings.items():
+            ref = baseline["results"].get(case, {}).get(str(k))
+            if ref is not None and t > ref * (1 + tolerance):
+                slower.append(f"{case} at {k}×: {t * 1e3:.1f} ms vs {ref * 1e3:.1f} ms")
+    return slower
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100],
+                    help="catalogue multiples to run")
+    ap.add_argument("--repeat", type=int, default=3, help="timing runs (best kept)")
+    ap.add_argument("--sessions", type=int, default=50,
+                    help="random dashboard filter sets per scale")
+    ap.add_argument("--seed", type=int, default=0, help="synthetic data / filter seed")
+    ap.add_argument("--save", help="write the timings to this JSON file")
+    ap.add_argument("--baseline", help="JSON from an earlier --save to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed slow‑down against the baseline (default %(default)s)")
+    args = ap.parse_args()
+
+    results: Dict[int, Timings] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for k in sorted(set(args.scale)):
+            print(f"scale {k}× …", flush=True)
+            results[k] = run_scale(k, Path(tmp), args)
+    print()
+    report(results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({
+            "machine": {"python": platform.python_version(), "cpus": os.cpu_count(),
+                        "pandas": pd.__version__, "duckdb": duckdb.__version__},
+            "results": {case: {str(k): results[k][case][1] for k in results}
+                        for case in results[min(results)]},
+        }, indent=1) + "\n")
+        print(f"\ntimings -> {args.save}")
+    if args.baseline:
+        slower = regressions(results, json.loads(Path(args.baseline).read_text()),
+                             args.tolerance)
+        if slower:
+            sys.exit("✗ slower than the baseline:\n  " + "\n  ".join(slower))
+        print(f"\n✓ no case more than {args.tolerance:.0%} slower than {args.baseline}")
+    if 1 in results:
+        print("\n✓ 1× synthetic catalogue reproduces data/ and sire_data.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+synthetic_catalog.py
+--------------------
+Scale the real Keeneland September and OBS April catalogues under ``data/``
+by a factor ``k`` into a ``data/`` tree of the same layout, for the
+benchmark suite (``bench_suite.py``).
+
+Every sale year is written ``k`` times over, copy by copy, so the mix of
+sold / RNA / out lots, consignors, buyers and sale sessions is the real
+one.  Copy 0 is the real catalogue unchanged (``k = 1`` loads as exactly
+the tables of ``data/``); copy ``j > 0`` changes
+
+    Hip         j × 10000 + the real hip, letter suffix kept (unique within
+                the year; "changed to RNA" notes keep pointing at copy 0)
+    Sire        split into ``round(k ** SIRE_GROWTH)`` variants
+                ("Tapit", "Tapit #1", …, chosen by ``j``), so the number of
+                sires and the foals per sire both grow like √k and the
+                long‑tailed sire shares stay the same shape
+    Price       sold prices × lognormal(0, PRICE_SIGMA), rounded to the
+                $1,000 bid increment (RNA / out values kept as they are)
+
+Generation is seeded and streams one copy at a time.
+
+Usage
+-----
+python benchmarks/synthetic_catalog.py --scale 10 --out /tmp/catalog_x10
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import io
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "notebooks"))
+
+from catalog_db import OBS_ALIASES, SOURCES, _obs_key  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+HIP_STRIDE = 10000                  # copy j's hips start at j × HIP_STRIDE
+SIRE_GROWTH = 0.5                   # distinct sires ∝ k ** SIRE_GROWTH
+PRICE_SIGMA = 0.15                  # lognormal noise on copied sold prices
+BID_INCREMENT = 1000
+PLAIN_INT_RE = re.compile(r"-?\d+")
+HIP_RE = re.compile(r"\s*(\d+)(.*)")         # "0199A": supplemental entries
+
+# ---------------------------------------------------------------------------
+# COPIES
+# ---------------------------------------------------------------------------
+def sire_variants(k: int) -> int:
+    return max(1, round(k ** SIRE_GROWTH))
+
+
+def _sire(name: str, variant: int) -> str:
+    return f"{name} #{variant}" if variant and name.strip() else name
+
+
+def _hip(hip: str, copy: int) -> str:
+    digits, suffix = HIP_RE.match(hip).groups()
+    return str(copy * HIP_STRIDE + int(digits)).zfill(len(digits)) + suffix
+
+
+def _prices(values: List[str], rng: np.random.Generator) -> List[str]:
+    """Noisy copies of the positive plain‑integer prices; others unchanged."""
+    noise = rng.lognormal(0.0, PRICE_SIGMA, len(values))
+    out = []
+    for v, f in zip(values, noise):
+        s = v.strip()
+        if PLAIN_INT_RE.fullmatch(s) and int(s) != 0:
+            p = int(s)
+            new = max(BID_INCREMENT, round(abs(p) * f / BID_INCREMENT) * BID_INCREMENT)
+            out.append(str(new if p > 0 else -new))
+        else:
+            out.append(v)
+    return out
+
+
+def _newline(text: str) -> str:
+    if "\r\n" in text:
+        return "\r\n"
+    return "\r" if "\r" in text else "\n"
+
+
+def scale_file(src: Path, dst: Path, k: int, rng: np.random.Generator,
+               header_at: int, hip: int, sire: int, price: int) -> int:
+    """Write ``k`` copies of the lot rows of ``src`` to ``dst``; lots written."""
+    text = src.read_text(encoding="utf-8", errors="replace")
+    rows = list(csv.reader(io.StringIO(text, newline="")))
+    lots = [i for i, r in enumerate(rows)
+            if i > header_at and r and r[0].strip().isdigit()]
+    first, last = (lots[0], lots[-1]) if lots else (len(rows), len(rows) - 1)
+    n_variants = sire_variants(k)
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with open(dst, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator=_newline(text))
+        w.writerows(rows[:last + 1])                # title rows, header, copy 0
+        block = rows[first:last + 1]
+        for j in range(1, k):
+            variant = j % n_variants
+            prices = _prices([r[price] if len(r) > price else "" for r in block], rng)
+            for r, p in zip(block, prices):
+                r = list(r)
+                if r and r[0].strip().isdigit():
+                    r[hip] = _hip(r[hip], j)
+                    if len(r) > sire:
+                        r[sire] = _sire(r[sire], variant)
+                    if len(r) > price:
+                        r[price] = p
+                w.writerow(r)
+        w.writerows(rows[last + 1:])                # trailer notes
+    return k * sum(1 for r in rows[first:last + 1] if r and r[0].strip().isdigit())
+
+
+def _obs_layout(path: Path):
+    """(header row, hip, sire, price column) of one OBS ``breeze.csv``."""
+    rows = csv.reader(io.StringIO(path.read_text(encoding="utf-8", errors="replace")))
+    for at, r in enumerate(rows):
+        keys = [_obs_key(h) for h in r]
+        if keys and keys[0] in ("hip", "hip_number"):
+            canon = [OBS_ALIASES.get(h) for h in keys]
+            return at, 0, canon.index("sire"), canon.index("price")
+    raise ValueError(f"No hip header row in {path}")
+
+
+def scale_catalog(k: int, out_root, source_root=ROOT, seed: int = 0) -> Dict[str, int]:
+    """Write the ``k``× catalogues under ``out_root/data``; lots per sale."""
+    if k < 1:
+        raise ValueError("scale must be >= 1")
+    out_root, source_root = Path(out_root), Path(source_root)
+    rng = np.random.default_rng(seed)
+    written: Dict[str, int] = {}
+    for sale, (_, pattern) in SOURCES.items():
+        written[sale] = 0
+        for name in sorted(glob.glob(str(source_root / pattern))):
+            src = Path(name)
+            dst = out_root / src.relative_to(source_root)
+            if src.name == "lots.csv":
+                header = next(csv.reader(io.StringIO(
+                    src.read_text(encoding="utf-8", errors="replace"))))
+                layout = 0, header.index("Hip"), header.index("Sire"), header.index("Price")
+            else:
+                layout = _obs_layout(src)
+            written[sale] += scale_file(src, dst, k, rng, *layout)
+    return written
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write a k× synthetic copy of the sale catalogues")
+    ap.add_argument("--scale", type=int, required=True, help="copies of every sale year")
+    ap.add_argument("--out", required=True, help="directory to write data/ under")
+    ap.add_argument("--seed", type=int, default=0, help="price noise seed")
+    args = ap.parse_args()
+
+    for sale, n in scale_catalog(args.scale, args.out, seed=args.seed).items():
+        print(f"✓ {sale:<24}{n:>12,} lots")
+
+
+if __name__ == "__main__":
+    main()
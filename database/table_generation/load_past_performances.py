@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+load_past_performances.py
+-------------------------
+Batch loader for a directory of ``SIMD<YYYYMMDD><TRACK>_USA.xml`` chart
+files.  Each file is parsed by ``parse_past_performances.write_parquet`` in a
+worker process and written to a Hive‑style partition:
+
+    <out_dir>/past_performances/track=AQU/date=2023-01-01/part-0.parquet
+    <out_dir>/fractions/track=AQU/date=2023-01-01/part-0.parquet
+    <out_dir>/points_of_call/track=AQU/date=2023-01-01/part-0.parquet
+
+pp_id assignment
+----------------
+Workers never share a counter.  Every file owns a fixed ID range derived from
+its name alone:
+
+    file_key = days_since_1970(date) * 36**3 + base36(track)
+    pp_id    = file_key * PP_ID_STRIDE + n        (n = 1, 2, … in the file)
+
+so IDs are globally unique, identical for any worker count or file order,
+and stay stable when new files are added to the directory later.  A file
+with ``PP_ID_STRIDE`` or more past performances fails before anything of it
+is written, and two files for the same (track, date) – found in different
+subdirectories – are rejected up front, since they would share a partition
+and an ID range.
+
+Usage
+-----
+python load_past_performances.py /mnt/data/charts --out-dir pp_parquet --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from parse_past_performances import DEFAULT_BATCH_SIZE, TABLES, write_parquet
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+FILE_RE = re.compile(r"^SIMD(\d{8})([A-Z0-9]{1,3})_USA\.xml$", re.I)
+PP_ID_STRIDE = 1 << 20              # max past performances per file
+TRACK_SPACE = 36 ** 3               # 1‑3 character track codes, base 36
+EPOCH = dt.date(1970, 1, 1)
+
+# ---------------------------------------------------------------------------
+# FILE NAMING / ID RANGES
+# ---------------------------------------------------------------------------
+def parse_file_name(path) -> Tuple[str, dt.date]:
+    """``SIMD20230101AQU_USA.xml`` -> ("AQU", date(2023, 1, 1))."""
+    m = FILE_RE.match(Path(path).name)
+    if not m:
+        raise ValueError(f"Not a SIMD<YYYYMMDD><TRACK>_USA.xml file: {path}")
+    date = dt.datetime.strptime(m.group(1), "%Y%m%d").date()
+    return m.group(2).upper(), date
+
+
+def pp_id_base(track: str, date: dt.date) -> int:
+    """First pp_id minus one for the file of ``track`` on ``date``."""
+    file_key = (date - EPOCH).days * TRACK_SPACE + int(track, 36)
+    return file_key * PP_ID_STRIDE
+
+
+def find_files(xml_dir) -> List[Path]:
+    """All chart files under ``xml_dir``, sorted by name; one per (track, date)."""
+    files = sorted(p for p in Path(xml_dir).rglob("SIMD*.xml") if FILE_RE.match(p.name))
+    seen: Dict[Tuple[str, dt.date], Path] = {}
+    duplicates = []
+    for path in files:
+        key = parse_file_name(path)
+        if key in seen:
+            duplicates.append(f"{seen[key]} and {path}")
+        seen.setdefault(key, path)
+    if duplicates:
+        raise ValueError("Several chart files for the same track and date: "
+                         + "; ".join(duplicates))
+    return files
+
+# ---------------------------------------------------------------------------
+# WORKER
+# ---------------------------------------------------------------------------
+def load_file(job: Tuple[str, str, int]) -> Dict[str, object]:
+    """Parse one chart file into its partition.  Runs in a worker process."""
+    xml_path, out_dir, batch_size = job
+    track, date = parse_file_name(xml_path)
+    base = pp_id_base(track, date)
+    counts = write_parquet(xml_path, out_dir, batch_size,
+                           pp_id_start=base + 1,
+                           partition=f"track={track}/date={date.isoformat()}",
+                           max_past_performances=PP_ID_STRIDE - 1)
+    return {"file": Path(xml_path).name, "track": track, "date": date,
+            "pp_id_min": base + 1, **counts}
+
+
+def load_directory(xml_dir, out_dir, workers: int = 0,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """
+    Load every chart file under ``xml_dir`` with a process pool.
+    Returns one summary row per file (same order for any ``workers``).
+    """
+    files = find_files(xml_dir)
+    jobs = [(str(f), str(out_dir), batch_size) for f in files]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        rows = [load_file(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(load_file, jobs, chunksize=1))
+    return pd.DataFrame(rows, columns=["file", "track", "date", "pp_id_min",
+                                       *TABLES])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load a directory of SIMD*.xml files")
+    ap.add_argument("xml_dir", help="Directory containing SIMD*_USA.xml files")
+    ap.add_argument("--out-dir", required=True, help="Root of the partitioned output")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="Worker processes (default: one per core)")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                    help="Rows per Parquet row group (default %(default)s)")
+    args = ap.parse_args()
+
+    summary = load_directory(args.xml_dir, args.out_dir, args.workers, args.batch_size)
+    print(f"✓ Loaded {len(summary)} files into {args.out_dir}")
+    for name in TABLES:
+        print(f"  • {int(summary[name].sum())} {name.replace('_', ' ')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+parse_past_performances.py
+--------------------------
+Streaming reader for Equibase ``SIMD*.xml`` past‑performance chart files.
+
+The original notebook version called ``ET.parse`` on the whole file,
+collected every row as a dict and sorted the fraction / point‑of‑call rows
+afterwards to number them, so memory grew with file size.  This module:
+
+    • walks the file with ``ET.iterparse`` and handles each ``Race/Starters``
+      element as soon as it closes, then detaches it from the tree
+    • numbers fractions / points of call while it reads them (they arrive in
+      document order inside one past performance, which is exactly what the
+      old ``add_seq`` sort produced)
+    • emits fixed‑schema columnar batches of ``batch_size`` rows, which
+      ``write_parquet`` turns into one Parquet row group each
+
+so peak memory is bounded by ``batch_size`` rather than by the file.
+
+Output tables (same columns as the notebook CSVs)
+-------------------------------------------------
+past_performances   one row per PastPerformance, keyed by ``pp_id``
+fractions           pp_id, Fraction, Time, sequence
+points_of_call      pp_id, PointOfCall, Position, LengthsAhead,
+                    LengthsBehind, sequence
+
+Usage
+-----
+python parse_past_performances.py SIMD20230101AQU_USA.xml --out-dir out/
+"""
+from __future__ import annotations
+
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# SCHEMA  (column name, path relative to the owning element)
+# ---------------------------------------------------------------------------
+HORSE_FIELDS = [
+    ("Horse.RegistrationNumber", "RegistrationNumber"),
+    ("Horse.HorseName",          "HorseName"),
+    ("Horse.YearOfBirth",        "YearOfBirth"),
+    ("Horse.Sire.HorseName",     "Sire/HorseName"),
+    ("Horse.Dam.HorseName",      "Dam/HorseName"),
+    ("Horse.Sex.Value",          "Sex/Value"),
+]
+RACE_FIELDS = [
+    ("Track.TrackID",            "Track/TrackID"),
+    ("RaceDate",                 "RaceDate"),
+    ("Grade",                    "Grade"),
+    ("StakesIndicator",          "StakesIndicator"),
+    ("ConditionsOfRace",         "ConditionsOfRace"),
+    ("AgeRestriction",           "AgeRestriction"),
+    ("SexRestriction",           "SexRestriction"),
+    ("RaceRestrictions",         "RaceRestrictions/Text"),
+    ("MaximumClaimingPrice",     "MaximumClaimingPrice"),
+    ("PurseUSA",                 "PurseUSA"),
+    ("DistanceUnit",             "Distance/DistanceUnit/Value"),
+    ("TrackCondition",           "TrackCondition/Value"),
+    ("TrackSealedIndicator",     "TrackSealedIndicator"),
+    ("OffTurfIndicator",         "OffTurfIndicator"),
+    ("NumberOfStarters",         "NumberOfStarters"),
+    ("RaceName",                 "RaceName"),
+]
+COMPANY_LINE_FIELDS = [
+    ("CompanyLine.LengthsAheadAtFinish", "LengthsAheadAtFinish"),
+    ("CompanyLine.PositionAtFinish",     "PositionAtFinish"),
+    ("CompanyLine.OfficialPosition",     "OfficialPosition"),
+]
+START_FIELDS = [
+    ("Start.WeightCarried",        "WeightCarried"),
+    ("Start.Medication.Value",     "Medication/Value"),
+    ("Start.Equipment.Value",      "Equipment/Value"),
+    ("Start.EarningsUSA",          "EarningsUSA"),
+    ("Start.EarningsForeign",      "EarningsForeign"),
+    ("Start.Odds",                 "Odds"),
+    ("Start.Favorite",             "Favorite"),
+    ("Start.PostPosition",         "PostPosition"),
+    ("Start.OfficialFinish",       "OfficialFinish"),
+    ("Start.RaceRating",           "RaceRating"),
+    ("Start.ClassRating",          "ClassRating"),
+    ("Start.PaceFigure1",          "PaceFigure1"),
+    ("Start.PaceFigure2",          "PaceFigure2"),
+    ("Start.PaceFigure3",          "PaceFigure3"),
+    ("Start.SpeedFigure",          "SpeedFigure"),
+    ("Start.ClaimPriceUSA",        "ClaimPriceUSA"),
+    ("Start.ClaimedFlag",          "ClaimedFlag"),
+    ("Start.TimeOfHorse",          "TimeOfHorse"),
+]
+POC_FIELDS = [
+    ("PointOfCall",   "PointOfCall"),
+    ("Position",      "Position"),
+    ("LengthsAhead",  "LengthsAhead"),
+    ("LengthsBehind", "LengthsBehind"),
+]
+FRACTION_FIELDS = [
+    ("Fraction", "Fraction"),
+    ("Time",     "Time"),
+]
+
+TABLES = {
+    "past_performances": ([c for c, _ in HORSE_FIELDS] + ["pp_id"]
+                          + [c for c, _ in RACE_FIELDS]
+                          + [c for c, _ in COMPANY_LINE_FIELDS]
+                          + [c for c, _ in START_FIELDS]),
+    "fractions":         ["pp_id"] + [c for c, _ in FRACTION_FIELDS] + ["sequence"],
+    "points_of_call":    ["pp_id"] + [c for c, _ in POC_FIELDS] + ["sequence"],
+}
+INT_COLUMNS = {"pp_id", "sequence"}          # everything else is text
+DEFAULT_BATCH_SIZE = 50_000
+
+Batch = Dict[str, list]                      # column name -> values
+
+# ---------- helpers ---------------------------------------------------------
+def text(elem, path, default=None):
+    """Return elem.find(path).text stripped or default."""
+    child = elem.find(path)
+    return child.text.strip() if child is not None and child.text else default
+
+
+def _extract(elem: Optional[ET.Element], fields) -> List[Optional[str]]:
+    if elem is None:
+        return [None] * len(fields)
+    return [text(elem, path) for _, path in fields]
+
+
+def _empty(table: str) -> Batch:
+    return {col: [] for col in TABLES[table]}
+
+
+def _append(batch: Batch, values: list) -> None:
+    for col, value in zip(batch, values):
+        batch[col].append(value)
+
+# ---------- streaming parse -------------------------------------------------
+def iter_batches(xml_path, batch_size: int = DEFAULT_BATCH_SIZE,
+                 pp_id_start: int = 1) -> Iterator[Tuple[str, Batch]]:
+    """
+    Yield ``(table_name, columns)`` batches while streaming ``xml_path``.
+
+    ``pp_id``s are assigned consecutively from ``pp_id_start`` in document
+    order.  A batch is flushed whenever any table reaches ``batch_size`` rows
+    and once more at end of file, so each table's batches arrive in order.
+    """
+    batches = {name: _empty(name) for name in TABLES}
+    pp_id = pp_id_start - 1
+    stack: List[ET.Element] = []
+
+    def full() -> bool:
+        return any(len(b["pp_id"]) >= batch_size for b in batches.values())
+
+    def flush() -> Iterator[Tuple[str, Batch]]:
+        for name, batch in batches.items():
+            if batch["pp_id"]:
+                yield name, batch
+                batches[name] = _empty(name)
+
+    for event, elem in ET.iterparse(str(xml_path), events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if elem.tag == "Starters" and parent is not None and parent.tag == "Race":
+            horse = elem.find("Horse")
+            if horse is not None:
+                horse_values = _extract(horse, HORSE_FIELDS)
+                for pp in elem.iterfind("PastPerformance"):
+                    pp_id += 1
+                    start = pp.find("Start")
+                    _append(batches["past_performances"],
+                            horse_values + [pp_id]
+                            + _extract(pp, RACE_FIELDS)
+                            + _extract(pp.find("CompanyLine"), COMPANY_LINE_FIELDS)
+                            + _extract(start, START_FIELDS))
+                    if start is not None:
+                        for seq, poc in enumerate(start.iterfind("PointOfCall"), 1):
+                            _append(batches["points_of_call"],
+                                    [pp_id] + _extract(poc, POC_FIELDS) + [seq])
+                    for seq, frac in enumerate(pp.iterfind("Fractions/Fraction"), 1):
+                        _append(batches["fractions"],
+                                [pp_id] + _extract(frac, FRACTION_FIELDS) + [seq])
+            parent.remove(elem)              # keep the in‑memory tree flat
+            if full():
+                yield from flush()
+        elif elem.tag == "Race" and parent is not None:
+            parent.remove(elem)
+    yield from flush()
+
+
+# ---------- output ----------------------------------------------------------
+def arrow_schema(table: str):
+    import pyarrow as pa
+    return pa.schema([(col, pa.int64() if col in INT_COLUMNS else pa.string())
+                      for col in TABLES[table]])
+
+
+def write_parquet(xml_path, out_dir, batch_size: int = DEFAULT_BATCH_SIZE,
+                  pp_id_start: int = 1,
+                  partition: Optional[str] = None,
+                  max_past_performances: Optional[int] = None) -> Dict[str, int]:
+    """
+    Stream ``xml_path`` into ``<out_dir>/<table>.parquet`` (one row group per
+    batch).  With ``partition`` (e.g. ``"track=AQU/date=2023-01-01"``) each
+    table goes to ``<out_dir>/<table>/<partition>/part-0.parquet`` instead.
+    Returns rows written per table.
+
+    Tables are written to ``*.tmp`` files and renamed into place only once
+    the whole file has parsed, so an error – including more than
+    ``max_past_performances`` past performances – leaves no output behind.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out_dir = Path(out_dir)
+    paths = {}
+    for name in TABLES:
+        if partition:
+            paths[name] = out_dir / name / partition / "part-0.parquet"
+        else:
+            paths[name] = out_dir / f"{name}.parquet"
+        paths[name].parent.mkdir(parents=True, exist_ok=True)
+    tmp = {name: path.with_name(path.name + ".tmp") for name, path in paths.items()}
+    writers = {name: pq.ParquetWriter(tmp[name], arrow_schema(name))
+               for name in TABLES}
+    counts = dict.fromkeys(TABLES, 0)
+    try:
+        for name, batch in iter_batches(xml_path, batch_size, pp_id_start):
+            n = len(batch["pp_id"])
+            if (name == "past_performances" and max_past_performances is not None
+                    and counts[name] + n > max_past_performances):
+                raise ValueError(f"{xml_path}: more than {max_past_performances} "
+                                 f"past performances")
+            writers[name].write_batch(
+                pa.RecordBatch.from_pydict(batch, schema=arrow_schema(name)))
+            counts[name] += n
+    except BaseException:
+        for w in writers.values():
+            w.close()
+        for path in tmp.values():
+            path.unlink(missing_ok=True)
+        raise
+    for w in writers.values():
+        w.close()
+    for name in TABLES:
+        tmp[name].replace(paths[name])
+    return counts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Stream a SIMD*.xml chart file to Parquet")
+    ap.add_argument("xml", help="SIMD*_USA.xml past‑performance file")
+    ap.add_argument("--out-dir", default=".", help="Directory for the .parquet tables")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                    help="Rows per Parquet row group (default %(default)s)")
+    args = ap.parse_args()
+
+    counts = write_parquet(args.xml, args.out_dir, args.batch_size)
+    print("✓ Extracted:")
+    print("  •", counts["past_performances"], "past performances")
+    print("  •", counts["fractions"],         "fractions")
+    print("  •", counts["points_of_call"],    "points-of-call")
+
+
+if __name__ == "__main__":
+    main()
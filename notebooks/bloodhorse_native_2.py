@@ -9,26 +9,31 @@ produces stud fees, **without** using Google.  It:
        https://www.bloodhorse.com/stallion-register/stallions/0/<slug>/auctions/2000
    BloodHorse immediately redirects to the canonical URL that contains the
    six‑digit stallion ID – we capture it from the Location header.
+   The answer is remembered in the shared stallion index
+   (stallion_index.py), so the probe only fires for new sires.
 2. Walks every auctions page (2006‑2025) for that ID.
 3. Scrapes ‘<YEAR> Stud Fee  $<amount>’ rows that live under the
    Weanlings section.
-4. Writes `Sire, stud_fee_year, stud_fee_usd` to a CSV.
+4. Appends `Sire, stud_fee_year, stud_fee_usd` to a CSV after every sire
+   (harvest_store.py); --resume / --incremental pick up where the last
+   run stopped.
 
 Usage
 -----
 pip install pandas requests beautifulsoup4 openpyxl
 python bloodhorse_stud_fee_scraper.py --input sires.csv --output stud_fees.csv
+(add --rate / --max-in-flight / --workers to change the crawl budget)
 """
 import argparse
-import random
 import re
-import time
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+
+from crawler import Crawler, add_crawler_args, crawler_from_args
+from harvest_store import add_store_args, store_from_args
+from stallion_index import ResolveFailed, add_index_args, index_from_args
 
 HEADERS = {
     "User-Agent": (
@@ -41,17 +46,6 @@ YEARS_TO_CRAWL = range(2006, 2026)
 STUD_FEE_RE = re.compile(r'(\d{4})\s*Stud Fee.*?\$([\d,]+)', re.I | re.S)
 REDIRECT_RE = re.compile(r'/stallions/(\d{6})/([^/]+)/auctions/')
 
-# ---------------------------------------------------------------------
-def polite_get(url: str, tries: int = 2, timeout: int = 10, **kwargs) -> Optional[requests.Response]:
-    """GET with headers, retry once, random sleep.  Returns the Response."""
-    for _ in range(tries):
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=timeout, **kwargs)
-            return resp
-        except requests.RequestException:
-            time.sleep(random.uniform(2, 4))
-    return None
-
 # ---------------------------------------------------------------------
 def slugify(name: str) -> str:
     """Rough slug: lower‑case, spaces -> hyphens, drop non‑alphanum/hyphen."""
@@ -59,18 +53,19 @@ def slugify(name: str) -> str:
     slug = re.sub(r'\s+', '-', slug.strip())
     return slug
 
-def resolve_stallion_id(sire: str) -> Optional[Tuple[str, str]]:
+def resolve_stallion_id(sire: str, crawler: Crawler) -> Optional[Tuple[str, str]]:
     """
     Fire a probe request with ID=0.  Capture the redirect’s Location header
-    to learn the six‑digit ID and canonical slug.
+    to learn the six‑digit ID and canonical slug.  Raises ResolveFailed if
+    the probe got no response.
     """
     slug = slugify(sire)
     probe_url = (
         f"https://www.bloodhorse.com/stallion-register/stallions/0/{slug}/auctions/2000"
     )
-    resp = polite_get(probe_url, allow_redirects=False)
+    resp = crawler.get(probe_url, allow_redirects=False)
     if resp is None:
-        return None
+        raise ResolveFailed(f"no response to the ID probe for {sire!r}")
     if resp.is_redirect or resp.status_code in (301, 302):
         loc = resp.headers.get("Location", "")
         m = REDIRECT_RE.search(loc)
@@ -88,23 +83,21 @@ def scrape_page_for_stud_fee(html: str) -> Dict[int, int]:
         fees[fee_year] = fee_amt
     return fees
 
-def harvest_sire_fees(stallion_id: str, sire_slug: str) -> List[Tuple[int, int]]:
+def harvest_sire_fees(stallion_id: str, sire_slug: str, crawler: Crawler,
+                      years: Iterable[int] = YEARS_TO_CRAWL) -> List[Tuple[int, int]]:
+    urls = [
+        f"https://www.bloodhorse.com/stallion-register/stallions/"
+        f"{stallion_id}/{sire_slug}/auctions/{sales_year}"
+        for sales_year in years
+    ]
     seen: Dict[int, int] = {}
-    for sales_year in YEARS_TO_CRAWL:
-        url = (
-            f"https://www.bloodhorse.com/stallion-register/stallions/"
-            f"{stallion_id}/{sire_slug}/auctions/{sales_year}"
-        )
-        resp = polite_get(url)
-        if resp is None or resp.status_code != 200:
+    for html in crawler.get_many_text(urls):   # concurrent, input order kept
+        if not html or "Weanlings" not in html:
             continue
-        html = resp.text
-        if "Weanlings" not in html:
-            continue
-        page_fees = scrape_page_for_stud_fee(html)
+        with crawler.metrics.parsing("auctions"):
+            page_fees = scrape_page_for_stud_fee(html)
         for y, amt in page_fees.items():
             seen.setdefault(y, amt)        # keep first observation only
-        time.sleep(random.uniform(1, 3))
     return sorted(seen.items())
 
 # ---------------------------------------------------------------------
@@ -124,27 +117,38 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=True, help="CSV/XLS/XLSX with Sire & sale_year")
     ap.add_argument("--output", required=True, help="CSV for scraped fees")
+    add_crawler_args(ap)
+    add_index_args(ap)
+    add_store_args(ap)
     args = ap.parse_args()
 
     sire_df = load_sire_file(Path(args.input))
-    out_rows: List[Tuple[str, int, int]] = []
+    crawler = crawler_from_args(args, tries=2, timeout=10, headers=HEADERS)
+    index = index_from_args(args)
+    store = store_from_args(args)
+    through = YEARS_TO_CRAWL[-1]
 
     for _, (sire, _) in sire_df.iterrows():
+        if store.is_done(sire, through):
+            continue
         print(f"▶ {sire}: resolving ID … ", end="", flush=True)
-        resolved = resolve_stallion_id(sire)
+        resolved = index.resolve(sire, lambda s: resolve_stallion_id(s, crawler),
+                                 source="probe")
         if not resolved:
             print("NOT FOUND")
             continue
         stallion_id, slug = resolved
         print(stallion_id)
 
-        fee_pairs = harvest_sire_fees(stallion_id, slug)
-        for yr, amt in fee_pairs:
-            out_rows.append((sire, yr, amt))
+        years = store.years_to_crawl(sire, YEARS_TO_CRAWL, args.incremental)
+        fee_pairs = harvest_sire_fees(stallion_id, slug, crawler, years)
+        store.append(sire, fee_pairs, through)   # checkpoint after every sire
+
+    crawler.close()
+    index.close()
 
-    pd.DataFrame(out_rows, columns=["Sire", "stud_fee_year", "stud_fee_usd"]) \
-      .to_csv(args.output, index=False)
-    print(f"\n✅ Done.  Wrote {len(out_rows)} rows to {args.output}")
+    n_rows = store.compact()
+    print(f"\n✅ Done.  Wrote {n_rows} rows to {args.output}")
 
 if __name__ == "__main__":
     main()
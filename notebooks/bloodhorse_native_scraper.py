@@ -17,7 +17,8 @@ Key steps
      https://www.bloodhorse.com/stallion-register/stallions/ID/slug/auctions/YEAR
      • Parse “<YYYY> Stud Fee  $<amount>” entries under the *Weanlings* section.
      • Each <YYYY> is the stud‑fee year we record (don’t add duplicates).
-4.   Write a tidy CSV.
+4.   Append each sire's rows to the output CSV as soon as it is done
+     (harvest_store.py), so an interrupted run can be resumed.
 
 Notes on non‑USA horses (e.g. “Yoshida (JPN)”)
 ----------------------------------------------
@@ -26,12 +27,23 @@ The script:
     • First queries the search endpoint with the exact sire string.
     • If no hit, tries the slugified “name‑country” variant.
 So you only need to supply the sire as it appears in your file; the
-script will find the right form.
+script will find the right form.  Answers (including "not found") are kept
+in the shared stallion index (stallion_index.py), so later runs skip the
+search entirely.
 
 Usage
 -----
   --quiet     : only warnings/errors
   --debug     : very verbose (URLs, sleeps, page‑level info)
+  --rate, --burst, --max-in-flight, --workers
+              : politeness budget for the shared crawler (see crawler.py);
+                auctions pages are fetched concurrently within that budget
+  --index PATH, --refresh-index
+              : sire -> stallion‑ID index consulted before any search
+  --resume    : keep --output and skip sires that already finished
+  --incremental
+              : keep --output and only crawl sales years newer than each
+                sire's latest known stud_fee_year
 
 Written for Python 3.8+.
 """
@@ -39,15 +51,17 @@ from __future__ import annotations
 
 import argparse
 import logging
-import random
 import re
-import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+
+from crawler import Crawler, add_crawler_args, crawler_from_args
+from fee_extract import first_stallion_link
+from harvest_store import add_store_args, store_from_args
+from stallion_index import ResolveFailed, add_index_args, index_from_args, slugify_sire
 
 # ---------------------------------------------------------------------------
 # CONFIGURABLE CONSTANTS
@@ -63,9 +77,6 @@ YEARS_TO_CRAWL = range(2006, 2026)
 SEARCH_URL = (
     "https://www.bloodhorse.com/stallion-register/search?keyword={}"
 )
-STALLION_HREF_RE = re.compile(
-    r'/stallion-register/stallions/(\d{6})/([^"]+)'
-)
 STUD_FEE_RE = re.compile(
     r'(\d{4})\s*Stud Fee[^$]*\$([\d,]+)', re.I | re.S
 )
@@ -80,64 +91,30 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-# ---------------------------------------------------------------------------
-# HTTP HELPERS
-# ---------------------------------------------------------------------------
-def polite_get(url: str, sleep_range: Tuple[float, float] = (1.0, 2.5),
-               tries: int = 3, timeout: int = 12) -> Optional[str]:
-    """GET with polite headers + jittered sleep between retries."""
-    for attempt in range(tries):
-        try:
-            log.debug("GET %s", url)
-            resp = requests.get(url, headers=HEADERS, timeout=timeout)
-            if resp.status_code == 200:
-                return resp.text
-            log.debug("  Status %s on attempt %d", resp.status_code, attempt + 1)
-        except requests.RequestException as e:
-            log.debug("  Request error %s on attempt %d", e, attempt + 1)
-        time.sleep(random.uniform(*sleep_range))
-    log.warning("  Failed to fetch %s after %d tries", url, tries)
-    return None
-
 # ---------------------------------------------------------------------------
 # BLOODHORSE LOOKUP
 # ---------------------------------------------------------------------------
-def slugify_sire(sire: str) -> str:
-    """
-    Convert "Yoshida (JPN)" -> "yoshida-jpn", "Gio Ponti" -> "gio-ponti".
-    Matches BloodHorse slug style.
-    """
-    sire = sire.strip()
-    # capture "(ABC)" country code if present
-    m = re.match(r"^(.*?)\s*\((\w{2,4})\)$", sire)
-    if m:
-        name, country = m.groups()
-        base = name.strip()
-        slug = re.sub(r"[^\w\s-]", "", base).lower()
-        slug = re.sub(r"\s+", "-", slug)
-        return f"{slug}-{country.lower()}"
-    # USA horses—just hyphenate & lower
-    slug = re.sub(r"[^\w\s-]", "", sire).lower()
-    slug = re.sub(r"\s+", "-", slug)
-    return slug
-
-def bloodhorse_search(sire: str) -> Optional[Tuple[str, str]]:
+def bloodhorse_search(sire: str, crawler: Crawler) -> Optional[Tuple[str, str]]:
     """
     Query the BloodHorse search endpoint. Return (stallion_id, slug) or None.
-    Tries exact string, then slugified variant if needed.
+    Tries exact string, then slugified variant if needed.  Raises
+    ResolveFailed when no match was found but a search page could not be
+    fetched, since that is not a "not found".
     """
+    failed = False
     for query in (sire, slugify_sire(sire)):
         log.debug("  BloodHorse search query = %s", query)
-        html = polite_get(SEARCH_URL.format(requests.utils.quote(query)))
+        html = crawler.get_text(SEARCH_URL.format(requests.utils.quote(query)))
         if not html:
+            failed = True
             continue
-        soup = BeautifulSoup(html, "html.parser")
-        for a in soup.select("a"):
-            href = a.get("href", "")
-            m = STALLION_HREF_RE.search(href)
-            if m:
-                return m.group(1), m.group(2)  # id, slug
+        with crawler.metrics.parsing("search"):
+            hit = first_stallion_link(html)  # (id, slug) – no full soup
+        if hit:
+            return hit
         # no match—next strategy
+    if failed:
+        raise ResolveFailed(f"BloodHorse search for {sire!r} could not be fetched")
     return None
 
 # ---------------------------------------------------------------------------
@@ -152,25 +129,29 @@ def scrape_page_for_fees(html: str) -> Dict[int, int]:
         fees[year] = fee
     return fees
 
-def harvest_fees_for_sire(stallion_id: str, slug: str) -> List[Tuple[int, int]]:
-    """Crawl all YEARS_TO_CRAWL; return sorted list of (year, fee)."""
+def harvest_fees_for_sire(stallion_id: str, slug: str, crawler: Crawler,
+                          years: Iterable[int] = YEARS_TO_CRAWL) -> List[Tuple[int, int]]:
+    """Crawl ``years`` (default YEARS_TO_CRAWL); return sorted list of (year, fee)."""
+    years = list(years)
+    urls = [
+        f"https://www.bloodhorse.com/stallion-register/stallions/"
+        f"{stallion_id}/{slug}/auctions/{sales_year}"
+        for sales_year in years
+    ]
+    # pages are fetched concurrently; the crawler enforces the politeness
+    # budget, and we merge in year order so the first observation still wins
     seen: Dict[int, int] = {}
-    for sales_year in YEARS_TO_CRAWL:
-        url = (
-            f"https://www.bloodhorse.com/stallion-register/stallions/"
-            f"{stallion_id}/{slug}/auctions/{sales_year}"
-        )
-        html = polite_get(url)
+    for sales_year, html in zip(years, crawler.get_many_text(urls)):
         if not html:
             continue
         if "Weanlings" not in html:
             log.debug("    %s: no Weanlings section", sales_year)
             continue
-        page_fees = scrape_page_for_fees(html)
+        with crawler.metrics.parsing("auctions"):
+            page_fees = scrape_page_for_fees(html)
         for y, fee in page_fees.items():
             if y not in seen:
                 seen[y] = fee
-        time.sleep(random.uniform(1.0, 2.0))
     return sorted(seen.items())
 
 # ---------------------------------------------------------------------------
@@ -198,6 +179,9 @@ def main() -> None:
     grp = ap.add_mutually_exclusive_group()
     grp.add_argument("--quiet", action="store_true", help="Only warnings/errors")
     grp.add_argument("--debug", action="store_true", help="Very verbose logging")
+    add_crawler_args(ap)
+    add_index_args(ap)
+    add_store_args(ap)
     args = ap.parse_args()
 
     if args.quiet:
@@ -206,32 +190,38 @@ def main() -> None:
         logging.getLogger().setLevel(logging.DEBUG)
 
     df_sires = load_sire_file(Path(args.input))
+    crawler = crawler_from_args(args, headers=HEADERS)
+    index = index_from_args(args)
 
-    rows: List[Tuple[str, int, int]] = []
+    store = store_from_args(args)
+    through = YEARS_TO_CRAWL[-1]
 
     for sire, sale_year in df_sires.itertuples(index=False):
+        if store.is_done(sire, through):
+            log.debug("  %s already harvested through %s", sire, through)
+            continue
         log.info("▶ Processing %s (%s)…", sire, sale_year)
 
-        lookup = bloodhorse_search(sire)
+        lookup = index.resolve(sire, lambda s: bloodhorse_search(s, crawler),
+                               source="search")
         if not lookup:
             log.warning("  No BloodHorse record found for %s", sire)
             continue
         stallion_id, slug = lookup
         log.info("  🆔 ID %s  Slug %s", stallion_id, slug)
 
-        fee_pairs = harvest_fees_for_sire(stallion_id, slug)
+        years = store.years_to_crawl(sire, YEARS_TO_CRAWL, args.incremental)
+        fee_pairs = harvest_fees_for_sire(stallion_id, slug, crawler, years)
+        store.append(sire, fee_pairs, through)
         if not fee_pairs:
-            log.warning("  No stud fees found for %s", sire)
+            log.warning("  No new stud fees found for %s", sire)
             continue
-
-        for yr, fee in fee_pairs:
-            rows.append((sire, yr, fee))
         log.info("  ✓ %d fee years captured", len(fee_pairs))
 
-    out_df = pd.DataFrame(rows, columns=["Sire", "stud_fee_year", "stud_fee_usd"])
-    out_df.to_csv(args.output, index=False)
-    log.info("✅ Finished. %d total rows written to %s", len(out_df), args.output)
-
+    crawler.close()
+    index.close()
+    n_rows = store.compact()
+    log.info("✅ Finished. %d total rows written to %s", n_rows, args.output)
 
 if __name__ == "__main__":
     main()
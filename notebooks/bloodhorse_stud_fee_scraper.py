@@ -6,16 +6,22 @@ Given an Excel file with columns `Sire` and `sale_year`, this script:
 
 1. Uses Google Search to discover the first BloodHorse “worldwide sales
    results” page for the sire and year (or ±1 year if needed).
+   Sires already in the shared stallion index (stallion_index.py) skip
+   the search altogether.
 2. Extracts the six‑digit BloodHorse stallion ID from that URL.
 3. Walks every sales‑results page from 2006‑2025 for that sire,
    harvesting the *Stud Fee* listed in the **Weanlings** table.
    (Weanlings sold in YEAR correspond to the STUD FEE charged the
    previous YEAR, so `stud_fee_year = sale_year - 1`.)
-4. Writes a tidy CSV:  `Sire,stud_fee_year,stud_fee_usd`.
+4. Writes a tidy CSV:  `Sire,stud_fee_year,stud_fee_usd`, appending each
+   sire as soon as it is done (harvest_store.py) so --resume and
+   --incremental runs only crawl what is missing.
 
 The script is intentionally polite to BloodHorse:
    • Sets a realistic User‑Agent header  
-   • Sleeps 1‑3 s between every HTTP request  
+   • Routes every request through the shared crawler (crawler.py): a
+     per‑host token bucket and in‑flight cap (--rate / --max-in-flight)
+     instead of a fixed sleep after each page
    • Retries once on common transient failures
 """
 import argparse
@@ -23,12 +29,16 @@ import random
 import re
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS 
+from duckduckgo_search.exceptions import DuckDuckGoSearchException
+
+from crawler import Crawler, add_crawler_args, crawler_from_args
+from fee_extract import stud_fee_from_weanlings
+from harvest_store import add_store_args, store_from_args
+from stallion_index import ResolveFailed, add_index_args, index_from_args
 
 # ---------------------------------------------------------------------
 HEADERS = {
@@ -41,34 +51,27 @@ HEADERS = {
 YEARS_TO_CRAWL = range(2006, 2026)  # sales‑results pages we will visit
 SEARCH_TEMPLATE = '{} {} worldwide sales results bloodhorse site:bloodhorse.com'
 BH_URL_RE = re.compile(r'/stallions/(\d{6})/([^/]+)/auctions/(\d{4})')
-STUD_FEE_RE = re.compile(r'(\d{4})\s*Stud Fee.*?\$([\d,]+)', re.I | re.S)
 
 
 # ---------------------------------------------------------------------
-def polite_get(url: str, tries: int = 2, timeout: int = 10) -> Optional[str]:
-    """GET with headers, retry once, random sleep."""
-    for attempt in range(tries):
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=timeout)
-            if resp.status_code == 200:
-                return resp.text
-        except requests.RequestException:
-            pass
-        # Back‑off
-        time.sleep(random.uniform(2, 4))
-    return None
-
-
-def find_initial_bloodhorse_url(sire: str, sale_year: int) -> Optional[Tuple[str, str]]:
+def find_initial_bloodhorse_url(sire: str, sale_year: int,
+                                offline: bool = False) -> Optional[Tuple[str, str]]:
     """
     Query DuckDuckGo for the BloodHorse auctions page.
-    Tries given year, then +1 and -1.  Returns (stallion_id, slug) or None.
+    Tries given year, then +1 and -1.  Returns (stallion_id, slug) or None;
+    raises ResolveFailed if DuckDuckGo could not be asked (errors, offline).
     """
+    if offline:                         # searches are not in the page cache
+        raise ResolveFailed(f"no DuckDuckGo search for {sire!r} offline")
     with DDGS() as ddgs:
         for delta in [0, 1, -1]:
             y = sale_year + delta
             q = f"{sire} {y} worldwide sales results bloodhorse"
-            for r in ddgs.text(q, max_results=15):
+            try:
+                results = ddgs.text(q, max_results=15)
+            except DuckDuckGoSearchException as e:
+                raise ResolveFailed(f"DuckDuckGo search for {sire!r} failed") from e
+            for r in results:
                 url = r.get("href") or r.get("url")
                 if not url:
                     continue
@@ -79,66 +82,21 @@ def find_initial_bloodhorse_url(sire: str, sale_year: int) -> Optional[Tuple[str
             time.sleep(random.uniform(1, 2))   # be polite to DDG
     return None
 
-from bs4 import BeautifulSoup
-import re
-
-
-def stud_fee_from_weanlings(html: str) -> dict[int, int]:
+def harvest_sire_fees(stallion_id: str, sire_slug: str, crawler: Crawler,
+                      years: Iterable[int] = YEARS_TO_CRAWL) -> List[Tuple[int, int]]:
     """
-    Return {stud_fee_year: stud_fee_usd} for the Weanlings tab only.
-    """
-    soup = BeautifulSoup(html, "lxml")
-
-    # find the first Weanlings <ul class="tabs"><li> or the header string
-    weanlings_li = soup.find("li", string=re.compile(r"\bWeanlings\b", re.I))
-    if not weanlings_li:
-        return {}
-
-    # the <ul class="tabs"> is the parent; the corresponding tabPane is next
-    tab_ul = weanlings_li.find_parent("ul", class_="tabs")
-    tab_pane = tab_ul.find_next_sibling("div", class_="contentBlock")
-    if not tab_pane:
-        return {}
-
-    # within that pane, the <li> that starts with 'YYYY Stud Fee'
-    fee_li = tab_pane.find("li", string=re.compile(r"^\d{4}\s+Stud\s+Fee", re.I))
-    if not fee_li:
-        return {}
-
-    m = re.match(r"(?P<yr>\d{4})\s+Stud\s+Fee:\s+\$(?P<amt>[\d,]+)", fee_li.text)
-    if not m:
-        return {}
-
-    yr = int(m.group("yr"))
-    amt = int(m.group("amt").replace(",", ""))
-    return {yr: amt}
-
-
-def scrape_page_for_stud_fee(html: str) -> Dict[int, int]:
-    """
-    Parse a BloodHorse auctions page and pull all '<YEAR> Stud Fee  $<amount>'
-    patterns. Returns {stud_fee_year: fee}.
-    """
-    fees = {}
-    for m in STUD_FEE_RE.finditer(html):
-        fee_year = int(m.group(1))
-        fee_amt = int(m.group(2).replace(",", ""))
-        fees[fee_year] = fee_amt
-    return fees
-
-
-def harvest_sire_fees(stallion_id: str, sire_slug: str) -> List[Tuple[int, int]]:
-    """
-    Walk every YEAR in YEARS_TO_CRAWL and return list of
+    Walk every YEAR in ``years`` (default YEARS_TO_CRAWL) and return list of
     (stud_fee_year, fee) pairs (duplicate years removed).
     """
+    urls = [
+        f"https://www.bloodhorse.com/stallion-register/stallions/"
+        f"{stallion_id}/{sire_slug}/auctions/{sales_year}"
+        for sales_year in years
+    ]
     seen: Dict[int, int] = {}
-    for sales_year in YEARS_TO_CRAWL:
-        url = (
-            f"https://www.bloodhorse.com/stallion-register/stallions/"
-            f"{stallion_id}/{sire_slug}/auctions/{sales_year}"
-        )
-        html = polite_get(url)
+    # Pages arrive concurrently (the crawler owns the politeness budget);
+    # results keep sales‑year order so the first observation still wins.
+    for html in crawler.get_many_text(urls):
         if not html:
             continue
 
@@ -146,16 +104,14 @@ def harvest_sire_fees(stallion_id: str, sire_slug: str) -> List[Tuple[int, int]]
         if "Weanlings" not in html:
             continue
 
-        page_fees = stud_fee_from_weanlings(html)
+        with crawler.metrics.parsing("auctions"):
+            page_fees = stud_fee_from_weanlings(html)
 
         # For each Stud Fee we found, accept if not already captured.
         for fee_year, fee in page_fees.items():
             if fee_year not in seen:
                 seen[fee_year] = fee
 
-        # be nice to the server
-        time.sleep(random.uniform(1, 3))
-
     # Return as sorted list
     return sorted(seen.items())
 
@@ -184,33 +140,42 @@ def main():
     parser = argparse.ArgumentParser(description="BloodHorse stud‑fee scraper")
     parser.add_argument("--input", required=True, help="Excel file with Sire & sale_year")
     parser.add_argument("--output", required=True, help="CSV file to write")
+    add_crawler_args(parser)
+    add_index_args(parser)
+    add_store_args(parser)
     args = parser.parse_args()
 
     sire_df = load_sire_file(Path(args.input))
+    crawler = crawler_from_args(args, tries=2, timeout=10, headers=HEADERS)
+    index = index_from_args(args)
 
-    rows: List[Tuple[str, int, int]] = []
+    store = store_from_args(args)
+    through = YEARS_TO_CRAWL[-1]
 
     for idx, (sire, sale_year) in sire_df.iterrows():
+        if store.is_done(sire, through):
+            continue
         print(f"▶ Processing {sire} ({sale_year})...")
-        initial = find_initial_bloodhorse_url(sire, int(sale_year))
+        initial = index.resolve(
+            sire, lambda s: find_initial_bloodhorse_url(s, int(sale_year), crawler.offline),
+            source="ddg")
         if not initial:
             print(f"  ⚠️  No BloodHorse link found for {sire}; skipping.")
             continue
         stallion_id, sire_slug = initial
         print(f"  🆔 Stallion ID: {stallion_id}")
 
-        fee_pairs = harvest_sire_fees(stallion_id, sire_slug)
+        years = store.years_to_crawl(sire, YEARS_TO_CRAWL, args.incremental)
+        fee_pairs = harvest_sire_fees(stallion_id, sire_slug, crawler, years)
+        # checkpoint: rows hit disk before we move to the next sire
+        store.append(sire, fee_pairs, through)
         if not fee_pairs:
-            print(f"  ⚠️  No stud fees found for {sire}.")
-            continue
-
-        for stud_fee_year, fee_usd in fee_pairs:
-            rows.append((sire, stud_fee_year, fee_usd))
-
-    out_df = pd.DataFrame(rows, columns=["Sire", "stud_fee_year", "stud_fee_usd"])
-    out_df.to_csv(args.output, index=False)
-    print(f"✅ Finished. Wrote {len(out_df)} rows to {args.output}")
+            print(f"  ⚠️  No new stud fees found for {sire}.")
 
+    crawler.close()
+    index.close()
+    n_rows = store.compact()
+    print(f"✅ Finished. Wrote {n_rows} rows to {args.output}")
 
 if __name__ == "__main__":
     main()
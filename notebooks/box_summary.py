@@ -0,0 +1,91 @@
+"""
+box_summary.py
+--------------
+Pre‑aggregated "Yearly Sales by Sire" box plots.
+
+``px.box`` ships every sold lot to the browser (plus ``Sire`` /
+``Description`` / ``Purchaser`` hover text per point) and lets plotly.js
+compute the quartiles, so the payload grows with every sale year added under
+``data/keeneland/sept-yearling/``.  Here the server computes one row of
+statistics per sale year
+
+    q1, median, q3            linear‑interpolated quantiles (plotly's default)
+    lowerfence, upperfence    most extreme lots within 1.5 × IQR (Tukey whiskers)
+
+and ``box_figure`` draws them with ``go.Box``'s precomputed‑statistics mode.
+Only the outliers travel as individual points (with their hover text), so
+the figure is a few KB per year however many lots there are.  A small
+selection (``RAW_POINTS_MAX`` lots or fewer) is still drawn from raw points
+so every lot can be hovered.
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+RAW_POINTS_MAX = 500                # draw raw lots at or below this many
+WHISKER = 1.5                       # Tukey fence multiplier
+HOVER = ["Sire", "Description", "Purchaser"]
+TITLE = "Keeneland Sept Yearling Sales by Sire"
+
+# ---------------------------------------------------------------------------
+# STATISTICS
+# ---------------------------------------------------------------------------
+def box_stats(df: pd.DataFrame, by: str = "sale_year",
+              value: str = "Price") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    ``(stats, outliers)`` for one box per ``by`` group.  ``stats`` has one
+    row per group; ``outliers`` holds the lots outside their group's fences.
+    """
+    df = df[df[value].notna()]
+    grouped = df.groupby(by, observed=True)[value]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    lo = df[by].map(stats["q1"] - WHISKER * iqr)
+    hi = df[by].map(stats["q3"] + WHISKER * iqr)
+    inside = df[value].between(lo, hi)
+    fences = df[inside].groupby(by, observed=True)[value].agg(["min", "max"])
+    stats["lowerfence"] = fences["min"]
+    stats["upperfence"] = fences["max"]
+    stats["n"] = grouped.size()
+    return stats.reset_index(), df[~inside]
+
+# ---------------------------------------------------------------------------
+# FIGURE
+# ---------------------------------------------------------------------------
+def summary_figure(stats: pd.DataFrame, outliers: pd.DataFrame,
+                   by: str = "sale_year", value: str = "Price",
+                   title: str = TITLE) -> go.Figure:
+    """Boxes from precomputed ``stats`` plus the ``outliers`` as points."""
+    fig = go.Figure(go.Box(
+        x=stats[by], q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+        lowerfence=stats["lowerfence"], upperfence=stats["upperfence"],
+        boxpoints=False, name=value, marker_color="#636efa",
+    ))
+    hover = [c for c in HOVER if c in outliers.columns]
+    fig.add_trace(go.Scatter(
+        x=outliers[by], y=outliers[value], mode="markers", name="outliers",
+        marker=dict(color="#636efa", size=4), customdata=outliers[hover],
+        hovertemplate="<br>".join(
+            [f"{by}=%{{x}}", f"{value}=%{{y}}"]
+            + [f"{c}=%{{customdata[{i}]}}" for i, c in enumerate(hover)])
+        + "<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title=by, yaxis_title=value, showlegend=False)
+    return fig
+
+
+def box_figure(df: pd.DataFrame, by: str = "sale_year", value: str = "Price",
+               title: str = TITLE) -> go.Figure:
+    """Yearly box plot of ``df``: raw points when small, summaries otherwise."""
+    if len(df) <= RAW_POINTS_MAX:
+        return px.box(df, x=by, y=value,
+                      hover_data=[c for c in HOVER if c in df.columns], title=title)
+    return summary_figure(*box_stats(df, by, value), by=by, value=value, title=title)
@@ -0,0 +1,173 @@
+"""
+breeze_analytics.py
+-------------------
+Under‑tack (breeze show) analytics for the OBS April 2yo sales.
+
+``obs_breeze`` in ``catalog.duckdb`` (``catalog_db.py``) holds each lot's
+work time, distance, day, group and set as the catalogues print them:
+
+    ut_time       "10.1", "21.3"  – seconds and *fifths* (10 1/5 s, 21 3/5 s);
+                  the tenths digit is never above 4
+    ut_distance   " 1/8", " 1/4"  – miles, 2024 on; earlier files have none
+
+``BREEZE_QUERY`` turns them into numbers in one set‑based pass – seconds,
+furlongs (from the distance, or inferred from the time when it is missing:
+a 1/8 is worked in 9–13 s, a 1/4 in 20–24 s, a 3/8 in 32–36 s) and seconds
+per furlong – and ranks every work against the others at the same distance
+
+    day     same sale day
+    group   same session group of the day (2024 on)
+    set     same set number of the day (mostly one horse; NULL percentile
+            when the set has no one else)
+    sale    the whole sale
+
+with window functions: ``*_rank`` is 1 for the fastest, ``*_pct`` the share
+of the rest of the field the work was strictly faster than (1.0 = fastest,
+0.0 = slowest), ``*_n`` the field size.  Each work keeps its sale outcome
+(``status``, ``hammer_price`` and the price over the year's median sold
+price).  ``build`` stores the result as ``breeze_analytics`` next to
+``obs_breeze``; the cost is a few sorts over the breezers, linear in rows.
+
+Usage
+-----
+python notebooks/breeze_analytics.py                       # -> catalog.duckdb
+python notebooks/breeze_analytics.py --parquet breeze.parquet
+
+from breeze_analytics import build
+works = build()
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import pandas as pd
+
+from catalog_db import DEFAULT_DB, connect, ingest
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+TABLE = "breeze_analytics"
+SOURCE = "obs_breeze"
+
+# upper bound on the time (seconds) of each distance (furlongs) when the
+# catalogue does not print one
+INFERRED_FURLONGS = [(16.0, 1), (28.0, 2), (41.0, 3)]
+LONGEST_INFERRED = 4
+
+# ranking field -> partition columns (besides sale, sale_year and furlongs);
+# works missing any of them are not ranked in that field
+FIELDS: Dict[str, List[str]] = {
+    "day": ["ut_day"],
+    "group": ["ut_day", "ut_group"],
+    "set": ["ut_day", "ut_set"],
+    "sale": [],
+}
+
+# ---------------------------------------------------------------------------
+# QUERY
+# ---------------------------------------------------------------------------
+def _inferred(seconds: str) -> str:
+    cases = " ".join(f"WHEN {seconds} < {t} THEN {f}" for t, f in INFERRED_FURLONGS)
+    return f"CASE {cases} ELSE {LONGEST_INFERRED} END"
+
+
+def _ranked(field: str) -> str:
+    """
+    ``<field>_n``, ``<field>_rank`` and ``<field>_pct`` select items, all
+    over one window so each field costs a single sort.  The share of the
+    field strictly slower is ``1 − cume_dist`` rescaled to the others.
+    """
+    part = ", ".join(["sale", "sale_year", "furlongs"] + FIELDS[field])
+    known = " AND ".join(f"{c} IS NOT NULL" for c in FIELDS[field]) or "TRUE"
+    w = (f"(PARTITION BY {part} ORDER BY sec_per_furlong "
+         f"ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)")
+    n = f"count(*) OVER {w}"
+    return f"""
+       CAST(CASE WHEN {known} THEN {n} END AS INTEGER) AS {field}_n,
+       CAST(CASE WHEN {known} THEN rank() OVER {w} END AS INTEGER) AS {field}_rank,
+       CASE WHEN {known} AND {n} > 1
+            THEN (1 - cume_dist() OVER {w}) * {n} / ({n} - 1)
+       END AS {field}_pct"""
+
+
+BREEZE_QUERY = f"""
+WITH works AS (
+    SELECT *,
+           -- "21.3" is 21 3/5 seconds
+           floor(ut_time) + round((ut_time - floor(ut_time)) * 10) / 5 AS ut_seconds,
+           TRY_CAST(split_part(ut_distance, '/', 1) AS DOUBLE) * 8
+               / NULLIF(TRY_CAST(split_part(ut_distance, '/', 2) AS DOUBLE), 0)
+               AS stated_furlongs
+    FROM {SOURCE}
+    WHERE ut_time > 0
+),
+measured AS (
+    SELECT *,
+           COALESCE(stated_furlongs, {_inferred("ut_seconds")}) AS furlongs,
+           stated_furlongs IS NULL AS distance_inferred,
+           ut_seconds / COALESCE(stated_furlongs, {_inferred("ut_seconds")})
+               AS sec_per_furlong
+    FROM works
+),
+medians AS (
+    SELECT sale, sale_year, median(hammer_price) AS year_median_price
+    FROM {SOURCE}
+    WHERE status = 'Sold'
+    GROUP BY ALL
+)
+SELECT m.sale, CAST(m.sale_year AS SMALLINT) AS sale_year, m.hip,
+       m.horse_name, m.sex, m.sire, m.dam, m.consignor,
+       m.ut_day, m.ut_date, CAST(m.ut_group AS SMALLINT) AS ut_group,
+       CAST(m.ut_set AS SMALLINT) AS ut_set,
+       m.ut_time, m.ut_seconds, m.furlongs, m.distance_inferred, m.sec_per_furlong,
+       {",".join(_ranked(f) for f in FIELDS)},
+       m.status, m.hammer_price,
+       CASE WHEN m.status = 'Sold' THEN m.hammer_price / p.year_median_price END
+           AS price_to_year_median
+FROM measured m
+LEFT JOIN medians p USING (sale, sale_year)
+ORDER BY m.sale, m.sale_year, m.hip
+"""
+
+# ---------------------------------------------------------------------------
+# BUILD
+# ---------------------------------------------------------------------------
+def breeze_analytics(con: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    """``BREEZE_QUERY`` over the ``obs_breeze`` table of ``con``."""
+    return con.execute(BREEZE_QUERY).df()
+
+
+def build(db_path=DEFAULT_DB, parquet: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Bring ``obs_breeze`` up to date, rewrite ``breeze_analytics`` from it
+    and return the table (optionally also written to ``parquet``).
+    """
+    ingest(db_path)
+    con = connect(db_path)
+    try:
+        con.execute(f"CREATE OR REPLACE TABLE {TABLE} AS {BREEZE_QUERY}")
+        df = con.execute(f"SELECT * FROM {TABLE}").df()
+    finally:
+        con.close()
+    if parquet is not None:
+        df.to_parquet(parquet, index=False)
+    return df
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Build the OBS breeze analytics table")
+    ap.add_argument("--db", default=str(DEFAULT_DB), help="Database file (default %(default)s)")
+    ap.add_argument("--parquet", type=Path, help="Also write the table to this Parquet file")
+    args = ap.parse_args()
+
+    df = build(args.db, args.parquet)
+    years = df.groupby("sale_year").size()
+    print(f"✓ {TABLE}: {len(df):,} works, {years.index.min()}–{years.index.max()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+catalog_db.py
+-------------
+Persistent DuckDB database of every sale catalogue under ``data/``.
+
+``intro_analysis.ipynb`` and ``sellers_buyers_clean.ipynb`` each opened
+``dd.connect(':memory:')`` and re‑ran ``read_csv_auto`` (type sniffing,
+``FILENAME = TRUE``, a regex over the path for the year) over the Keeneland
+``lots.csv`` files, and the OBS ``breeze.csv`` files were never loaded at
+all.  ``ingest`` builds ``catalog.duckdb`` once:
+
+    keeneland_lots   the 17 ``lots.csv`` columns with the types
+                     ``read_csv_auto`` used to infer (``Hip`` stays text),
+                     read with an explicit schema; ``Price`` is a BIGINT,
+                     NULL where the catalogue has "---" (RNA / unsold)
+    obs_breeze       one typed schema for all OBS April 2yo layouts (three
+                     generations of headers, title rows above them,
+                     "changed to RNA" notes below them)
+    ingested_files   sale, sale_year, path, sha256, rows, ingested_at
+
+Both lot tables are partitioned by (sale, sale_year): a file replaces
+exactly its own partition inside one transaction.  Files are hashed first
+and skipped when the hash matches ``ingested_files``, so re‑running the
+command costs a hash per file; partitions whose file has gone are dropped.
+
+Ingesting is the build step (this script, or ``ingest()``).  ``lots()`` only
+reads, on a read‑only connection, so any number of notebooks and dashboard
+processes can query the database at once without taking DuckDB's write
+lock; run the build again after adding a sale.
+
+Usage
+-----
+python notebooks/catalog_db.py                  # -> notebooks/catalog.duckdb
+python notebooks/catalog_db.py --force          # reload every file
+
+from catalog_db import lots
+df = lots()                  # == seller_buyer_parse.load_lots(), Price numeric
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+DATA_DIR = Path(__file__).resolve().parent
+ROOT = DATA_DIR.parent
+DEFAULT_DB = DATA_DIR / "catalog.duckdb"
+
+KEENELAND_SALE = "keeneland-sept-yearling"
+OBS_SALE = "obs-april-2yo"
+SOURCES = {                         # sale -> (table, glob relative to ROOT)
+    KEENELAND_SALE: ("keeneland_lots", "data/keeneland/sept-yearling/*/lots.csv"),
+    OBS_SALE: ("obs_breeze", "data/obs/april-2yo-training/*/breeze.csv"),
+}
+YEAR_RE = re.compile(r"/(\d{4})/[^/]*$")
+
+KEENELAND_COLUMNS = {
+    "Session": "BIGINT", "Hip": "VARCHAR", "PropertyLine1": "VARCHAR",
+    "PropertyLine2": "VARCHAR", "Description": "VARCHAR", "DOB": "VARCHAR",
+    "Color": "VARCHAR", "Sex": "VARCHAR", "Horse Name": "VARCHAR", "Sire": "VARCHAR",
+    "Dam": "VARCHAR", "CoveringSire": "VARCHAR", "LastService": "VARCHAR",
+    "Pregnancy": "VARCHAR", "SoldAs": "VARCHAR", "Purchaser": "VARCHAR",
+    "Price": "VARCHAR",
+}
+KEENELAND_TYPES = {"Price": "BIGINT"}          # stored type where it differs from the CSV's
+
+# OBS header (lower‑cased, '#' dropped, spaces -> '_') -> canonical raw column
+OBS_ALIASES = {
+    "hip": "hip", "hip_number": "hip",
+    "name": "horse_name", "horse_name": "horse_name",
+    "color": "color", "sex": "sex",
+    "foal_date": "foaling_date", "foaling_date": "foaling_date",
+    "m": "foal_month", "d": "foal_day", "yr": "foal_yr",      # 2017–2018
+    "sire": "sire", "sire_name": "sire",
+    "dam": "dam", "dam_name": "dam",
+    "dam_sire": "dam_sire", "damsire": "dam_sire",
+    "consignor": "consignor", "property_line_1": "consignor",
+    "state": "state", "area_id": "state", "foaling_area": "state",
+    "barn": "barn", "barn_number": "barn",
+    "work_time": "ut_time", "ut_time": "ut_time",
+    "ut_distance": "ut_distance",
+    "day": "ut_day", "ut_actual_date": "ut_day",
+    "ut_group": "ut_group",
+    "set": "ut_set", "ut_set": "ut_set",
+    "buyer": "buyer", "buyer_name": "buyer",
+    "price": "price", "hammer_price": "price",
+    "ps": "post_sale", "post_sale": "post_sale", "post_sale_indicator": "post_sale",
+    "status": "in_out", "out": "in_out", "in_out_status": "in_out",
+    "out_date": "out_date", "outdate": "out_date",
+}
+OBS_IGNORED = {"consignsort", "alphsort", "alphabetic_consignor_sort", "sort_by_dam",
+               "sort_dam", "consignor_sort", "property_line_2", "pp_pdf_link",
+               "foaling_year"}
+OBS_RAW_COLUMNS = sorted(set(OBS_ALIASES.values()))
+RNA_NOTE_RE = re.compile(r"CHA\w*GED TO RNA:\s*([\d,\s]+)", re.I)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS keeneland_lots (
+    sale VARCHAR NOT NULL, sale_year INTEGER NOT NULL, filename VARCHAR NOT NULL,
+    row_in_file INTEGER NOT NULL,
+    {", ".join(f'"{c}" {KEENELAND_TYPES.get(c, t)}' for c, t in KEENELAND_COLUMNS.items())}
+);
+CREATE TABLE IF NOT EXISTS obs_breeze (
+    sale VARCHAR NOT NULL, sale_year INTEGER NOT NULL, row_in_file INTEGER NOT NULL,
+    hip INTEGER NOT NULL, horse_name VARCHAR, color VARCHAR, sex VARCHAR,
+    foaling_date DATE, sire VARCHAR, dam VARCHAR, dam_sire VARCHAR,
+    consignor VARCHAR, state VARCHAR, barn VARCHAR,
+    ut_time DOUBLE, ut_distance VARCHAR, ut_day VARCHAR, ut_date DATE,
+    ut_group INTEGER, ut_set INTEGER,
+    buyer VARCHAR, hammer_price BIGINT, status VARCHAR, post_sale BOOLEAN,
+    out_date DATE
+);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    sale VARCHAR NOT NULL, sale_year INTEGER NOT NULL, path VARCHAR NOT NULL,
+    sha256 VARCHAR NOT NULL, rows BIGINT NOT NULL, ingested_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (sale, sale_year)
+);
+"""
+
+KEENELAND_INSERT = f"""
+INSERT INTO keeneland_lots
+SELECT ?, ?, ?, CAST(row_number() OVER () AS INTEGER),
+       {", ".join(f'TRY_CAST("{c}" AS {KEENELAND_TYPES[c]})' if c in KEENELAND_TYPES
+                  else f'"{c}"' for c in KEENELAND_COLUMNS)}
+FROM read_csv(?, header = true, auto_detect = false, columns = ?,
+              delim = ',', quote = '"', new_line = ?)
+"""
+
+_MONEY = "TRY_CAST(regexp_replace({}, '[$,\\s]', '', 'g') AS BIGINT)"
+OBS_INSERT = f"""
+INSERT INTO obs_breeze
+SELECT ?, ?, row_in_file, CAST(hip AS INTEGER),
+       NULLIF(trim(horse_name), ''), NULLIF(trim(color), ''), NULLIF(trim(sex), ''),
+       COALESCE(CAST(TRY_STRPTIME(trim(foaling_date), '%m/%d/%Y') AS DATE),
+                TRY_CAST(printf('20%02d-%02d-%02d', TRY_CAST(foal_yr AS INTEGER),
+                                TRY_CAST(foal_month AS INTEGER),
+                                TRY_CAST(foal_day AS INTEGER)) AS DATE)),
+       NULLIF(trim(sire), ''), NULLIF(trim(dam), ''), NULLIF(trim(dam_sire), ''),
+       NULLIF(trim(consignor), ''), NULLIF(trim(state), ''), NULLIF(trim(barn), ''),
+       TRY_CAST(ut_time AS DOUBLE), NULLIF(trim(ut_distance), ''),
+       NULLIF(trim(ut_day), ''),
+       CAST(COALESCE(TRY_STRPTIME(trim(ut_day), '%m/%d/%Y'),
+                     TRY_STRPTIME(trim(ut_day) || '/' || $2, '%m/%d/%Y'),
+                     TRY_STRPTIME(trim(ut_day) || '-' || $2, '%d-%b-%Y')) AS DATE),
+       TRY_CAST(ut_group AS INTEGER), TRY_CAST(ut_set AS INTEGER),
+       CASE WHEN status = 'Sold' THEN NULLIF(trim(buyer), '') END,
+       CASE WHEN upper(trim(price)) = 'NOT SOLD' THEN {_MONEY.format('buyer')}
+            ELSE abs({_MONEY.format('price')}) END,
+       status,
+       upper(trim(coalesce(post_sale, ''))) IN ('PS', 'Y'),
+       CAST(TRY_STRPTIME(trim(out_date), '%m/%d/%Y') AS DATE)
+FROM (
+    SELECT *,
+           CASE WHEN upper(trim(buyer)) IN ('OUT', 'WITHDRAWN')
+                  OR upper(trim(price)) = 'OUT'
+                  OR upper(trim(in_out)) IN ('O', 'OUT')            THEN 'Out'
+                WHEN upper(trim(buyer)) = 'RNA'
+                  OR upper(trim(price)) = 'NOT SOLD'
+                  OR {_MONEY.format('price')} < 0                   THEN 'RNA'
+                WHEN {_MONEY.format('price')} > 0                   THEN 'Sold'
+           END AS status
+    FROM obs_raw
+)
+"""
+
+# ---------------------------------------------------------------------------
+# FILES
+# ---------------------------------------------------------------------------
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def sale_year(path: str) -> int:
+    m = YEAR_RE.search(Path(path).as_posix())
+    if m is None:
+        raise ValueError(f"No sale year directory in {path}")
+    return int(m.group(1))
+
+
+def _newline(data: bytes) -> str:
+    """Line terminator as DuckDB's ``new_line`` option spells it."""
+    if b"\r\n" in data:
+        return "\\r\\n"
+    return "\\r" if b"\r" in data else "\\n"
+
+
+def _obs_key(header: str) -> str:
+    return re.sub(r"[\s_]+", "_", header.strip().lower().replace("#", "")).strip("_")
+
+
+def read_obs(path: Path) -> Tuple[pd.DataFrame, List[int]]:
+    """
+    The lot rows of one ``breeze.csv`` as text under the canonical raw
+    column names, plus the hips a trailer note says were changed to RNA.
+    """
+    rows = list(csv.reader(io.StringIO(Path(path).read_text(encoding="utf-8", errors="replace"))))
+    at = next((i for i, r in enumerate(rows) if r and _obs_key(r[0]) in ("hip", "hip_number")), None)
+    if at is None:
+        raise ValueError(f"No hip header row in {path}")
+    names = [_obs_key(h) for h in rows[at]]
+    unknown = [h for h in names if h and h not in OBS_ALIASES and h not in OBS_IGNORED]
+    if unknown:
+        raise ValueError(f"Unknown OBS columns in {path}: {unknown}")
+    take = {i: OBS_ALIASES[h] for i, h in enumerate(names) if h in OBS_ALIASES}
+    sire = next(i for i, c in take.items() if c == "sire")
+
+    lots, trailer = [], []
+    for n, r in enumerate(rows[at + 1:]):
+        r = r + [""] * (len(names) - len(r))
+        withdrawn = any(c.strip().lower() in ("out", "withdrawn") for c in r)
+        if r[0].strip().isdigit() and (r[sire].strip() or withdrawn):
+            lots.append({"row_in_file": n + 1, **{c: r[i] for i, c in take.items()}})
+        elif any(c.strip() for c in r):
+            trailer.append(r)
+    df = pd.DataFrame(lots, columns=["row_in_file"] + OBS_RAW_COLUMNS)
+    df = df.astype({c: "string" for c in OBS_RAW_COLUMNS})    # absent columns stay text
+    return df, _rna_changes(trailer)
+
+
+def _rna_changes(trailer: List[List[str]]) -> List[int]:
+    """Hips listed after the lots as changed to RNA (text note or small table)."""
+    hips: List[int] = []
+    in_rna = in_totals = False
+    for r in trailer:
+        text = " ".join(c.strip() for c in r if c.strip())
+        m = RNA_NOTE_RE.search(text)
+        if m:
+            hips += [int(h) for h in re.findall(r"\d+", m.group(1))]
+        elif not r[0].strip().isdigit():                # a heading row
+            in_rna = in_rna or "rna" in text.lower()
+            in_totals = "total" in text.lower()
+        elif in_rna and not in_totals:
+            hips.append(int(r[0]))
+    return hips
+
+# ---------------------------------------------------------------------------
+# INGEST
+# ---------------------------------------------------------------------------
+def connect(db_path=DEFAULT_DB, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    """Open (and create the tables of) the catalogue database."""
+    if read_only:
+        return duckdb.connect(str(db_path), read_only=True)
+    con = duckdb.connect(str(db_path))
+    con.execute(SCHEMA)
+    return con
+
+
+def _load_file(con, sale: str, table: str, path: Path, year: int, digest: str) -> int:
+    rel = path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else path.as_posix()
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(f"DELETE FROM {table} WHERE sale = ? AND sale_year = ?", [sale, year])
+        if table == "keeneland_lots":
+            con.execute(KEENELAND_INSERT, [sale, year, rel, str(path), KEENELAND_COLUMNS,
+                                           _newline(path.read_bytes())])
+        else:
+            raw, rna = read_obs(path)
+            con.register("obs_raw", raw)
+            con.execute(OBS_INSERT, [sale, year])
+            con.unregister("obs_raw")
+            if rna:
+                con.execute(f"UPDATE obs_breeze SET status = 'RNA', buyer = NULL "
+                            f"WHERE sale = ? AND sale_year = ? AND hip IN "
+                            f"({', '.join('?' * len(rna))})", [sale, year] + rna)
+        n = con.execute(f"SELECT COUNT(*) FROM {table} WHERE sale = ? AND sale_year = ?",
+                        [sale, year]).fetchone()[0]
+        con.execute("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?, now())",
+                    [sale, year, rel, digest, n])
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return n
+
+
+def ingest(db_path=DEFAULT_DB, root=ROOT, force: bool = False) -> List[Tuple[str, int, Optional[int]]]:
+    """
+    Bring the database up to date with every file in ``SOURCES``.  Returns
+    ``(sale, sale_year, rows)`` per file, ``rows`` None when it was skipped
+    (unchanged) and -1 when its partition was dropped (file removed).
+    """
+    con = connect(db_path)
+    done: List[Tuple[str, int, Optional[int]]] = []
+    try:
+        for sale, (table, pattern) in SOURCES.items():
+            known: Dict[int, str] = dict(con.execute(
+                "SELECT sale_year, sha256 FROM ingested_files WHERE sale = ?", [sale]).fetchall())
+            seen = set()
+            for name in sorted(glob.glob(str(Path(root) / pattern))):
+                path = Path(name).resolve()
+                year = sale_year(name)
+                seen.add(year)
+                digest = file_sha256(path)
+                if not force and known.get(year) == digest:
+                    done.append((sale, year, None))
+                    continue
+                done.append((sale, year, _load_file(con, sale, table, path, year, digest)))
+            for year in sorted(set(known) - seen):
+                con.execute(f"DELETE FROM {table} WHERE sale = ? AND sale_year = ?", [sale, year])
+                con.execute("DELETE FROM ingested_files WHERE sale = ? AND sale_year = ?",
+                            [sale, year])
+                done.append((sale, year, -1))
+    finally:
+        con.close()
+    return done
+
+# ---------------------------------------------------------------------------
+# READ
+# ---------------------------------------------------------------------------
+def lots(db_path=DEFAULT_DB) -> pd.DataFrame:
+    """
+    Every Keeneland lot as ``seller_buyer_parse.load_lots`` returns it
+    (catalogue columns, ``filename``, ``sale_year``; ordered by sale year
+    then catalogue), except that ``Price`` is a nullable integer.  Reads
+    what was last ingested; it never loads files itself.
+    """
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"No catalogue database at {db_path}; "
+                                f"build it with `python notebooks/catalog_db.py`")
+    cols = ", ".join(f'"{c}"' for c in KEENELAND_COLUMNS)
+    with duckdb.connect(str(db_path), read_only=True) as con:
+        return con.execute(
+            f"SELECT {cols}, filename, sale_year FROM keeneland_lots "
+            f"ORDER BY sale_year, row_in_file").df()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load the sale catalogues into DuckDB")
+    ap.add_argument("--db", default=str(DEFAULT_DB), help="Database file (default %(default)s)")
+    ap.add_argument("--force", action="store_true", help="Reload files even if unchanged")
+    args = ap.parse_args()
+
+    for sale, year, rows in ingest(args.db, force=args.force):
+        state = "unchanged" if rows is None else "dropped" if rows < 0 else f"{rows:,} rows"
+        print(f"{'·' if rows is None else '✓'} {sale:<24}{year}  {state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+corr_cube.py
+------------
+Correlation‑by‑years‑active answered from precomputed sufficient statistics.
+
+The "Gini vs Median Price Correlation" widget (``notebook.py``,
+``hosted_v1.ipynb``) re‑filters ``sire_data`` and runs
+``groupby("years_active").apply(lambda g: g.gini_coef.corr(g.median_price))``
+on every change of ``foal_min`` / the years‑active slider, and
+``intro_analysis.ipynb`` loops over ``years_active`` building full
+``.corr()`` matrices.  ``CorrCube.build`` does one pass over the sires and
+stores, for every column pair and every (years_active, foals_per_year
+bucket) cell,
+
+    n, Σx, Σy, Σx², Σy², Σxy        over sires where both values are present
+
+already summed over all buckets ≥ b (a suffix sum), so the statistics for
+``foals_per_year ≥ foal_min`` are one index, and a years‑active range is a
+slice of rows.  A redraw is O(years_active × pairs) whatever the number of
+sires.  Pairwise‑complete counting and NaN for fewer than two sires or a
+zero variance follow ``DataFrame.corr``; values are centred on their column
+means before squaring so the sums stay well conditioned.
+
+Buckets are ``BUCKET_WIDTH`` wide, so thresholds that are multiples of it
+(the widgets step by 1) are exact.
+
+Usage
+-----
+cube = CorrCube.build(sire_data)
+cube.corr_by_years_active(foal_min=10, years_range=(1, 7))
+cube.matrices(foal_min=1)                 # {years_active: corr DataFrame}
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_COLUMNS = ["gini_coef", "median_price", "avg_price", "foal_count", "variance_sales"]
+BY = "years_active"
+BUCKET = "foals_per_year"
+BUCKET_WIDTH = 1.0
+ZERO_VARIANCE = 1e-12               # relative; below this a variance counts as zero
+
+N, SX, SY, SXX, SYY, SXY = range(6)
+
+Range = Tuple[int, int]
+
+# ---------------------------------------------------------------------------
+# CUBE
+# ---------------------------------------------------------------------------
+def pearson(stats: np.ndarray) -> np.ndarray:
+    """Pearson r from ``[..., 6]`` sufficient statistics (NaN if undefined)."""
+    n = stats[..., N]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = stats[..., SXY] - stats[..., SX] * stats[..., SY] / n
+        vx = stats[..., SXX] - stats[..., SX] ** 2 / n
+        vy = stats[..., SYY] - stats[..., SY] ** 2 / n
+        r = cov / np.sqrt(vx * vy)
+    undefined = ((n < 2) | (vx <= ZERO_VARIANCE * stats[..., SXX])
+                 | (vy <= ZERO_VARIANCE * stats[..., SYY]))
+    return np.where(undefined, np.nan, np.clip(r, -1.0, 1.0))
+
+
+@dataclass(frozen=True)
+class CorrCube:
+    """Suffix‑summed statistics, shape (years_active, buckets + 1, pairs, 6)."""
+    columns: Tuple[str, ...]
+    years_active: np.ndarray
+    pairs: Tuple[Tuple[int, int], ...]
+    stats: np.ndarray
+
+    @classmethod
+    def build(cls, sire_data: pd.DataFrame,
+              columns: Sequence[str] = DEFAULT_COLUMNS) -> "CorrCube":
+        values = sire_data[list(columns)].to_numpy(dtype=np.float64)
+        values = values - np.nanmean(values, axis=0)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+
+        years_active, row_year = np.unique(sire_data[BY].to_numpy(), return_inverse=True)
+        bucket = np.floor(sire_data[BUCKET].to_numpy(dtype=np.float64) / BUCKET_WIDTH)
+        bucket = np.clip(bucket, 0, None).astype(np.intp)
+        n_buckets = int(bucket.max()) + 1 if len(bucket) else 0
+
+        pairs = tuple(combinations_with_replacement(range(len(columns)), 2))
+        i, j = np.array(pairs, dtype=np.intp).reshape(-1, 2).T
+        both = present[:, i] & present[:, j]
+        x, y = values[:, i] * both, values[:, j] * both
+        rows = np.stack([both.astype(np.float64), x, y, x * x, y * y, x * y], axis=-1)
+
+        cells = np.zeros((len(years_active), n_buckets + 1, len(pairs), 6))
+        np.add.at(cells, (row_year, bucket), rows)
+        stats = cells[:, ::-1].cumsum(axis=1)[:, ::-1]      # Σ over buckets ≥ b
+        return cls(tuple(columns), years_active, pairs, stats)
+
+    # -- queries ------------------------------------------------------------
+    def _at(self, foal_min: float, years_range: Optional[Range]) -> Tuple[np.ndarray, np.ndarray]:
+        b = int(np.clip(np.ceil(foal_min / BUCKET_WIDTH), 0, self.stats.shape[1] - 1))
+        keep = np.ones(len(self.years_active), dtype=bool)
+        if years_range is not None:
+            lo, hi = years_range
+            keep = (self.years_active >= lo) & (self.years_active <= hi)
+        return self.years_active[keep], self.stats[keep, b]
+
+    def _pair(self, x: str, y: str) -> int:
+        i, j = sorted((self.columns.index(x), self.columns.index(y)))
+        return self.pairs.index((i, j))
+
+    def corr_by_years_active(self, foal_min: float = 0,
+                             years_range: Optional[Range] = None,
+                             x: str = "gini_coef", y: str = "median_price") -> pd.DataFrame:
+        """
+        ``years_active`` / ``corr`` rows for sires with ``foals_per_year ≥
+        foal_min``, undefined correlations dropped – the widget's
+        ``corr_by_year``.
+        """
+        years, stats = self._at(foal_min, years_range)
+        corr = pearson(stats[:, self._pair(x, y)])
+        keep = ~np.isnan(corr)
+        return pd.DataFrame({BY: years[keep], "corr": corr[keep]})
+
+    def matrices(self, foal_min: float = 0,
+                 years_range: Optional[Range] = None) -> Dict[int, pd.DataFrame]:
+        """Full ``.corr()`` matrix of ``columns`` per years_active."""
+        years, stats = self._at(foal_min, years_range)
+        r = pearson(stats)
+        k = len(self.columns)
+        out: Dict[int, pd.DataFrame] = {}
+        for row, year in enumerate(years):
+            m = np.full((k, k), np.nan)
+            for p, (i, j) in enumerate(self.pairs):
+                m[i, j] = m[j, i] = 1.0 if i == j and not np.isnan(r[row, p]) else r[row, p]
+            out[int(year)] = pd.DataFrame(m, index=list(self.columns), columns=list(self.columns))
+        return out
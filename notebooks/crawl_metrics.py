@@ -0,0 +1,306 @@
+"""
+crawl_metrics.py
+----------------
+Counters and latency histograms for the crawl engine (crawler.py).
+
+The scrapers only reported progress through ``print`` / ``log.info`` lines
+and ``Crawler.get`` gave up after ``tries`` attempts with one warning, so a
+slow crawl could not be pinned on throttling, the server or the parser.
+``Crawler`` now records, per host and URL class (``URL_CLASSES``: search,
+redirect probe, auctions page, other):
+
+    request latency      histogram of the network fetch of each attempt
+    responses            count by status code
+    retries / failures   count by status code or exception name
+    bytes                response bodies received
+    cache                fresh / offline / revalidated hits, stale and miss
+    sleep vs fetch       seconds waiting on the host's token bucket /
+                         in‑flight cap ("throttle"), in backoff ("backoff"),
+                         and inside the HTTP call ("fetch")
+
+and the scrapers time each extractor call with ``metrics.parsing(kind)``.
+``Crawler.close`` writes the lot as a JSON summary (``--metrics-json``,
+on by default) and, with ``--metrics-prom``, in the Prometheus text format
+for a node‑exporter textfile collector, and logs a one‑line digest.
+
+Usage
+-----
+metrics = CrawlMetrics(json_path="crawl_metrics.json")
+crawler = Crawler(metrics=metrics)
+with metrics.parsing("auctions"):
+    fees = stud_fee_from_weanlings(html)
+crawler.close()                        # -> crawl_metrics.json
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_JSON_PATH = "crawl_metrics.json"
+URL_CLASSES = [                                  # first match wins
+    ("redirect_probe", re.compile(r"/stallion-register/stallions/0/")),
+    ("auctions", re.compile(r"/stallion-register/stallions/\d+/[^/]+/auctions/\d{4}")),
+    ("search", re.compile(r"/stallion-register/(search|results)\?|google\.\w+/search\?")),
+]
+OTHER_CLASS = "other"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)     # seconds
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+log = logging.getLogger(__name__)
+
+Key = Tuple[str, ...]
+
+
+def url_class(url: str) -> str:
+    """``URL_CLASSES`` name of ``url`` (``"other"`` when none matches)."""
+    for name, pattern in URL_CLASSES:
+        if pattern.search(url):
+            return name
+    return OTHER_CLASS
+
+
+def url_labels(url: str) -> Tuple[str, str]:
+    """(host, url class) – the labels every request metric carries."""
+    return urlsplit(url).netloc.lower(), url_class(url)
+
+# ---------------------------------------------------------------------------
+# HISTOGRAM
+# ---------------------------------------------------------------------------
+class Histogram:
+    """Fixed‑bucket histogram (Prometheus ``le`` semantics, +Inf implied)."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket (as PromQL)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, c in zip(self.bounds + (float("inf"),), self.counts):
+            if seen + c >= rank and c:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / c
+            seen += c
+            lower = bound
+        return lower
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count, "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5), "p95": self.quantile(0.95),
+            "buckets": {_le(b): n for b, n in zip(self.bounds + (float("inf"),),
+                                                  self.cumulative())},
+        }
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+# ---------------------------------------------------------------------------
+# METRICS
+# ---------------------------------------------------------------------------
+class CrawlMetrics:
+    """Thread‑safe metrics for one crawl run."""
+
+    def __init__(self, json_path: Optional[str] = None, prom_path: Optional[str] = None):
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.latency: Dict[Key, Histogram] = {}
+        self.parse: Dict[str, Histogram] = {}
+        self.responses: Dict[Key, int] = defaultdict(int)     # host, class, status
+        self.retries: Dict[Key, int] = defaultdict(int)       # host, class, reason
+        self.failures: Dict[Key, int] = defaultdict(int)      # host, class, reason
+        self.bytes: Dict[Key, int] = defaultdict(int)         # host, class
+        self.cache: Dict[Key, int] = defaultdict(int)         # host, class, result
+        self.seconds: Dict[Key, float] = defaultdict(float)   # host, kind
+
+    # -- recording ----------------------------------------------------------
+    def request(self, url: str, seconds: float, status: int, nbytes: int) -> None:
+        """One attempt that got an HTTP response."""
+        host, cls = url_labels(url)
+        with self._lock:
+            hist = self.latency.get((host, cls))
+            if hist is None:
+                hist = self.latency[(host, cls)] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            self.responses[(host, cls, str(status))] += 1
+            self.bytes[(host, cls)] += nbytes
+            self.seconds[(host, "fetch")] += seconds
+
+    def error(self, url: str, seconds: float) -> None:
+        """One attempt that raised before a response arrived."""
+        host, _ = url_labels(url)
+        with self._lock:
+            self.seconds[(host, "fetch")] += seconds
+
+    def retry(self, url: str, reason: str) -> None:
+        host, cls = url_labels(url)
+        with self._lock:
+            self.retries[(host, cls, reason)] += 1
+
+    def failure(self, url: str, reason: str) -> None:
+        """``url`` given up on after the last attempt."""
+        host, cls = url_labels(url)
+        with self._lock:
+            self.failures[(host, cls, reason)] += 1
+
+    def slept(self, url: str, kind: str, seconds: float) -> None:
+        """Time not spent fetching: ``kind`` is "throttle" or "backoff"."""
+        host, _ = url_labels(url)
+        with self._lock:
+            self.seconds[(host, kind)] += seconds
+
+    def cache_result(self, url: str, result: str) -> None:
+        host, cls = url_labels(url)
+        with self._lock:
+            self.cache[(host, cls, result)] += 1
+
+    @contextmanager
+    def parsing(self, kind: str) -> Iterator[None]:
+        """Time the block as one parse of a ``kind`` page."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                hist = self.parse.get(kind)
+                if hist is None:
+                    hist = self.parse[kind] = Histogram(PARSE_BUCKETS)
+                hist.observe(elapsed)
+
+    # -- reporting ----------------------------------------------------------
+    def summary(self) -> Dict[str, object]:
+        """Everything recorded so far as plain JSON‑able data."""
+        def nest(counts: Dict[Key, float]) -> Dict[str, object]:
+            out: Dict[str, object] = {}
+            for key, v in sorted(counts.items()):
+                node = out
+                for part in key[:-1]:
+                    node = node.setdefault(part, {})
+                node[key[-1]] = round(v, 6) if isinstance(v, float) else v
+            return out
+
+        with self._lock:
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "elapsed_s": round(time.time() - self.started, 3),
+                "latency_s": nest({k: h.as_dict() for k, h in self.latency.items()}),
+                "responses": nest(self.responses),
+                "retries": nest(self.retries),
+                "failures": nest(self.failures),
+                "bytes": nest(self.bytes),
+                "cache": nest(self.cache),
+                "seconds": nest(self.seconds),
+                "parse_s": {k: h.as_dict() for k, h in sorted(self.parse.items())},
+            }
+
+    def digest(self) -> str:
+        """One line: where the wall‑clock time of the crawl went."""
+        with self._lock:
+            n = sum(h.count for h in self.latency.values())
+            by_kind: Dict[str, float] = defaultdict(float)
+            for (_, kind), s in self.seconds.items():
+                by_kind[kind] += s
+            parse = sum(h.sum for h in self.parse.values())
+            return (f"{n} requests, {sum(self.bytes.values()) / 1e6:.1f} MB, "
+                    f"{sum(self.retries.values())} retries, "
+                    f"{sum(self.failures.values())} failures, "
+                    f"{sum(self.cache.values())} cache lookups; "
+                    f"fetch {by_kind['fetch']:.1f}s, throttle {by_kind['throttle']:.1f}s, "
+                    f"backoff {by_kind['backoff']:.1f}s, parse {parse:.1f}s")
+
+    def prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_: str) -> None:
+            lines.extend([f"# HELP {name} {help_}", f"# TYPE {name} {kind}"])
+
+        def labels(**kv: str) -> str:
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in kv.items()) + "}"
+
+        def histogram(name: str, hist: Histogram, **kv: str) -> None:
+            for b, n in zip(hist.bounds + (float("inf"),), hist.cumulative()):
+                lines.append(f"{name}_bucket{labels(**kv, le=_le(b))} {n}")
+            lines.append(f"{name}_sum{labels(**kv)} {hist.sum:.6f}")
+            lines.append(f"{name}_count{labels(**kv)} {hist.count}")
+
+        with self._lock:
+            family("crawl_request_duration_seconds", "histogram",
+                   "Network time of each request attempt.")
+            for (host, cls), hist in sorted(self.latency.items()):
+                histogram("crawl_request_duration_seconds", hist, host=host, url_class=cls)
+            for name, counts, label, help_ in (
+                    ("crawl_responses_total", self.responses, "status", "Responses by status code."),
+                    ("crawl_retries_total", self.retries, "reason", "Attempts retried, by cause."),
+                    ("crawl_failures_total", self.failures, "reason", "URLs given up on, by last cause."),
+                    ("crawl_cache_lookups_total", self.cache, "result", "Response cache lookups.")):
+                family(name, "counter", help_)
+                for (host, cls, value), n in sorted(counts.items()):
+                    lines.append(f"{name}{labels(host=host, url_class=cls, **{label: value})} {n}")
+            family("crawl_response_bytes_total", "counter", "Response body bytes received.")
+            for (host, cls), n in sorted(self.bytes.items()):
+                lines.append(f"crawl_response_bytes_total{labels(host=host, url_class=cls)} {n}")
+            family("crawl_time_seconds_total", "counter",
+                   "Seconds fetching, waiting on the rate limiter and in backoff.")
+            for (host, kind), s in sorted(self.seconds.items()):
+                lines.append(f"crawl_time_seconds_total{labels(host=host, kind=kind)} {s:.6f}")
+            family("crawl_parse_duration_seconds", "histogram", "Extractor time per page.")
+            for kind, hist in sorted(self.parse.items()):
+                histogram("crawl_parse_duration_seconds", hist, page=kind)
+            family("crawl_run_elapsed_seconds", "gauge", "Wall‑clock time of the run so far.")
+            lines.append(f"crawl_run_elapsed_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Write the JSON summary / Prometheus file (atomically) and log a digest."""
+        if self.json_path:
+            _atomic_write(self.json_path, json.dumps(self.summary(), indent=2) + "\n")
+        if self.prom_path:
+            _atomic_write(self.prom_path, self.prometheus())
+        log.info("crawl: %s", self.digest())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path, text: str) -> None:
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
@@ -0,0 +1,351 @@
+"""
+crawler.py
+----------
+Shared, host‑rate‑limited HTTP crawl engine for the BloodHorse scrapers.
+
+Replaces the per‑script ``polite_get`` helpers (and their serial
+``time.sleep`` after every page) with one engine whose throughput is set by
+an explicit politeness budget:
+
+    • a token bucket per host  (``rate`` requests/second, ``burst`` tokens)
+    • a cap on in‑flight requests per host  (``max_in_flight``)
+    • jittered exponential backoff on network errors / 429 / 5xx,
+      honouring ``Retry-After`` when the server sends one
+    • a bounded thread pool so independent pages are fetched concurrently
+    • an optional on‑disk ``ResponseCache`` (response_cache.py): fresh hits
+      never touch the network, stale ones are revalidated conditionally
+    • an optional append‑only ``PageArchive`` (page_archive.py) of every
+      HTTP 200 body, so pages can be re‑parsed offline (reparse_fees.py)
+    • ``CrawlMetrics`` (crawl_metrics.py): latency, retries, failures, bytes,
+      cache results and throttle / backoff / fetch time per host and URL
+      class, written as a JSON summary when the crawler is closed
+
+Typical use
+-----------
+    crawler = Crawler(rate=1.0, max_in_flight=2)
+    html = crawler.get_text(url)                 # one page
+    pages = crawler.get_many_text(urls)          # list, same order as urls
+
+Nothing here is BloodHorse specific, so it can be pointed at a local stub
+server (``python -m http.server``) to exercise the limiter and backoff.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from crawl_metrics import DEFAULT_JSON_PATH, CrawlMetrics
+from page_archive import DEFAULT_ARCHIVE_DIR, PageArchive
+from response_cache import CachedPage, ResponseCache
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    )
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RATE = 1.0          # requests / second / host
+DEFAULT_BURST = 2           # tokens a host may bank while idle
+DEFAULT_IN_FLIGHT = 2       # concurrent requests / host
+DEFAULT_WORKERS = 8         # thread‑pool size (shared by all hosts)
+DEFAULT_CACHE_DIR = "http_cache"
+
+log = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# RATE LIMITING
+# ---------------------------------------------------------------------------
+class TokenBucket:
+    """Thread‑safe token bucket: ``rate`` tokens/s, at most ``burst`` banked."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; return seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class HostLimiter:
+    """Token bucket + in‑flight semaphore for a single host."""
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(max(1, int(max_in_flight)))
+
+    def __enter__(self) -> "HostLimiter":
+        self.slots.acquire()
+        self.bucket.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.slots.release()
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full‑jitter exponential backoff for the given 0‑based attempt."""
+    return random.uniform(0.5, 1.5) * min(cap, base * (2 ** attempt))
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+def _as_response(page: CachedPage) -> requests.Response:
+    """Rehydrate a cached page into a ``requests.Response``."""
+    resp = requests.Response()
+    resp.url = page.url
+    resp.status_code = page.status
+    resp._content = page.body
+    resp.encoding = "utf-8"
+    if page.location:
+        resp.headers["Location"] = page.location
+    return resp
+
+# ---------------------------------------------------------------------------
+# CRAWLER
+# ---------------------------------------------------------------------------
+class Crawler:
+    """
+    Concurrent fetcher with a per‑host politeness budget.
+
+    ``get`` returns the final ``requests.Response`` (any non‑retryable status,
+    including redirects when ``allow_redirects=False``) or None once ``tries``
+    attempts are exhausted.  ``get_text`` is the old ``polite_get`` contract:
+    body text on HTTP 200, otherwise None.
+
+    With a ``cache`` attached, fresh entries are served from disk and stale
+    ones are revalidated; ``offline=True`` serves whatever is cached (fresh
+    or not) and never goes to the network.
+
+    With an ``archive`` attached, every HTTP 200 body returned (from the
+    network or the cache) is appended to it unless already archived.
+
+    Every lookup and attempt is recorded in ``metrics`` (a fresh
+    ``CrawlMetrics`` if none is given); ``close`` writes its reports.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_in_flight: int = DEFAULT_IN_FLIGHT,
+                 workers: int = DEFAULT_WORKERS, tries: int = 3,
+                 timeout: int = 12, backoff_base: float = 1.0,
+                 headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[ResponseCache] = None, offline: bool = False,
+                 metrics: Optional[CrawlMetrics] = None,
+                 archive: Optional[PageArchive] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.workers = max(1, int(workers))
+        self.tries = tries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.headers = dict(headers or HEADERS)
+        self.cache = cache
+        self.offline = offline
+        self.metrics = metrics if metrics is not None else CrawlMetrics()
+        self.archive = archive
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._limiters_lock = threading.Lock()
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # -- plumbing -----------------------------------------------------------
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc.lower()
+        with self._limiters_lock:
+            lim = self._limiters.get(host)
+            if lim is None:
+                lim = HostLimiter(self.rate, self.burst, self.max_in_flight)
+                self._limiters[host] = lim
+            return lim
+
+    def _session(self) -> requests.Session:
+        sess = getattr(self._local, "session", None)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update(self.headers)
+            self._local.session = sess
+        return sess
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="crawl")
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+        self.metrics.write()
+
+    def __enter__(self) -> "Crawler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- fetching -----------------------------------------------------------
+    def get(self, url: str, allow_redirects: bool = True) -> Optional[requests.Response]:
+        """Rate‑limited GET with jittered backoff on transient failures."""
+        resp = self._get(url, allow_redirects)
+        if self.archive is not None and resp is not None and resp.status_code == 200:
+            self.archive.append(url, resp.content)
+        return resp
+
+    def _get(self, url: str, allow_redirects: bool) -> Optional[requests.Response]:
+        metrics = self.metrics
+        cached = (self.cache.lookup(url, allow_redirects)
+                  if self.cache is not None else None)
+        if cached is not None and (cached.fresh or self.offline):
+            log.debug("CACHE %s", url)
+            metrics.cache_result(url, "fresh" if cached.fresh else "offline")
+            return _as_response(cached)
+        if self.cache is not None:
+            metrics.cache_result(url, "miss" if cached is None else "stale")
+        if self.offline:
+            return None
+        conditional = cached.validators() if cached is not None else {}
+
+        limiter = self._limiter(url)
+        reason = "error"
+        for attempt in range(self.tries):
+            delay = None
+            t_queued = time.monotonic()
+            try:
+                with limiter:
+                    t_sent = time.monotonic()
+                    metrics.slept(url, "throttle", t_sent - t_queued)
+                    log.debug("GET %s", url)
+                    try:
+                        resp = self._session().get(url, timeout=self.timeout,
+                                                   headers=conditional,
+                                                   allow_redirects=allow_redirects)
+                    except requests.RequestException:
+                        metrics.error(url, time.monotonic() - t_sent)
+                        raise
+                    metrics.request(url, time.monotonic() - t_sent, resp.status_code,
+                                    len(resp.content))
+                if resp.status_code == 304 and cached is not None:
+                    metrics.cache_result(url, "revalidated")
+                    self.cache.touch(url, allow_redirects)
+                    return _as_response(cached)
+                if resp.status_code not in RETRY_STATUSES:
+                    if self.cache is not None:
+                        self.cache.store(url, resp.status_code, resp.content,
+                                         resp.headers, allow_redirects)
+                    return resp
+                log.debug("  Status %s on attempt %d", resp.status_code, attempt + 1)
+                reason = str(resp.status_code)
+                delay = _retry_after(resp)
+            except requests.RequestException as e:
+                log.debug("  Request error %s on attempt %d", e, attempt + 1)
+                reason = type(e).__name__
+            if attempt + 1 < self.tries:
+                metrics.retry(url, reason)
+                delay = delay if delay is not None else backoff_delay(attempt, self.backoff_base)
+                metrics.slept(url, "backoff", delay)
+                time.sleep(delay)
+        metrics.failure(url, reason)
+        log.warning("  Failed to fetch %s after %d tries (%s)", url, self.tries, reason)
+        return None
+
+    def get_text(self, url: str) -> Optional[str]:
+        """Body text on HTTP 200, otherwise None."""
+        resp = self.get(url)
+        if resp is None or resp.status_code != 200:
+            return None
+        return resp.text
+
+    def get_many(self, urls: Iterable[str],
+                 allow_redirects: bool = True) -> List[Optional[requests.Response]]:
+        """Fetch ``urls`` concurrently; results keep the input order."""
+        urls = list(urls)
+        if len(urls) <= 1 or self.workers == 1:
+            return [self.get(u, allow_redirects) for u in urls]
+        return list(self._executor().map(
+            lambda u: self.get(u, allow_redirects), urls))
+
+    def get_many_text(self, urls: Iterable[str]) -> List[Optional[str]]:
+        """Concurrent ``get_text``; results keep the input order."""
+        return [r.text if r is not None and r.status_code == 200 else None
+                for r in self.get_many(urls)]
+
+
+def add_crawler_args(ap) -> None:
+    """Register the politeness‑budget flags on an argparse parser."""
+    grp = ap.add_argument_group("crawl budget")
+    grp.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                     help="Requests per second per host (default %(default)s)")
+    grp.add_argument("--burst", type=int, default=DEFAULT_BURST,
+                     help="Token‑bucket burst size per host (default %(default)s)")
+    grp.add_argument("--max-in-flight", type=int, default=DEFAULT_IN_FLIGHT,
+                     help="Concurrent requests per host (default %(default)s)")
+    grp.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                     help="Fetch thread‑pool size (default %(default)s)")
+    grp.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                     help="On‑disk response cache (default %(default)s)")
+    grp.add_argument("--no-cache", action="store_true",
+                     help="Always hit the network, never read/write the cache")
+    grp.add_argument("--offline", action="store_true",
+                     help="Serve only from the cache (e.g. after a parser fix)")
+    grp.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE_DIR, default=None,
+                     help="Also keep every page in an append‑only archive for "
+                          "offline re‑parsing (reparse_fees.py); off unless given "
+                          f"(bare flag: {DEFAULT_ARCHIVE_DIR})")
+    grp.add_argument("--metrics-json", default=DEFAULT_JSON_PATH,
+                     help="Crawl metrics summary written at the end "
+                          "(default %(default)s; '' to skip)")
+    grp.add_argument("--metrics-prom",
+                     help="Also write the metrics in Prometheus text format here")
+
+
+def crawler_from_args(args, **kwargs) -> Crawler:
+    """Build a Crawler from the flags registered by ``add_crawler_args``."""
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    metrics = CrawlMetrics(json_path=args.metrics_json or None,
+                           prom_path=args.metrics_prom)
+    archive = PageArchive(args.archive) if args.archive else None
+    return Crawler(rate=args.rate, burst=args.burst,
+                   max_in_flight=args.max_in_flight, workers=args.workers,
+                   cache=cache, offline=args.offline, metrics=metrics,
+                   archive=archive, **kwargs)
+
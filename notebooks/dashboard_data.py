@@ -0,0 +1,166 @@
+"""
+dashboard_data.py
+-----------------
+Data‑access layer for the Streamlit dashboard (``hosted.py``).
+
+Streamlit re‑executes the whole script on every widget interaction, so any
+work done at the top level – loading tables, ``sorted(...unique())`` sire
+lists, the 95th‑percentile cut, every filtered frame – is repeated per click
+and per user.  This module moves that work behind Streamlit's caches:
+
+    tables()       st.cache_resource   the Parquet tables, loaded once per
+                                        process and shared by every session
+    lookups()      st.cache_resource   sire lists, quantile, slider bounds
+    table_query()  st.cache_resource   DuckDB reader over all_data.parquet
+    box_figure()   st.cache_data       filtered frames / figures / table
+    scatter_frame()                    pages, memoised on the normalised
+    table_page()                       filter tuple with bounded LRU
+                                       eviction (``MAX_ENTRIES``)
+
+Filters are normalised before they reach the cache (sire / status selections
+sorted and de‑duplicated, ranges as int tuples), so the same selection made
+in a different order – or by another user – hits the same entry.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from box_summary import box_figure as summary_box_figure
+from data_store import load_table, table_path
+from table_query import DEFAULT_PAGE_SIZE, TableFilters, TableQuery
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+TABLE_COLUMNS = {
+    "only_sold": ["Sire", "Description", "Price", "sale_year", "Purchaser"],
+    "sire_data": ["Sire", "gini_coef", "median_price", "foals_per_year", "years_active"],
+    "all_data":  ["Sire", "sale_year", "status"],
+}
+MAX_ENTRIES = 256                   # memoised filter results kept per function
+TOP_QUANTILE = 0.95                 # "Excluding >95th Percentile" cut
+
+Range = Tuple[int, int]
+Selection = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Lookups:
+    """Per‑process constants derived from the tables."""
+    box_sires: List[str]
+    scatter_sires: List[str]
+    table_sires: List[str]
+    statuses: List[str]
+    price_cut: float                # TOP_QUANTILE of sold prices
+    price_bounds: Range
+    year_bounds: Range
+    years_active_bounds: Range
+
+# ---------------------------------------------------------------------------
+# SHARED RESOURCES
+# ---------------------------------------------------------------------------
+@st.cache_resource
+def tables() -> Dict[str, pd.DataFrame]:
+    """Every dashboard table, projected to the columns the views use."""
+    return {name: load_table(name, cols) for name, cols in TABLE_COLUMNS.items()}
+
+
+@st.cache_resource
+def table_query() -> TableQuery:
+    """Paged reads of ``all_data`` straight from Parquet (see ``table_query``)."""
+    return TableQuery(table_path("all_data"))
+
+
+def _bounds(s: pd.Series) -> Range:
+    return int(s.min()), int(s.max())
+
+
+@st.cache_resource
+def lookups() -> Lookups:
+    t = tables()
+    only_sold, sire_data, all_data = t["only_sold"], t["sire_data"], t["all_data"]
+    return Lookups(
+        box_sires=sorted(only_sold["Sire"].unique()),
+        scatter_sires=sorted(sire_data["Sire"].unique()),
+        table_sires=sorted(all_data["Sire"].unique()),
+        statuses=list(all_data["status"].cat.categories),
+        price_cut=float(only_sold["Price"].quantile(TOP_QUANTILE)),
+        price_bounds=_bounds(only_sold["Price"]),
+        year_bounds=_bounds(only_sold["sale_year"]),
+        years_active_bounds=_bounds(sire_data["years_active"]),
+    )
+
+# ---------------------------------------------------------------------------
+# FILTER NORMALISATION
+# ---------------------------------------------------------------------------
+def selection(values: Optional[Iterable[str]]) -> Selection:
+    """Order‑independent cache key for a multiselect value."""
+    return tuple(sorted(set(values or ())))
+
+
+def int_range(values) -> Range:
+    lo, hi = values
+    return int(lo), int(hi)
+
+# ---------------------------------------------------------------------------
+# MEMOISED VIEWS
+# ---------------------------------------------------------------------------
+@st.cache_data(max_entries=MAX_ENTRIES)
+def _box_frame(exclude_top: bool, sires: Selection) -> pd.DataFrame:
+    df = tables()["only_sold"]
+    if exclude_top:
+        df = df[df.Price <= lookups().price_cut]
+    if sires:
+        df = df[df["Sire"].isin(sires)]
+    return df
+
+
+def box_frame(exclude_top: bool, sires=None) -> pd.DataFrame:
+    """Sold lots for the yearly box plot."""
+    return _box_frame(bool(exclude_top), selection(sires))
+
+
+@st.cache_data(max_entries=MAX_ENTRIES)
+def _box_figure(exclude_top: bool, sires: Selection) -> go.Figure:
+    return summary_box_figure(_box_frame(exclude_top, sires))
+
+
+def box_figure(exclude_top: bool, sires=None) -> go.Figure:
+    """Yearly box plot (precomputed quartiles; see ``box_summary``)."""
+    return _box_figure(bool(exclude_top), selection(sires))
+
+
+@st.cache_data(max_entries=MAX_ENTRIES)
+def _scatter_frame(foal_min: int, years_active: Range, sires: Selection) -> pd.DataFrame:
+    sire_data = tables()["sire_data"]
+    lo, hi = years_active
+    df = sire_data[(sire_data.foals_per_year >= foal_min)
+                   & (sire_data.years_active.between(lo, hi))]
+    if sires:
+        df = df[df["Sire"].isin(sires)]
+    return df
+
+
+def scatter_frame(foal_min, years_active, sires=None) -> pd.DataFrame:
+    """Sire summary rows for the performance scatter."""
+    return _scatter_frame(int(foal_min), int_range(years_active), selection(sires))
+
+
+@st.cache_data(max_entries=MAX_ENTRIES)
+def _table_page(filters: TableFilters, page: int, page_size: int,
+                sort_by: Optional[str], descending: bool) -> Tuple[pd.DataFrame, int]:
+    return table_query().page(filters, page, page_size, sort_by, descending)
+
+
+def table_page(sires, price_range, year_range, statuses, page: int = 0,
+               page_size: int = DEFAULT_PAGE_SIZE, sort_by: Optional[str] = None,
+               descending: bool = False) -> Tuple[pd.DataFrame, int]:
+    """``(rows, total)`` for one page of the interactive data table."""
+    filters = TableFilters(selection(sires), int_range(price_range),
+                           int_range(year_range), selection(statuses))
+    return _table_page(filters, int(page), int(page_size), sort_by or None, bool(descending))
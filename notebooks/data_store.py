@@ -0,0 +1,141 @@
+"""
+data_store.py
+-------------
+Typed Parquet copies of the CSV tables the dashboards load.
+
+``hosted.py`` (Streamlit) and ``notebook.py`` / ``hosted_v1.ipynb`` (voila)
+used to re‑parse ``only_sold.csv``, ``sire_data.csv`` and ``all_data.csv``
+with ``pd.read_csv`` on every start / rerun.  ``build_store`` writes each
+table once as Parquet with compact dtypes:
+
+    Sire, Purchaser, status   category
+    sale_year, years_active   int16
+    Price, *_price, …         float32
+
+and ``load_table`` reads it back with column projection (only the columns a
+view needs are decoded) and, by default, memory‑mapped I/O.
+
+``all_data.csv`` is every catalogued lot (sold, RNA, out) with a numeric
+``Price`` and the ``status`` column, as written by ``intro_analysis.ipynb``.
+It is not checked in, so when it is missing the store derives the same table
+from the raw Keeneland ``lots.csv`` files with ``sale_status.classify_status``.
+
+``sire_panel`` (``sire_panel.sire_panel``: per (Sire, sale_year) metrics
+with lags and rolling windows) has no CSV of its own and is derived from
+``only_sold.csv``.
+
+``load_table`` rebuilds a table whose Parquet file is missing or older than
+its CSV, so a fresh checkout works without running the build first; the
+Docker image runs it at build time.
+
+Usage
+-----
+python notebooks/data_store.py                 # -> notebooks/parquet/*.parquet
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from sale_status import STATUS_DTYPE, classify_status
+from seller_buyer_parse import load_lots
+from sire_panel import sire_panel
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+DATA_DIR = Path(__file__).resolve().parent
+STORE_DIR = DATA_DIR / "parquet"
+LOTS = str(DATA_DIR.parent / "data" / "keeneland" / "sept-yearling" / "*" / "lots.csv")
+TABLES = ["only_sold", "sire_data", "all_data", "sire_panel"]
+SOURCES = {"sire_panel": "only_sold"}               # derived table -> source CSV
+
+CATEGORY_COLUMNS = ["Sire", "Purchaser"]
+INT16_COLUMNS = ["sale_year", "years_active"]
+FLOAT32_COLUMNS = ["Price", "median_price", "avg_price", "gini_coef", "foals_per_year"]
+READ_DTYPES = {"Hip": str, "status": STATUS_DTYPE}   # keep leading zeros in Hip
+
+# ---------------------------------------------------------------------------
+# BUILD
+# ---------------------------------------------------------------------------
+def _all_data_from_lots() -> pd.DataFrame:
+    """Rebuild ``all_data`` the way ``intro_analysis.ipynb`` does."""
+    df = load_lots(LOTS)
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    df["status"] = classify_status(df["Purchaser"])
+    return df
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop the unnamed index column ``to_csv`` left behind and narrow dtypes."""
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+    for col in df.columns.intersection(CATEGORY_COLUMNS):
+        df[col] = df[col].astype("category")
+    for col in df.columns.intersection(INT16_COLUMNS):
+        df[col] = df[col].astype("int16")
+    for col in df.columns.intersection(FLOAT32_COLUMNS):
+        df[col] = df[col].astype("float32")
+    return df
+
+
+def build_table(name: str, data_dir=DATA_DIR, store_dir=STORE_DIR) -> Path:
+    """Write ``<store_dir>/<name>.parquet`` from its CSV.  Returns the path."""
+    data_dir, store_dir = Path(data_dir), Path(store_dir)
+    csv = data_dir / f"{SOURCES.get(name, name)}.csv"
+    if name == "all_data" and not csv.exists():
+        df = _all_data_from_lots()
+    elif name == "sire_panel":
+        df = sire_panel(pd.read_csv(csv, usecols=["Sire", "sale_year", "Price"]))
+    else:
+        df = pd.read_csv(csv, dtype=READ_DTYPES)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    path = store_dir / f"{name}.parquet"
+    tmp = path.with_name(path.name + ".tmp")
+    _typed(df).to_parquet(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+
+def build_store(data_dir=DATA_DIR, store_dir=STORE_DIR) -> Dict[str, Path]:
+    """Rebuild every table."""
+    return {name: build_table(name, data_dir, store_dir) for name in TABLES}
+
+
+def is_stale(name: str, data_dir=DATA_DIR, store_dir=STORE_DIR) -> bool:
+    """True if the Parquet copy is missing or older than its CSV."""
+    path = Path(store_dir) / f"{name}.parquet"
+    csv = Path(data_dir) / f"{SOURCES.get(name, name)}.csv"
+    return not path.exists() or (csv.exists() and csv.stat().st_mtime > path.stat().st_mtime)
+
+# ---------------------------------------------------------------------------
+# LOAD
+# ---------------------------------------------------------------------------
+def table_path(name: str, store_dir=STORE_DIR) -> Path:
+    """Path of an up‑to‑date Parquet copy of ``name`` (rebuilt if stale)."""
+    if is_stale(name, store_dir=store_dir):
+        build_table(name, store_dir=store_dir)
+    return Path(store_dir) / f"{name}.parquet"
+
+
+def load_table(name: str, columns: Optional[List[str]] = None,
+               memory_map: bool = True, store_dir=STORE_DIR) -> pd.DataFrame:
+    """Read one table, decoding only ``columns`` (all when None)."""
+    return pd.read_parquet(table_path(name, store_dir), columns=columns,
+                           memory_map=memory_map)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write the dashboard tables as typed Parquet")
+    ap.add_argument("--data-dir", default=str(DATA_DIR), help="Directory holding the CSVs")
+    ap.add_argument("--out-dir", default=str(STORE_DIR), help="Directory for the .parquet files")
+    args = ap.parse_args()
+
+    for name, path in build_store(args.data_dir, args.out_dir).items():
+        print(f"✓ {name:<10} -> {path}  ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
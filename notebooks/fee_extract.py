@@ -0,0 +1,158 @@
+"""
+fee_extract.py
+--------------
+Fast extractors for BloodHorse pages.
+
+The scrapers used to build a full BeautifulSoup tree for every page just to
+read one ``<li>`` (auctions pages) or the first stallion link (search pages).
+Auctions pages run to thousands of lines of scripts and tables
+(see ``response.txt``), but the Weanlings stud fee sits in the first few
+percent of the document.
+
+    stud_fee_from_weanlings(html)   streaming lxml pull‑parse with early exit;
+                                    stops as soon as the Weanlings pane's
+                                    "YYYY Stud Fee" item has been read
+    first_stallion_link(html)       regex scan of <a href> attributes, stops
+                                    at the first stallion‑register link
+
+Both return exactly what the BeautifulSoup versions return; the originals are
+kept here as ``*_soup`` reference implementations, and
+``benchmarks/bench_fee_extract.py`` checks parity on ``response.txt`` before
+timing old vs new.
+"""
+from __future__ import annotations
+
+import html as html_lib
+import re
+from typing import Dict, Optional, Tuple
+
+from lxml import etree
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+WEANLINGS_RE = re.compile(r"\bWeanlings\b", re.I)
+FEE_LI_RE = re.compile(r"^\d{4}\s+Stud\s+Fee", re.I)
+FEE_TEXT_RE = re.compile(r"(?P<yr>\d{4})\s+Stud\s+Fee:\s+\$(?P<amt>[\d,]+)")
+STALLION_HREF_RE = re.compile(r'/stallion-register/stallions/(\d{6})/([^/"?#]+)')
+A_HREF_RE = re.compile(r"""<a\s[^>]*?\bhref\s*=\s*(["'])(.*?)\1""", re.I | re.S)
+CHUNK = 16 * 1024                      # bytes fed to the pull parser per step
+
+# ---------------------------------------------------------------------------
+# AUCTIONS PAGE – WEANLINGS STUD FEE
+# ---------------------------------------------------------------------------
+def _only_string(el) -> Optional[str]:
+    """
+    lxml equivalent of BeautifulSoup's ``tag.string``: the text of an element
+    whose only content is one string, possibly wrapped in single‑child tags.
+    """
+    while True:
+        children = [c for c in el if isinstance(c.tag, str)]
+        if not children:
+            return el.text
+        if len(children) > 1 or el.text or children[0].tail:
+            return None
+        el = children[0]
+
+
+def _has_class(el, name: str) -> bool:
+    return name in (el.get("class") or "").split()
+
+
+def _fee_from_li(li) -> Dict[int, int]:
+    m = FEE_TEXT_RE.match("".join(li.itertext()))
+    if not m:
+        return {}
+    return {int(m.group("yr")): int(m.group("amt").replace(",", ""))}
+
+
+def stud_fee_from_weanlings(html: str) -> Dict[int, int]:
+    """
+    Return {stud_fee_year: stud_fee_usd} for the Weanlings tab only.
+
+    Same result as ``stud_fee_from_weanlings_soup`` but the body is fed to an
+    lxml pull parser in chunks and parsing stops at the answer.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    weanlings_ul = None     # <ul class="tabs"> holding the Weanlings <li>
+    pane = None             # its next sibling <div class="contentBlock">
+    for pos in range(0, len(html), CHUNK):
+        parser.feed(html[pos:pos + CHUNK])
+        for event, el in parser.read_events():
+            if pane is not None:
+                if event == "end" and el.tag == "li" and el is not pane:
+                    text = _only_string(el)
+                    if text is not None and FEE_LI_RE.search(text):
+                        return _fee_from_li(el)
+                elif event == "end" and el is pane:
+                    return {}
+            elif weanlings_ul is not None:
+                parent = weanlings_ul.getparent()
+                if event == "start" and el.getparent() is parent \
+                        and el.tag == "div" and _has_class(el, "contentBlock"):
+                    pane = el
+                elif event == "end" and el is parent:
+                    return {}
+            elif event == "end" and el.tag == "li":
+                text = _only_string(el)
+                if text is not None and WEANLINGS_RE.search(text):
+                    ul = next((a for a in el.iterancestors("ul")
+                               if _has_class(a, "tabs")), None)
+                    if ul is None:
+                        return {}
+                    weanlings_ul = ul
+    return {}
+
+
+def stud_fee_from_weanlings_soup(html: str) -> Dict[int, int]:
+    """Reference BeautifulSoup implementation (full‑tree parse)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+
+    # find the first Weanlings <ul class="tabs"><li> or the header string
+    weanlings_li = soup.find("li", string=WEANLINGS_RE)
+    if not weanlings_li:
+        return {}
+
+    # the <ul class="tabs"> is the parent; the corresponding tabPane is next
+    tab_ul = weanlings_li.find_parent("ul", class_="tabs")
+    tab_pane = tab_ul.find_next_sibling("div", class_="contentBlock")
+    if not tab_pane:
+        return {}
+
+    # within that pane, the <li> that starts with 'YYYY Stud Fee'
+    fee_li = tab_pane.find("li", string=FEE_LI_RE)
+    if not fee_li:
+        return {}
+
+    m = FEE_TEXT_RE.match(fee_li.text)
+    if not m:
+        return {}
+
+    yr = int(m.group("yr"))
+    amt = int(m.group("amt").replace(",", ""))
+    return {yr: amt}
+
+# ---------------------------------------------------------------------------
+# SEARCH PAGE – FIRST STALLION LINK
+# ---------------------------------------------------------------------------
+def first_stallion_link(html: str) -> Optional[Tuple[str, str]]:
+    """(stallion_id, slug) from the first stallion‑register <a href>, or None."""
+    for m in A_HREF_RE.finditer(html):
+        hit = STALLION_HREF_RE.search(html_lib.unescape(m.group(2)))
+        if hit:
+            return hit.group(1), hit.group(2)
+    return None
+
+
+def first_stallion_link_soup(html: str) -> Optional[Tuple[str, str]]:
+    """Reference BeautifulSoup implementation (full‑tree parse)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for a in soup.select("a"):
+        m = STALLION_HREF_RE.search(a.get("href", ""))
+        if m:
+            return m.group(1), m.group(2)
+    return None
@@ -0,0 +1,99 @@
+"""
+gini.py
+-------
+Gini coefficient of sale prices for many groups at once.
+
+``intro_analysis.ipynb`` passes ``gini_coefficient`` to ``groupby().agg`` as a
+Python callable, so every sire – and again every (Sire, sale_year) – pays
+for its own ``np.array`` / ``np.sort`` / ``np.cumsum`` call.  ``grouped_gini``
+does all groups in one pass over flat arrays:
+
+    order   = lexsort((values, codes))          one sort: group, then price
+    cum     = cumsum(values[order]) − offset    segmented (per‑group) cumsum
+    S, T    = add.reduceat(cum, starts), cum[ends]
+    gini    = (n + 1 − 2·S / T) / n             the callable's formula
+
+so slicing by sire, consignor, buyer or year costs one sort of the selected
+lots rather than one Python call per group.  For integer‑valued prices (all
+of the Keeneland data) every partial sum is exact and the result is
+bit‑identical to ``gini_coefficient``.
+
+Usage
+-----
+from gini import gini_by
+gini_by(only_sold, "Sire")                    # Series indexed by Sire
+gini_by(only_sold, ["Sire", "sale_year"])     # MultiIndex
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# REFERENCE
+# ---------------------------------------------------------------------------
+def gini_coefficient(x):
+    if len(x) == 0:
+        return np.nan
+    x = np.sort(np.array(x))
+    n = len(x)
+    cumx = np.cumsum(x)
+    return (n + 1 - 2 * np.sum(cumx) / cumx[-1]) / n
+
+# ---------------------------------------------------------------------------
+# KERNEL
+# ---------------------------------------------------------------------------
+def grouped_gini(codes, values, n_groups: Optional[int] = None) -> np.ndarray:
+    """
+    Gini coefficient of ``values`` for each group in ``codes``.
+
+    ``codes`` are integer group ids in ``[0, n_groups)``; negative codes
+    (pandas' missing‑key marker) are ignored.  Returns a float array of
+    length ``n_groups`` with NaN for empty groups and for groups containing
+    a NaN value, as the per‑group callable would.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    values = np.asarray(values, dtype=np.float64)
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1 if codes.size else 0
+    out = np.full(n_groups, np.nan)
+
+    keep = codes >= 0
+    missing = np.isnan(values)
+    nan_groups = np.unique(codes[keep & missing])
+    keep &= ~missing
+    codes, values = codes[keep], values[keep]
+    if not codes.size:
+        return out
+
+    order = np.lexsort((values, codes))
+    c, x = codes[order], values[order]
+    starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    out[c[starts]] = segment_gini(x, starts)
+    out[nan_groups] = np.nan
+    return out
+
+
+def segment_gini(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Gini of each run of ``x`` beginning at ``starts``; every run must already
+    be sorted ascending (as after ``lexsort((values, codes))``).
+    """
+    n = np.diff(np.r_[starts, len(x)])
+    cum = np.cumsum(x)
+    cum -= np.repeat(np.r_[0.0, cum[starts[1:] - 1]], n)     # restart at each run
+    total = cum[starts + n - 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (n + 1 - 2 * np.add.reduceat(cum, starts) / total) / n
+
+
+def gini_by(df: pd.DataFrame, by: Union[str, Sequence[str]],
+            value: str = "Price") -> pd.Series:
+    """``df.groupby(by)[value].agg(gini_coefficient)`` in one kernel call."""
+    g = df.groupby(by, sort=True, observed=True)
+    codes = g.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    index = g.size().index
+    return pd.Series(grouped_gini(codes, df[value].to_numpy(dtype=np.float64), len(index)),
+                     index=index, name="gini")
@@ -0,0 +1,142 @@
+"""
+harvest_store.py
+----------------
+Append‑only, resumable output for the stud‑fee scrapers.
+
+The scrapers used to hold every row in memory and write the CSV once at the
+end, so a crash at sire 400 lost the whole run.  ``HarvestStore`` instead
+appends each sire's rows to the output CSV as soon as it finishes and then
+writes a line to a journal next to it (``<output>.done``):
+
+    {"sire": "Accelerate", "through": 2025, "rows": 4}
+
+``through`` is the last sales year crawled for that sire, which gives us two
+job modes on top of a plain run:
+
+    --resume       skip sires already journaled through the last sales year
+    --incremental  keep existing rows; for every sire only crawl sales years
+                   after its latest known ``stud_fee_year`` (a page for sales
+                   year Y never lists a stud fee later than Y) and after the
+                   last sales year already journaled
+
+so a new sale year costs one or two pages per sire instead of twenty.
+Sires whose stallion ID could not be resolved are not journaled, so a
+resumed run asks the stallion index again: a search that found nothing is
+remembered there until ``NEGATIVE_TTL`` expires, while one that could not
+be fetched is not remembered at all and is retried right away.
+Rows are flushed before the journal line, so a crash in between only causes
+a duplicate row, which ``frame()`` / ``compact()`` drop.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+COLUMNS = ["Sire", "stud_fee_year", "stud_fee_usd"]
+
+
+class HarvestStore:
+    """Output CSV + completion journal for one scraper job."""
+
+    def __init__(self, path, fresh: bool = True):
+        self.path = Path(path)
+        self.journal = self.path.with_name(self.path.name + ".done")
+        if fresh:
+            self.path.unlink(missing_ok=True)
+            self.journal.unlink(missing_ok=True)
+        if not self.path.exists():
+            with open(self.path, "w", newline="") as f:
+                csv.writer(f).writerow(COLUMNS)
+        self.done: Dict[str, int] = self._read_journal()
+        self.latest: Dict[str, int] = self._read_latest()
+
+    # -- reading ------------------------------------------------------------
+    def _read_journal(self) -> Dict[str, int]:
+        done: Dict[str, int] = {}
+        if self.journal.exists():
+            with open(self.journal) as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:       # torn last line
+                        continue
+                    done[rec["sire"]] = max(done.get(rec["sire"], 0), rec["through"])
+        return done
+
+    def _read_latest(self) -> Dict[str, int]:
+        df = self.frame()
+        if df.empty:
+            return {}
+        return df.groupby("Sire")["stud_fee_year"].max().astype(int).to_dict()
+
+    def frame(self) -> pd.DataFrame:
+        """Current contents, de‑duplicated (first observation wins)."""
+        df = pd.read_csv(self.path, on_bad_lines="skip")
+        return df.drop_duplicates(["Sire", "stud_fee_year"], keep="first")
+
+    # -- job planning -------------------------------------------------------
+    def is_done(self, sire: str, through: int) -> bool:
+        """True if ``sire`` was already crawled up to sales year ``through``."""
+        return self.done.get(sire, 0) >= through
+
+    def years_to_crawl(self, sire: str, years: Iterable[int],
+                       incremental: bool) -> List[int]:
+        """Sales years still worth fetching for ``sire``."""
+        years = list(years)
+        if not incremental:
+            return years
+        cutoff = max(self.latest.get(sire, 0), self.done.get(sire, 0))
+        return [y for y in years if y > cutoff]
+
+    # -- writing ------------------------------------------------------------
+    def append(self, sire: str, fee_pairs: Iterable[Tuple[int, int]],
+               through: Optional[int]) -> int:
+        """
+        Persist one sire's rows, then journal it (not when ``through`` is
+        None: the rows are kept but the sire is still to be crawled).
+        Returns rows written.
+        """
+        fee_pairs = list(fee_pairs)
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows((sire, yr, fee) for yr, fee in fee_pairs)
+            f.flush()
+            os.fsync(f.fileno())
+        if through is not None:
+            with open(self.journal, "a") as f:
+                f.write(json.dumps({"sire": sire, "through": through,
+                                    "rows": len(fee_pairs)}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done[sire] = max(self.done.get(sire, 0), through)
+        if fee_pairs:
+            self.latest[sire] = max([self.latest.get(sire, 0)]
+                                    + [yr for yr, _ in fee_pairs])
+        return len(fee_pairs)
+
+    def compact(self) -> int:
+        """Rewrite the CSV without duplicates (atomic).  Returns row count."""
+        df = self.frame()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        df.to_csv(tmp, index=False)
+        tmp.replace(self.path)
+        return len(df)
+
+
+def add_store_args(ap) -> None:
+    """Register the checkpoint / incremental flags on an argparse parser."""
+    grp = ap.add_argument_group("checkpointing")
+    grp.add_argument("--resume", action="store_true",
+                     help="Keep --output and skip sires already finished")
+    grp.add_argument("--incremental", action="store_true",
+                     help="Keep --output and only crawl years newer than each "
+                          "sire's latest known stud_fee_year")
+
+
+def store_from_args(args) -> HarvestStore:
+    """Build a HarvestStore from ``--output`` and the ``add_store_args`` flags."""
+    return HarvestStore(args.output, fresh=not (args.resume or args.incremental))
@@ -1,20 +1,20 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from dashboard_data import box_figure, lookups, scatter_frame, table_page
+from table_query import COLUMNS, DEFAULT_PAGE_SIZE
+
 def render_md(filename):
     path = f"notebooks/markdown/{filename}"
     with open(path, "r") as f:
         st.markdown(f.read())
 
-# Load data
-only_sold = pd.read_csv("notebooks/only_sold.csv")
-sire_data = pd.read_csv("notebooks/sire_data.csv")
-all_data = pd.read_csv("notebooks/all_data.csv")
-
 # Widen layout
 st.set_page_config(layout="wide")
 
+# Load data (cached once per process, shared by every session)
+lk = lookups()
+
 # Markdown Introduction
 st.title("Keeneland Yearling Sales Dashboard")
 render_md("overview.md")
@@ -25,21 +25,9 @@ st.markdown("---")
 st.header("Box Plot: Yearly Sales by Sire")
 render_md("yearly_sales.md")
 data_toggle = st.radio("Data: (box plot)", ["Excluding >95th Percentile", "Full"])
-all_sires = sorted(only_sold["Sire"].unique())
-sire_options = [s for s in all_sires]
-selected_sires = st.multiselect("Select sires:", sire_options, default=None, key="options1")
-
-df = only_sold
-if data_toggle.startswith("Excluding"):
-    df = df[df.Price <= df.Price.quantile(.95)]
-if selected_sires:
-    df = df[df["Sire"].isin(selected_sires)]
-
-fig = px.box(
-    df, x="sale_year", y="Price",
-    hover_data=["Sire", "Description", "Purchaser"],
-    title="Keeneland Sept Yearling Sales by Sire"
-)
+selected_sires = st.multiselect("Select sires:", lk.box_sires, default=None, key="options1")
+
+fig = box_figure(data_toggle.startswith("Excluding"), selected_sires)
 st.plotly_chart(fig)
 
 st.markdown("---")
@@ -48,20 +36,13 @@ st.markdown("---")
 st.header("Scatter Plot: Sire Performance")
 render_md("sire_performance.md")
 foal_min_1 = st.number_input("Foals per year ≥", value=10, step=1, key="foal1")
-years_active_min_1 = int(sire_data.years_active.min())
-years_active_max_1 = int(sire_data.years_active.max())
+years_active_min_1, years_active_max_1 = lk.years_active_bounds
 year_range_1 = st.slider("Years active range:", years_active_min_1, years_active_max_1,
                          (years_active_min_1, years_active_max_1), key="range1")
-lo_1, hi_1 = year_range_1
 # Sires
-all_sires2 = sorted(sire_data["Sire"].unique())
-sire_options2 = [s for s in all_sires2]
-selected_sires2 = st.multiselect("Select sires:", sire_options2, default=None, key='options3')
+selected_sires2 = st.multiselect("Select sires:", lk.scatter_sires, default=None, key='options3')
 
-df2 = sire_data[(sire_data.foals_per_year >= foal_min_1) & (sire_data.years_active.between(lo_1, hi_1))]
-
-if selected_sires2:
-    df2 = df2[df2["Sire"].isin(selected_sires2)]
+df2 = scatter_frame(foal_min_1, year_range_1, selected_sires2)
 
 fig2 = px.scatter(
     df2.reset_index(), x="gini_coef", y="median_price",
@@ -78,50 +59,35 @@ st.header("Interactive Data Table")
 render_md("data_table.md")
 
 # Price range
-price_min = int(only_sold.Price.min())
-price_max = int(only_sold.Price.max())
+price_min, price_max = lk.price_bounds
 price_range = st.slider("Price range:", price_min, price_max,
                          (price_min, price_max),
                          key="range3")
-loP, hiP = price_range
-
 # Year range
-year_min = int(only_sold.sale_year.min())
-year_max = int(only_sold.sale_year.max())
+year_min, year_max = lk.year_bounds
 year_range = st.slider("Sale Year range:", year_min, year_max,
                          (year_min, year_max),
                          key="range4")
-loY, hiY = year_range
-
 # Sires
-all_sires1 = sorted(all_data["Sire"].unique())
-sire_options1 = [s for s in all_sires1]
-selected_sires1 = st.multiselect("Select sires:", sire_options1, default=None, key='options2')
+selected_sires1 = st.multiselect("Select sires:", lk.table_sires, default=None, key='options2')
 
 # Sales Status
-status = sorted(all_data["status"].unique())
-status_options = [s for s in status]
-selected_statuses = st.multiselect("Select sales status:", status_options, default=None, key='options4')
-
-df3 = all_data[["Sire", "Dam", "Description",
-                 "Price", "Sex", "Color", "sale_year",
-                 "Session", "Hip", "Purchaser", "PropertyLine1", "status"]]
-if selected_sires1:
-    df3 = df3[df3["Sire"].isin(selected_sires1)]
-    
-if price_range: 
-    # Split data: apply price filter *only* to Sold, keep others untouched
-    sold_mask = (df3["status"] == "Sold")
-    df3_sold = df3[sold_mask & df3["Price"].between(loP, hiP)]
-    df3_other = df3[~sold_mask]
-    df3 = pd.concat([df3_sold, df3_other])
-
-if year_range:
-    df3 = df3[(df3.sale_year.between(loY, hiY))]  
-if selected_statuses: 
-    df3 = df3[df3["status"].isin(selected_statuses)]
-
+selected_statuses = st.multiselect("Select sales status:", lk.statuses, default=None, key='options4')
+
+# Sort + page (filters, sort and paging run in DuckDB; only this page is loaded)
+sort_col, order_col, page_col = st.columns(3)
+sort_by = sort_col.selectbox("Sort by:", ["Catalogue order"] + COLUMNS, key="sort1")
+descending = order_col.radio("Order:", ["Ascending", "Descending"], horizontal=True,
+                             key="order1") == "Descending"
+page = page_col.number_input("Page:", min_value=1, value=1, step=1, key="page1")
+
+df3, total = table_page(selected_sires1, price_range, year_range, selected_statuses,
+                        page=page - 1, page_size=DEFAULT_PAGE_SIZE,
+                        sort_by=sort_by if sort_by in COLUMNS else None,
+                        descending=descending)
+first = (page - 1) * DEFAULT_PAGE_SIZE
 st.dataframe(df3)
+st.caption(f"Rows {min(first + 1, total):,}–{first + len(df3):,} of {total:,}")
 # corr_by_year = (
 #     df3.groupby("years_active")
 #       .apply(lambda g: g["gini_coef"].corr(g["median_price"]))
@@ -1,4 +1,3 @@
-import pandas as pd
 import plotly.express as px
 import ipywidgets as w
 from ipywidgets.embed import embed_minimal_html 
@@ -8,22 +7,13 @@ import plotly.express as px
 import warnings 
 warnings.simplefilter("ignore")
 
-sire_data = pd.read_csv("sire_data.csv", dtype={
-    "gini_coef": "float32",
-    "median_price": "float32",
-    "avg_price": "float32",
-    "foals_per_year": "float32",
-    "years_active": "int16",
-})
+from box_summary import box_figure
+from corr_cube import CorrCube
+from data_store import load_table
+from sire_search import SireSearch, debounce, filter_options
 
-only_sold = pd.read_csv("only_sold.csv",
-                        dtype={"Price": "float32",
-                               "sale_year": "int16"},
-                        usecols=["Sire",
-                                 "Description",
-                                 "Price",
-                                 "sale_year",
-                                 "Purchaser"])
+sire_data = load_table("sire_data")
+only_sold = load_table("only_sold", ["Sire", "Description", "Price", "sale_year", "Purchaser"])
 
 
 # ── build the two DataFrames up front ──────────────────────────
@@ -45,17 +35,11 @@ sire_multiselect = w.SelectMultiple(options=all_sires, rows=8, layout=w.Layout(w
 fig_out = w.Output()
 
 # --------------------------------------------------------------
-def _filter_options(text_widget, multi_widget, full_list):
-    """Live-filter the options in a SelectMultiple, keep existing selections."""
-    pat  = text_widget.value.strip().lower()
-    keep = multi_widget.value
-    opts = [o for o in full_list if pat in o.lower()]
-    multi_widget.options = opts
-    # restore any choices that are still present after filtering
-    multi_widget.value   = tuple(o for o in keep if o in opts)
+# live-filter the SelectMultiple from a prebuilt index, once typing pauses
+sire_index = SireSearch(all_sires)
 
 sire_search.observe(
-    lambda ch: _filter_options(sire_search, sire_multiselect, all_sires),
+    debounce(0.2)(lambda ch: filter_options(sire_search, sire_multiselect, sire_index)),
     names="value"
 )
 
@@ -71,11 +55,7 @@ def redraw(_=None):
     # 3 draw / update the figure
     with fig_out:
         fig_out.clear_output(wait=True)
-        px.box(
-            df, x="sale_year", y="Price",
-            hover_data=["Sire", "Description", "Purchaser"],
-            title="Keeneland Sept Yearling Sales by Sire"
-        ).show()
+        box_figure(df).show()
 
 # trigger redraw whenever a control changes
 for widg in (data_toggle, sire_multiselect):
@@ -151,6 +131,7 @@ def plot_dynamic(circle_size="foals_per_year"):
 plot_dynamic("foals_per_year")        # or another column name
 
 df0 = sire_data.reset_index().copy()
+cube = CorrCube.build(sire_data)      # per-redraw correlations come from prefix sums
 
 # ── master lists / limits ─────────────────────────────────────────────────
 yr_min, yr_max = int(df0.years_active.min()), int(df0.years_active.max())
@@ -167,37 +148,12 @@ year_range = w.IntRangeSlider(
 
 plot_out = w.Output()
 
-# ── helper: live-filter the SelectMultiple options list ───────────────────
-def _filter_options(text_widget, multi_widget, full_list):
-    pat = text_widget.value.strip().lower()
-    keep = multi_widget.value
-    opts = [o for o in full_list if pat in o.lower()]
-    multi_widget.options = opts
-    multi_widget.value = tuple(o for o in keep if o in opts)
-
-sire_search.observe(
-    lambda c: _filter_options(sire_search, sire_multiselect, all_sires),
-    names="value"
-)
-
 # ── recompute + redraw ────────────────────────────────────────────────────
 def redraw(_=None):
     lo, hi = year_range.value
 
-    # 1 apply filters
-    d = df0.loc[
-        (df0.foals_per_year >= foal_min.value) &
-        (df0.years_active.between(lo, hi))
-    ]
-
-    # 2 group by years_active and compute Pearson r
-    corr_by_year = (
-        d.groupby("years_active")
-         .apply(lambda g: g["gini_coef"].corr(g["median_price"]))
-         .dropna()
-         .reset_index(name="corr")
-         .sort_values("years_active")
-    )
+    # 1-2 Pearson r per years_active for the filtered sires
+    corr_by_year = cube.corr_by_years_active(foal_min.value, (lo, hi))
 
     # 3 draw the line plot
     with plot_out:
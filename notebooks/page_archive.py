@@ -0,0 +1,152 @@
+"""
+page_archive.py
+---------------
+Append‑only raw page archive for the scrapers, so pages fetched once can be
+parsed again offline.
+
+Fetching and parsing were interleaved in ``harvest_fees_for_sire`` /
+``harvest_sire_fees``: a change to ``STUD_FEE_RE`` or
+``stud_fee_from_weanlings`` meant crawling again.  With an archive attached
+(``--archive``), ``Crawler`` appends every HTTP 200 body it returns to
+
+    <dir>/pages.warc.gz     one gzip member per record, each a WARC/1.1
+                            "resource" record (URI, date, sha256 digest,
+                            body), so ``zcat`` and WARC tools can read it
+    <dir>/index.sqlite      url -> offset, length, sha256, fetched_at
+
+A page whose body is unchanged since its last record is not written again.
+The archive is never rewritten: a re‑fetched page that changed gets a new
+record, and ``latest`` / ``entries`` return the newest one per URL.  A
+record is read back by seeking to its offset and decompressing ``length``
+bytes, which ``read_record`` does without the index, so worker processes
+can read in parallel (``reparse_fees.py``).
+
+Usage
+-----
+archive = PageArchive("page_archive")
+archive.append(url, body)
+body = archive.latest(url)
+"""
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_ARCHIVE_DIR = "page_archive"
+ARCHIVE_FILE = "pages.warc.gz"
+INDEX_FILE = "index.sqlite"
+COMPRESS_LEVEL = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    url         TEXT    NOT NULL,
+    offset      INTEGER NOT NULL,       -- byte offset of the gzip member
+    length      INTEGER NOT NULL,       -- compressed bytes
+    sha256      TEXT    NOT NULL,       -- of the body
+    fetched_at  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_url ON records(url, offset);
+"""
+
+Entry = Tuple[str, int, int]            # url, offset, length
+
+# ---------------------------------------------------------------------------
+# RECORDS
+# ---------------------------------------------------------------------------
+def warc_record(url: str, body: bytes, digest: str, fetched_at: float) -> bytes:
+    """A WARC/1.1 resource record for ``body`` (uncompressed)."""
+    date = dt.datetime.fromtimestamp(fetched_at, dt.timezone.utc)
+    head = (
+        "WARC/1.1\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Date: {date.strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Payload-Digest: sha256:{digest}\r\n"
+        "Content-Type: text/html\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return head.encode("utf-8") + body + b"\r\n\r\n"
+
+
+def parse_record(data: bytes) -> Tuple[Dict[str, str], bytes]:
+    """(WARC headers, body) of one uncompressed record."""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    lines = head.decode("utf-8").split("\r\n")[1:]
+    headers = dict(line.split(": ", 1) for line in lines)
+    return headers, rest[:int(headers["Content-Length"])]
+
+
+def read_record(path, offset: int, length: int) -> Tuple[Dict[str, str], bytes]:
+    """Read one record straight from the archive file (no index needed)."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return parse_record(gzip.decompress(f.read(length)))
+
+# ---------------------------------------------------------------------------
+# ARCHIVE
+# ---------------------------------------------------------------------------
+class PageArchive:
+    """Thread‑safe writer / reader of one archive directory."""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / ARCHIVE_FILE
+        self._lock = threading.Lock()
+        self._file = open(self.path, "ab")
+        self._db = sqlite3.connect(self.root / INDEX_FILE, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def _latest_row(self, url: str) -> Optional[Tuple[int, int, str]]:
+        return self._db.execute(
+            "SELECT offset, length, sha256 FROM records WHERE url = ? "
+            "ORDER BY offset DESC LIMIT 1", (url,)).fetchone()
+
+    def append(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> bool:
+        """Archive ``body`` for ``url`` unless it is unchanged; True if written."""
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            last = self._latest_row(url)
+            if last is not None and last[2] == digest:
+                return False
+            fetched_at = time.time() if fetched_at is None else fetched_at
+            member = gzip.compress(warc_record(url, body, digest, fetched_at),
+                                   compresslevel=COMPRESS_LEVEL, mtime=0)
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(member)
+            self._file.flush()
+            # the record is on disk before the index points at it
+            with self._db:
+                self._db.execute("INSERT INTO records VALUES (?,?,?,?,?)",
+                                 (url, offset, len(member), digest, fetched_at))
+            return True
+
+    def latest(self, url: str) -> Optional[bytes]:
+        """Body of the newest record for ``url`` or None."""
+        with self._lock:
+            row = self._latest_row(url)
+        if row is None:
+            return None
+        return read_record(self.path, row[0], row[1])[1]
+
+    def entries(self) -> List[Entry]:
+        """(url, offset, length) of the newest record of every URL."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, MAX(offset), length FROM records GROUP BY url").fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._db.close()
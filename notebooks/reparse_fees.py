@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+reparse_fees.py
+---------------
+Rebuild the ``Sire, stud_fee_year, stud_fee_usd`` table from the raw page
+archive (page_archive.py) instead of the network.
+
+Every scraper run with ``--archive`` leaves its auctions pages in
+``page_archive/pages.warc.gz``.  After a change to ``STUD_FEE_RE`` or
+``stud_fee_from_weanlings`` this command re‑applies the extractor to them:
+
+1. Each input sire is mapped to its BloodHorse stallion ID through the
+   stallion index (stallion_index.py) – no search, no probe.
+2. Its archived ``…/stallions/<ID>/<slug>/auctions/<YEAR>`` pages are
+   handed to a process pool as (offset, length) pairs; workers read and
+   decompress the records themselves, skip pages without a Weanlings
+   section and keep the first observation of each fee year in sales‑year
+   order, exactly as the harvest functions do.
+3. Rows are written through ``HarvestStore`` in input order.  A sire is
+   journaled through sales year Y only when every year of
+   ``YEARS_TO_CRAWL`` up to Y is archived, so a later ``--resume`` /
+   ``--incremental`` crawl still fetches the years the archive lacks
+   (an archive started mid‑history or with gaps).
+
+``--parser`` picks the extractor of the scraper whose output is rebuilt:
+
+    weanlings   fee_extract.stud_fee_from_weanlings   (bloodhorse_stud_fee_scraper.py)
+    native      scrape_page_for_fees                  (bloodhorse_native_scraper.py)
+    native_2    scrape_page_for_stud_fee              (bloodhorse_native_2.py)
+
+Usage
+-----
+python reparse_fees.py --input sires.csv --output stud_fees.csv [--parser native]
+                       [--archive page_archive] [--index stallion_index.sqlite]
+                       [--processes 4]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from harvest_store import HarvestStore
+from page_archive import ARCHIVE_FILE, DEFAULT_ARCHIVE_DIR, PageArchive, read_record
+from stallion_index import DEFAULT_INDEX_PATH, StallionIndex
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+PARSERS = {                                 # name -> "module:function"
+    "weanlings": "fee_extract:stud_fee_from_weanlings",
+    "native": "bloodhorse_native_scraper:scrape_page_for_fees",
+    "native_2": "bloodhorse_native_2:scrape_page_for_stud_fee",
+}
+DEFAULT_PARSER = "weanlings"
+YEARS_TO_CRAWL = range(2006, 2026)          # the scrapers' sales years
+AUCTIONS_URL_RE = re.compile(r"/stallion-register/stallions/(\d+)/[^/]+/auctions/(\d{4})$")
+
+Pages = List[Tuple[int, int, int]]          # (sales year, offset, length), in order
+Task = Tuple[str, str, str, Pages]          # sire, parser, archive file, pages
+
+# ---------------------------------------------------------------------------
+# WORKERS
+# ---------------------------------------------------------------------------
+_extractors: Dict[str, Callable[[str], Dict[int, int]]] = {}
+
+
+def _extractor(name: str) -> Callable[[str], Dict[int, int]]:
+    """Import the parser once per process (by name, so tasks stay picklable)."""
+    fn = _extractors.get(name)
+    if fn is None:
+        module, func = PARSERS[name].split(":")
+        fn = _extractors[name] = getattr(importlib.import_module(module), func)
+    return fn
+
+
+def parse_sire(task: Task) -> Tuple[str, List[Tuple[int, int]]]:
+    """(sire, sorted (stud_fee_year, fee) pairs) from its archived pages."""
+    sire, parser, path, pages = task
+    extract = _extractor(parser)
+    seen: Dict[int, int] = {}
+    for _, offset, length in pages:
+        html = read_record(path, offset, length)[1].decode("utf-8", errors="replace")
+        if "Weanlings" not in html:
+            continue
+        for year, fee in extract(html).items():
+            seen.setdefault(year, fee)          # first observation wins
+    return sire, sorted(seen.items())
+
+# ---------------------------------------------------------------------------
+# PLANNING
+# ---------------------------------------------------------------------------
+def auctions_pages(archive: PageArchive) -> Dict[str, Dict[int, Tuple[int, int]]]:
+    """stallion ID -> {sales year: (offset, length)} of the newest archived page."""
+    pages: Dict[str, Dict[int, Tuple[int, int]]] = defaultdict(dict)
+    for url, offset, length in archive.entries():
+        m = AUCTIONS_URL_RE.search(url)
+        if m is None:
+            continue
+        by_year = pages[m.group(1)]
+        year = int(m.group(2))
+        if year not in by_year or by_year[year][0] < offset:
+            by_year[year] = (offset, length)
+    return pages
+
+
+def plan(sires: Sequence[str], archive: PageArchive, index: StallionIndex,
+         parser: str) -> Tuple[List[Task], List[str]]:
+    """One task per sire the index resolves; also the sires it does not."""
+    pages = auctions_pages(archive)
+    tasks: List[Task] = []
+    unresolved: List[str] = []
+    for sire in sires:
+        known, resolution = index.lookup(sire)
+        if not known or resolution is None:
+            unresolved.append(sire)
+            continue
+        by_year = pages.get(resolution[0], {})
+        tasks.append((sire, parser, str(archive.path),
+                      [(y, *by_year[y]) for y in sorted(by_year)]))
+    return tasks, unresolved
+
+
+def reparse(tasks: Sequence[Task], processes: int = 1) -> List[Tuple[str, List[Tuple[int, int]]]]:
+    """Run ``parse_sire`` over ``tasks`` (in a pool when ``processes`` > 1)."""
+    if processes <= 1 or len(tasks) <= 1:
+        return [parse_sire(t) for t in tasks]
+    chunk = max(1, len(tasks) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(parse_sire, tasks, chunksize=chunk))
+
+def archived_through(years: Sequence[int]) -> Optional[int]:
+    """Last sales year Y with every ``YEARS_TO_CRAWL`` year up to Y archived."""
+    have = set(years)
+    through = None
+    for year in YEARS_TO_CRAWL:
+        if year not in have:
+            break
+        through = year
+    return through
+
+# ---------------------------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------------------------
+def load_sires(path: Path) -> List[str]:
+    """Unique ``Sire`` values of a CSV/XLS/XLSX, in file order."""
+    if path.suffix.lower() == ".csv":
+        df = pd.read_csv(path)
+    elif path.suffix.lower() in {".xls", ".xlsx"}:
+        df = pd.read_excel(path, engine="openpyxl")
+    else:
+        raise ValueError("Input must be .csv, .xls, or .xlsx")
+    if "Sire" not in df.columns:
+        raise ValueError("File must contain a Sire column")
+    return list(dict.fromkeys(df["Sire"].dropna().astype(str)))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Re‑parse archived pages into stud fees")
+    ap.add_argument("--input", required=True, help="CSV/XLS/XLSX with a Sire column")
+    ap.add_argument("--output", required=True, help="CSV to write stud fees to")
+    ap.add_argument("--parser", choices=sorted(PARSERS), default=DEFAULT_PARSER,
+                    help="Extractor to apply (default %(default)s)")
+    ap.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR,
+                    help="Page archive directory (default %(default)s)")
+    ap.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                    help="SQLite sire -> stallion‑ID index (default %(default)s)")
+    ap.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                    help="Parser processes (default %(default)s)")
+    args = ap.parse_args(argv)
+
+    if not (Path(args.archive) / ARCHIVE_FILE).exists():
+        raise SystemExit(f"No page archive in {args.archive}")
+    t0 = time.perf_counter()
+    archive = PageArchive(args.archive)
+    index = StallionIndex(args.index)
+    sires = load_sires(Path(args.input))
+    tasks, unresolved = plan(sires, archive, index, args.parser)
+    archive.close()
+    index.close()
+
+    fees = dict(reparse(tasks, args.processes))
+    through = {t[0]: archived_through([y for y, _, _ in t[3]]) for t in tasks}
+    store = HarvestStore(args.output, fresh=True)
+    for sire in sires:
+        if sire in through:
+            store.append(sire, fees.get(sire, []), through[sire])
+    n_rows = store.compact()
+
+    n_pages = sum(len(t[3]) for t in tasks)
+    print(f"✓ {len(tasks)} sires, {n_pages:,} archived pages, {args.processes} processes: "
+          f"{n_rows} rows -> {args.output} in {time.perf_counter() - t0:.1f}s")
+    if unresolved:
+        print(f"⚠️  {len(unresolved)} sires not in the stallion index (crawl them first)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+response_cache.py
+-----------------
+On‑disk HTTP response cache for the scrapers.
+
+Layout under ``cache_dir``::
+
+    index.sqlite                  url -> blob, validators, expiry, last access
+    blobs/ab/abcdef….z            zlib‑compressed body, named by its sha256
+
+Bodies are content‑addressed, so identical pages fetched under different URLs
+are stored once.  A saved auctions page (``response.txt``, ~64 KB) compresses
+to roughly 13 KB.
+
+Freshness is decided per URL class (``URL_TTLS``):
+
+    • auctions pages for past years   never expire (fees are historical)
+    • auctions pages for this year+   1 day
+    • search / ID‑probe pages         a few days
+    • anything else                   1 day
+
+Entries are keyed by URL and redirect mode: a request made with
+``allow_redirects=False`` (the ID probe, which wants the 301/302 itself) is
+stored under ``<url>#no-redirect``, so its redirect is never served to a
+request that follows redirects, nor a followed page to the probe.
+
+A stale entry that carried an ``ETag`` or ``Last-Modified`` header is
+revalidated with a conditional GET; a 304 just renews it.  When the blobs
+exceed ``max_bytes`` the least‑recently‑used entries are evicted.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+DAY = 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024          # 512 MB of compressed pages
+CACHEABLE_STATUSES = {200, 301, 302}
+NO_REDIRECT_SUFFIX = "#no-redirect"             # fragments are never sent
+AUCTIONS_YEAR_RE = re.compile(r"/auctions/(\d{4})\b")
+URL_TTLS = [                                    # first match wins
+    (re.compile(r"/stallion-register/stallions/0/"), 30 * DAY),   # ID probe
+    (re.compile(r"/stallion-register/(search|results)\?"), 7 * DAY),
+]
+DEFAULT_TTL = DAY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    blob          TEXT    NOT NULL,
+    status        INTEGER NOT NULL,
+    location      TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL    NOT NULL,
+    expires_at    REAL,                 -- NULL = never expires
+    last_access   REAL    NOT NULL,
+    size          INTEGER NOT NULL      -- compressed bytes
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access);
+"""
+
+
+def cache_key(url: str, allow_redirects: bool = True) -> str:
+    """Index key of ``url`` fetched with / without following redirects."""
+    return url if allow_redirects else url + NO_REDIRECT_SUFFIX
+
+
+def ttl_for(url: str, today: Optional[dt.date] = None) -> Optional[float]:
+    """Seconds an entry for ``url`` stays fresh; None means forever."""
+    m = AUCTIONS_YEAR_RE.search(url)
+    if m and "/stallions/0/" not in url:
+        year = int(m.group(1))
+        current = (today or dt.date.today()).year
+        return None if year < current else DAY
+    for pattern, ttl in URL_TTLS:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+@dataclass
+class CachedPage:
+    url: str
+    status: int
+    body: bytes
+    location: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        """Headers for a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Thread‑safe, size‑capped, content‑addressed page cache."""
+
+    def __init__(self, cache_dir, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(cache_dir)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.root / "index.sqlite",
+                                   check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    # -- blobs --------------------------------------------------------------
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.z"
+
+    def _write_blob(self, body: bytes) -> Tuple[str, int]:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(zlib.compress(body, 6))
+            tmp.replace(path)
+        return digest, path.stat().st_size
+
+    def _drop_blob_if_orphan(self, digest: str) -> None:
+        (n,) = self._db.execute(
+            "SELECT COUNT(*) FROM entries WHERE blob = ?", (digest,)).fetchone()
+        if n == 0:
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    # -- public API ---------------------------------------------------------
+    def lookup(self, url: str, allow_redirects: bool = True) -> Optional[CachedPage]:
+        """Return the cached page (fresh or stale) or None on a miss."""
+        now = time.time()
+        key = cache_key(url, allow_redirects)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob, status, location, etag, last_modified, expires_at "
+                "FROM entries WHERE url = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            digest, status, location, etag, last_modified, expires_at = row
+            try:
+                body = zlib.decompress(self._blob_path(digest).read_bytes())
+            except (FileNotFoundError, zlib.error):
+                self._db.execute("DELETE FROM entries WHERE url = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?",
+                             (now, key))
+            self._db.commit()
+        fresh = expires_at is None or expires_at > now
+        return CachedPage(url, status, body, location, etag, last_modified, fresh)
+
+    def store(self, url: str, status: int, body: bytes,
+              headers: Optional[Dict[str, str]] = None,
+              allow_redirects: bool = True) -> None:
+        """Insert / replace the entry for ``url`` (ignored if not cacheable)."""
+        if status not in CACHEABLE_STATUSES:
+            return
+        headers = headers or {}
+        now = time.time()
+        ttl = ttl_for(url)
+        key = cache_key(url, allow_redirects)
+        with self._lock:
+            digest, size = self._write_blob(body)
+            old = self._db.execute("SELECT blob FROM entries WHERE url = ?",
+                                   (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (key, digest, status, headers.get("Location"),
+                 headers.get("ETag"), headers.get("Last-Modified"), now,
+                 None if ttl is None else now + ttl, now, size))
+            if old and old[0] != digest:
+                self._drop_blob_if_orphan(old[0])
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str, allow_redirects: bool = True) -> None:
+        """Renew an entry after a 304 Not Modified."""
+        ttl = ttl_for(url)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE url = ?",
+                (None if ttl is None else now + ttl, now, cache_key(url, allow_redirects)))
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        # distinct blobs only – several URLs may share one body
+        (n,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT blob, MAX(size) AS size FROM entries GROUP BY blob)"
+        ).fetchone()
+        return n
+
+    def _evict(self) -> None:
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        for url, digest, size in self._db.execute(
+                "SELECT url, blob, size FROM entries ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            (shared,) = self._db.execute(
+                "SELECT COUNT(*) FROM entries WHERE blob = ?", (digest,)).fetchone()
+            if not shared:
+                self._blob_path(digest).unlink(missing_ok=True)
+                total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,48 @@
+"""
+sale_status.py
+--------------
+One column‑wise rule for a lot's sale outcome, shared by the analysis
+notebook (``all_data.csv``), the buyers parser and the dashboards.
+
+    Purchaser              status
+    ---------------------  -------
+    "R.N.A. (0)"           Unsold   (never bid on)
+    "R.N.A. (150,000)"     RNA      (reserve not attained)
+    "Out"                  Out      (withdrawn)
+    anything else          Sold
+
+The result is a pandas Categorical, so a 30k‑row frame carries four labels
+and small integer codes instead of an object column of repeated strings.
+CSV round‑trips lose the dtype; read it back with
+``pd.read_csv(..., dtype={"status": STATUS_DTYPE})``.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+STATUSES = ["Out", "RNA", "Sold", "Unsold"]          # sorted, as the dashboards list them
+STATUS_DTYPE = pd.CategoricalDtype(STATUSES)
+STATUS_DTYPE_LOWER = pd.CategoricalDtype([s.lower() for s in STATUSES])
+
+
+def classify_status(purchaser: pd.Series, lowercase: bool = False) -> pd.Series:
+    """
+    Sale status for every lot from its ``Purchaser`` text.  ``lowercase``
+    gives the ``sold`` / ``rna`` / … labels used by ``buyers.csv``.
+    """
+    conditions = [
+        purchaser == "R.N.A. (0)",
+        purchaser.str.contains("R.N.A", regex=False, na=False),
+        purchaser == "Out",
+    ]
+    labels = ["Unsold", "RNA", "Out"]
+    default = "Sold"
+    dtype = STATUS_DTYPE
+    if lowercase:
+        labels, default, dtype = [l.lower() for l in labels], default.lower(), STATUS_DTYPE_LOWER
+    return pd.Series(pd.Categorical(np.select(conditions, labels, default), dtype=dtype),
+                     index=purchaser.index, name="status")
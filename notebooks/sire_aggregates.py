@@ -0,0 +1,282 @@
+"""
+sire_aggregates.py
+------------------
+Incremental per‑sire sales aggregates (``sire_data.csv``).
+
+``intro_analysis.ipynb`` builds ``sire_data`` with one
+``only_sold.groupby('Sire').agg(...)`` over every sale year, so adding a
+year means recomputing all ~430 sires.  ``SireAggregateStore`` keeps
+mergeable state instead, per (Sire, sale_year)
+
+    n, price_sum, price_sumsq     that year's moments (``yearly``)
+    prices                        that year's sold prices, catalogue order
+
+and per sire
+
+    n, price_sum                  foal count and total sales
+    mean, m2                      Welford state of the sire's prices
+    years_active, last_year       distinct sale years, the latest one folded in
+    prices                        every sold price, sorted (median, Gini)
+
+``add_lots`` folds a new sale year into the sire state: counts and sums are
+added, the year's prices are merged into each sorted array (``searchsorted``
++ ``insert``) and the Welford update continues over just the new rows.
+``sire_data`` then derives the touched sires' rows from their state – median
+from the middle of the sorted array, Gini with ``gini.segment_gini`` – so
+adding a year costs its own lots plus a linear merge per sire that sold in it,
+never a regroup of anyone's history.
+
+pandas' ``std`` is that same Welford update run in row order, and
+``only_sold.csv`` is in (sale_year, catalogue) order, so continuing it year
+by year reproduces ``sire_data.csv`` byte for byte, where
+``sqrt((sumsq − sum²/n) / (n − 1))`` would differ in the last bits for about
+a third of the sires.  A year that is not newer than a sire's ``last_year``
+(a corrected ``lots.csv``, or years added out of order) cannot be folded
+onto the end, so those sires alone are replayed from their per‑year partials.
+
+Usage
+-----
+python sire_aggregates.py --lots '../data/keeneland/sept-yearling/*/lots.csv' --out sire_data.csv
+python sire_aggregates.py --lots '../data/keeneland/sept-yearling/2025/lots.csv'   # add one year
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Iterable, Set
+
+import numpy as np
+import pandas as pd
+
+from gini import gini_by, segment_gini
+from seller_buyer_parse import load_lots
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_STORE_DIR = "sire_store"
+PARTIAL_COLUMNS = ["Sire", "sale_year", "n", "price_sum", "price_sumsq", "prices"]
+STATE_COLUMNS = ["n", "price_sum", "mean", "m2", "years_active", "last_year", "prices"]
+SIRE_COLUMNS = ["foal_count", "total_sales", "median_price", "variance_sales",
+                "gini_coef", "years_active", "avg_price", "foals_per_year", "gini_lag"]
+
+# ---------------------------------------------------------------------------
+# AGGREGATES
+# ---------------------------------------------------------------------------
+def sire_rows(sold: pd.DataFrame) -> pd.DataFrame:
+    """The notebook's ``sire_data`` aggregation for the sires in ``sold``."""
+    sire_data = sold.groupby("Sire").agg(foal_count=("Price", "count"),
+                                         total_sales=("Price", "sum"),
+                                         median_price=("Price", "median"),
+                                         variance_sales=("Price", "std"),
+                                         years_active=("sale_year", "nunique"))
+    sire_data.insert(4, "gini_coef", gini_by(sold, "Sire"))
+    sire_data["avg_price"] = sire_data.total_sales / sire_data.foal_count
+    sire_data["foals_per_year"] = sire_data.foal_count / sire_data.years_active
+    sire_data["gini_lag"] = np.nan      # one row per sire: the notebook's shift(1) is all NaN
+    return sire_data
+
+
+def sold_lots(lots: pd.DataFrame) -> pd.DataFrame:
+    """Sold lots (numeric ``Price`` > 0) with the columns the store uses."""
+    price = pd.to_numeric(lots["Price"], errors="coerce")
+    keep = price > 0
+    return pd.DataFrame({"Sire": lots["Sire"][keep].astype(str),
+                         "sale_year": lots["sale_year"][keep].astype(int),
+                         "Price": price[keep].astype(float)})
+
+
+def partials(sold: pd.DataFrame) -> pd.DataFrame:
+    """Per (Sire, sale_year) partial state; ``prices`` keeps catalogue order."""
+    g = sold.groupby(["Sire", "sale_year"], sort=True)["Price"]
+    out = g.agg(n="count", price_sum="sum")
+    out["price_sumsq"] = (sold["Price"] ** 2).groupby([sold["Sire"], sold["sale_year"]]).sum()
+    out["prices"] = g.agg(list)
+    return out.reset_index()[PARTIAL_COLUMNS]
+
+def empty_state() -> pd.DataFrame:
+    state = pd.DataFrame({c: pd.Series(dtype=t) for c, t in zip(
+        STATE_COLUMNS, ["int64", "float64", "float64", "float64", "int64", "int64", "object"])})
+    return state.rename_axis("Sire")
+
+
+def fold(state: pd.DataFrame, sold: pd.DataFrame) -> pd.DataFrame:
+    """
+    ``state`` with the rows of ``sold`` appended to each sire's history.
+    ``sold`` must be in (sale_year, catalogue) order and every one of its
+    years newer than the ``last_year`` of the sires it contains.
+    """
+    if sold.empty:
+        return state
+    new = sold["Sire"].drop_duplicates()
+    state = pd.concat([state, empty_state().reindex(new[~new.isin(state.index)])])
+    state = state.fillna({"n": 0, "price_sum": 0.0, "mean": 0.0, "m2": 0.0,
+                          "years_active": 0, "last_year": 0})
+    codes = state.index.get_indexer(sold["Sire"])
+    x = sold["Price"].to_numpy(dtype=np.float64)
+
+    # Welford, one step per k‑th new row of each sire: the same float ops, in
+    # the same order, as pandas' std over the sire's rows
+    n = state["n"].to_numpy(dtype=np.int64, copy=True)
+    mean = state["mean"].to_numpy(dtype=np.float64, copy=True)
+    m2 = state["m2"].to_numpy(dtype=np.float64, copy=True)
+    rank = sold.groupby("Sire", sort=False).cumcount().to_numpy()
+    for k in range(rank.max() + 1):
+        at = rank == k
+        c, v = codes[at], x[at]
+        n[c] += 1
+        old = mean[c]
+        mean[c] = old + (v - old) / n[c]
+        m2[c] += (v - mean[c]) * (v - old)
+
+    g = sold.groupby(codes, sort=True)
+    rows = np.unique(codes)                     # the group keys, in order
+    price_sum = state["price_sum"].to_numpy(dtype=np.float64, copy=True)
+    years_active = state["years_active"].to_numpy(dtype=np.int64, copy=True)
+    last_year = state["last_year"].to_numpy(dtype=np.int64, copy=True)
+    price_sum[rows] += g["Price"].sum().to_numpy()
+    years_active[rows] += g["sale_year"].nunique().to_numpy()
+    last_year[rows] = g["sale_year"].max().to_numpy()
+
+    # each sire's new prices, sorted, merged into its sorted history
+    order = np.lexsort((x, codes))
+    cut = np.flatnonzero(np.diff(codes[order])) + 1
+    prices = state["prices"].to_numpy(dtype=object, copy=True)
+    for c, new_p in zip(rows, np.split(x[order], cut)):
+        old_p = prices[c] if isinstance(prices[c], np.ndarray) else np.empty(0)
+        prices[c] = np.insert(old_p, np.searchsorted(old_p, new_p), new_p)
+    return state.assign(n=n, price_sum=price_sum, mean=mean, m2=m2,
+                        years_active=years_active, last_year=last_year, prices=prices)
+
+
+def state_rows(state: pd.DataFrame) -> pd.DataFrame:
+    """``sire_rows`` columns derived from per‑sire state alone."""
+    n = state["n"].to_numpy(dtype=np.int64)
+    x = np.concatenate(list(state["prices"])) if len(state) else np.empty(0)
+    starts = np.r_[0, np.cumsum(n)[:-1]].astype(np.intp)
+    lo, hi = starts + (n - 1) // 2, starts + n // 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(state["m2"].to_numpy() / (n - 1))
+    sire_data = pd.DataFrame({
+        "foal_count": n,
+        "total_sales": state["price_sum"].to_numpy(dtype=np.float64),
+        "median_price": (x[lo] + x[hi]) / 2 if len(x) else np.empty(0),
+        "variance_sales": np.where(n > 1, std, np.nan),
+        "gini_coef": segment_gini(x, starts) if len(x) else np.empty(0),
+        "years_active": state["years_active"].to_numpy(dtype=np.int64),
+    }, index=state.index)
+    sire_data["avg_price"] = sire_data.total_sales / sire_data.foal_count
+    sire_data["foals_per_year"] = sire_data.foal_count / sire_data.years_active
+    sire_data["gini_lag"] = np.nan
+    return sire_data
+
+# ---------------------------------------------------------------------------
+# STORE
+# ---------------------------------------------------------------------------
+class SireAggregateStore:
+    """Partials, sire state and finished sire rows, persisted as Parquet."""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.dir = Path(store_dir)
+        self._partials_path = self.dir / "partials.parquet"
+        self._state_path = self.dir / "sire_state.parquet"
+        self._sires_path = self.dir / "sire_data.parquet"
+        if self._partials_path.exists():
+            self.partials = pd.read_parquet(self._partials_path)
+            self.partials["prices"] = self.partials["prices"].map(list)
+        else:
+            self.partials = pd.DataFrame(columns=PARTIAL_COLUMNS)
+        if self._state_path.exists():
+            self.state = pd.read_parquet(self._state_path)
+            self.state["prices"] = self.state["prices"].map(np.asarray)
+        else:
+            self.state = empty_state()
+        if self._sires_path.exists():
+            self._sires = pd.read_parquet(self._sires_path)
+        else:
+            self._sires = pd.DataFrame(columns=SIRE_COLUMNS).rename_axis("Sire")
+        self.dirty: Set[str] = set()
+
+    def add_lots(self, lots: pd.DataFrame) -> Set[str]:
+        """
+        Merge one or more sale years of catalogue rows (``Sire``, ``sale_year``,
+        ``Price``).  Years already in the store are replaced, so re‑adding a
+        corrected ``lots.csv`` is safe.  Returns the sires that changed.
+        """
+        sold = sold_lots(lots).sort_values("sale_year", kind="stable")
+        new = partials(sold)
+        years = set(lots["sale_year"].astype(int))
+        replaced = self.partials["sale_year"].isin(years)
+        touched = set(self.partials.loc[replaced, "Sire"]) | set(new["Sire"])
+        self.partials = (pd.concat([self.partials[~replaced], new], ignore_index=True)
+                         .sort_values(["Sire", "sale_year"], ignore_index=True))
+
+        known = self.state.index.intersection(list(touched))
+        replay = set(known[self.state.loc[known, "last_year"] >= min(years)]) if years else set()
+        state = self.state.drop(list(replay))
+        state = fold(state, sold[~sold["Sire"].isin(replay)])
+        if replay:
+            history = self.partials[self.partials["Sire"].isin(replay)]
+            history = history[["Sire", "sale_year", "prices"]].explode("prices") \
+                .rename(columns={"prices": "Price"}).sort_values("sale_year", kind="stable")
+            state = fold(state, history.astype({"Price": float}))
+        self.state = state.sort_index()
+        self.dirty |= touched
+        return touched
+
+    def sire_data(self) -> pd.DataFrame:
+        """Finished ``sire_data`` table, deriving only dirty sires' rows."""
+        if self.dirty:
+            fresh = state_rows(self.state[self.state.index.isin(self.dirty)])
+            keep = self._sires[~self._sires.index.isin(self.dirty)]
+            self._sires = pd.concat([keep, fresh]).sort_index()
+            self._sires = self._sires.astype({"foal_count": "int64", "years_active": "int64"})
+            self.dirty.clear()
+        return self._sires[SIRE_COLUMNS]
+
+    def yearly(self) -> pd.DataFrame:
+        """Per (Sire, sale_year) count / mean / std from the stored moments."""
+        p = self.partials
+        n = p["n"].astype(float)
+        mean = p["price_sum"] / n
+        var = (p["price_sumsq"] - n * mean ** 2) / (n - 1)
+        return pd.DataFrame({"Sire": p["Sire"], "sale_year": p["sale_year"],
+                             "n": p["n"], "mean_price": mean,
+                             "std_price": np.sqrt(var.clip(lower=0)).where(n > 1)})
+
+    def save(self) -> None:
+        self.sire_data()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.partials.to_parquet(self._partials_path, index=False)
+        self.state.assign(prices=self.state["prices"].map(list)).to_parquet(self._state_path)
+        self._sires.to_parquet(self._sires_path)
+
+
+def build(lots_files: Iterable[str], store_dir=DEFAULT_STORE_DIR) -> SireAggregateStore:
+    """Open the store and merge every ``lots.csv`` glob in ``lots_files``."""
+    store = SireAggregateStore(store_dir)
+    for pattern in lots_files:
+        store.add_lots(load_lots(pattern))
+    return store
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Incrementally maintain sire_data")
+    ap.add_argument("--lots", action="append", required=True,
+                    help="lots.csv glob to merge (repeatable)")
+    ap.add_argument("--store", default=DEFAULT_STORE_DIR,
+                    help="Directory holding the partial state (default %(default)s)")
+    ap.add_argument("--out", help="Also write the finished table to this CSV")
+    args = ap.parse_args()
+
+    store = build(args.lots, args.store)
+    store.save()
+    sire_data = store.sire_data()
+    if args.out:
+        sire_data.to_csv(args.out)
+    print(f"✓ {len(sire_data)} sires, {len(store.partials)} (Sire, sale_year) partials "
+          f"in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+sire_panel.py
+-------------
+Per (Sire, sale_year) time‑series panel of sold‑lot metrics.
+
+``intro_analysis.ipynb`` tried to lag Gini with
+``sire_data.groupby("Sire")["gini_coef"].shift(1)`` – always NaN, since
+``sire_data`` has one row per sire – and built per‑year Ginis separately
+(``yearly_ginis``) with a second groupby and a merge against ``first_crop``.
+``sire_panel`` produces every per‑year metric from one lexsort of the sold
+lots by (Sire, sale_year, Price):
+
+    foal_count, total_sales, avg_price, median_price, gini     per cell
+    first_year, years_since_first_crop, crop_number, cum_foals per sire, running
+    <metric>_lag<k>                  value in sale_year − k (NaN if no lots)
+    foals_<w>y, avg_price_<w>y,      the w sale years ending at sale_year,
+    gini_mean_<w>y                   e.g. 2022–2024 for w = 3
+
+Lags and windows are calendar based: the panel rows are keyed by
+``Sire × stride + sale_year`` and each lag / window edge is one
+``searchsorted`` on that key, with window sums taken as differences of
+running cumsums.  The result is sorted by (Sire, sale_year), with ``Sire``
+categorical, and is stored by ``data_store`` as the ``sire_panel`` table.
+
+Usage
+-----
+from sire_panel import sire_panel
+panel = sire_panel(only_sold)                   # lags=(1,), windows=(3,)
+panel[panel.years_since_first_crop <= 3]
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from gini import segment_gini
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_LAGS = (1,)
+DEFAULT_WINDOWS = (3,)
+LAG_METRICS = ["avg_price", "median_price", "gini"]
+KEY_STRIDE = 10_000                 # > any sale_year, so sires never overlap
+
+# ---------------------------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------------------------
+def _window_sum(cum: np.ndarray, left: np.ndarray) -> np.ndarray:
+    """``sum(values[left[i]:i + 1])`` from the running sum ``cum``."""
+    return cum - np.where(left > 0, cum[left - 1], 0)
+
+# ---------------------------------------------------------------------------
+# PANEL
+# ---------------------------------------------------------------------------
+def sire_panel(sold: pd.DataFrame, lags: Sequence[int] = DEFAULT_LAGS,
+               windows: Sequence[int] = DEFAULT_WINDOWS) -> pd.DataFrame:
+    """
+    One row per (Sire, sale_year) of ``sold`` (``Sire``, ``sale_year``,
+    ``Price``); lots without a positive price are ignored.
+    """
+    sold = sold[sold["Price"] > 0]
+    sire_codes, sires = pd.factorize(sold["Sire"].astype(str), sort=True)
+    year = sold["sale_year"].to_numpy(dtype=np.int64)
+    price = sold["Price"].to_numpy(dtype=np.float64)
+
+    order = np.lexsort((price, year, sire_codes))
+    s, y, x = sire_codes[order], year[order], price[order]
+    starts = np.flatnonzero(np.r_[True, (s[1:] != s[:-1]) | (y[1:] != y[:-1])])
+    n = np.diff(np.r_[starts, len(x)])
+
+    # per (Sire, sale_year) cell
+    cell_sire, cell_year = s[starts], y[starts]
+    total = np.add.reduceat(x, starts)
+    cols = {
+        "foal_count": n,
+        "total_sales": total,
+        "avg_price": total / n,
+        "median_price": (x[starts + (n - 1) // 2] + x[starts + n // 2]) / 2,
+        "gini": segment_gini(x, starts),
+    }
+
+    # running, per sire
+    sire_starts = np.flatnonzero(np.r_[True, cell_sire[1:] != cell_sire[:-1]])
+    cells = np.diff(np.r_[sire_starts, len(cell_sire)])
+    first = np.repeat(sire_starts, cells)
+    cum_n = np.cumsum(n)
+    cols["first_year"] = cell_year[first]
+    cols["years_since_first_crop"] = cell_year - cell_year[first]
+    cols["crop_number"] = np.arange(len(cell_sire)) - first + 1
+    cols["cum_foals"] = _window_sum(cum_n, first)
+
+    # calendar lags and windows, one searchsorted per edge
+    key = cell_sire * KEY_STRIDE + cell_year
+    for k in lags:
+        at = np.searchsorted(key, key - k)
+        hit = key[at] == key - k
+        for metric in LAG_METRICS:
+            cols[f"{metric}_lag{k}"] = np.where(hit, cols[metric][at], np.nan)
+    cum_total, cum_gini = np.cumsum(total), np.cumsum(cols["gini"])
+    for w in windows:
+        left = np.searchsorted(key, key - w + 1)
+        foals = _window_sum(cum_n, left)
+        cols[f"foals_{w}y"] = foals
+        cols[f"avg_price_{w}y"] = _window_sum(cum_total, left) / foals
+        cols[f"gini_mean_{w}y"] = _window_sum(cum_gini, left) / (np.arange(len(key)) - left + 1)
+
+    panel = pd.DataFrame(cols)
+    panel.insert(0, "Sire", pd.Categorical.from_codes(cell_sire, sires))
+    panel.insert(1, "sale_year", cell_year.astype("int16"))
+    return panel
@@ -0,0 +1,161 @@
+"""
+sire_search.py
+--------------
+Prebuilt, incremental search over sire names for the "Sire filter" widgets.
+
+``_filter_options`` in ``notebook.py`` / ``hosted_v1.ipynb`` lower‑cased
+every sire and ran ``pat in o.lower()`` over the whole list on each
+keystroke, then reassigned ``SelectMultiple.options`` even when nothing
+changed.  ``SireSearch`` normalises every name once
+
+    "Lope de Vega (IRE)"   ->  "lope de vega ire"
+    "Halo's Verse"         ->  "halos verse"
+
+(case‑folded, accents and punctuation dropped, country suffix kept as a
+trailing word so "vega", "vega ire" and "(IRE)" all match) and indexes the
+1‑, 2‑ and 3‑grams of each key.  A query of up to three characters is one
+posting list; a longer one is the intersection of its trigrams' lists,
+confirmed with a substring check on the few survivors – or, when it extends
+the previous query (typing another letter), a check of the previous result
+only.  Results keep the order of the names given.
+
+``filter_options`` applies a result to a ``SelectMultiple`` only when the
+options actually change, keeping the current selection, and ``debounce``
+delays it until typing pauses.  The delay is scheduled on the kernel's
+event loop (``loop.call_later``), so the widgets are only ever updated from
+the thread that runs the widget callbacks.
+
+Usage
+-----
+index = SireSearch(all_sires)
+sire_search.observe(debounce(0.2)(
+    lambda ch: filter_options(sire_search, sire_multiselect, index)), names="value")
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+GRAM_SIZES = (1, 2, 3)
+COUNTRY_RE = re.compile(r"\s*\(([A-Za-z]{2,3})\)\s*$")      # "Dubawi (IRE)"
+NON_WORD_RE = re.compile(r"[^0-9a-z ]+")
+SPACES_RE = re.compile(r"\s+")
+
+# ---------------------------------------------------------------------------
+# NORMALISATION
+# ---------------------------------------------------------------------------
+def split_country(name: str) -> Tuple[str, Optional[str]]:
+    """``("Lope de Vega", "IRE")`` for ``"Lope de Vega (IRE)"``."""
+    m = COUNTRY_RE.search(name)
+    if m is None:
+        return name.strip(), None
+    return name[:m.start()].strip(), m.group(1).upper()
+
+
+def normalize(text: str) -> str:
+    """Search key: case‑folded ASCII words, punctuation and accents removed."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    text = NON_WORD_RE.sub("", text.casefold().replace("-", " "))
+    return SPACES_RE.sub(" ", text).strip()
+
+
+def search_key(name: str) -> str:
+    base, country = split_country(name)
+    return normalize(f"{base} {country}" if country else base)
+
+# ---------------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------------
+class SireSearch:
+    """n‑gram index over ``names`` (duplicates dropped, first order kept)."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(n for n in names if isinstance(n, str)))
+        self.keys: List[str] = [search_key(n) for n in self.names]
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            grams = {key[p:p + g] for g in GRAM_SIZES for p in range(len(key) - g + 1)}
+            for gram in grams:
+                postings[gram].append(i)
+        self._postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._all = np.arange(len(self.names), dtype=np.int32)
+        self._last: Tuple[str, np.ndarray] = ("", self._all)
+
+    def _candidates(self, q: str) -> np.ndarray:
+        g = GRAM_SIZES[-1]
+        lists = [self._postings.get(q[p:p + g]) for p in range(len(q) - g + 1)]
+        if any(ids is None for ids in lists):
+            return self._all[:0]
+        lists.sort(key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return ids
+
+    def ids(self, query: str) -> np.ndarray:
+        """Positions in ``names`` of every name whose key contains ``query``."""
+        q = normalize(query)
+        last_q, last_ids = self._last
+        if not q:
+            ids = self._all
+        elif len(q) <= GRAM_SIZES[-1]:
+            ids = self._postings.get(q, self._all[:0])           # exact posting list
+        else:
+            # narrowing: every key containing q also contains the previous query
+            ids = last_ids if last_q and last_q in q else self._candidates(q)
+            keys = self.keys
+            ids = ids[[q in keys[i] for i in ids]] if len(ids) else ids
+        self._last = (q, ids)
+        return ids
+
+    def search(self, query: str) -> List[str]:
+        """Matching names, in the order they were given."""
+        names = self.names
+        return [names[i] for i in self.ids(query)]
+
+# ---------------------------------------------------------------------------
+# WIDGET HELPERS
+# ---------------------------------------------------------------------------
+def filter_options(text_widget, multi_widget, index: SireSearch) -> None:
+    """Narrow a ``SelectMultiple`` to ``index.search(text_widget.value)``."""
+    opts = index.search(text_widget.value)
+    if tuple(opts) == tuple(multi_widget.options):
+        return
+    allowed = set(opts)
+    keep = [o for o in multi_widget.value if o in allowed]
+    with multi_widget.hold_trait_notifications():
+        multi_widget.options = opts
+        multi_widget.value = tuple(keep)
+
+
+def debounce(wait: float):
+    """
+    Run the wrapped callback ``wait`` seconds after the last call only, on
+    the caller's running event loop; with no loop running it runs at once.
+    """
+    def decorator(fn):
+        handle: Optional[asyncio.TimerHandle] = None
+
+        @functools.wraps(fn)
+        def debounced(*args, **kwargs):
+            nonlocal handle
+            if handle is not None:
+                handle.cancel()
+                handle = None
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:                # plain script: nothing to wait on
+                fn(*args, **kwargs)
+                return
+            handle = loop.call_later(wait, functools.partial(fn, *args, **kwargs))
+        return debounced
+    return decorator
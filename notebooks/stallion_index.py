@@ -0,0 +1,190 @@
+"""
+stallion_index.py
+-----------------
+Persistent sire -> (stallion_id, canonical_slug) index shared by every
+scraper variant.
+
+Resolving a sire (BloodHorse search, the ID=0 redirect probe, or up to three
+DuckDuckGo queries) is the slowest and most rate‑limited step of a crawl, and
+the answer almost never changes between runs.  The index is a small SQLite
+file; each sire is stored under several keys so any spelling the scrapers
+produce finds it:
+
+    • the normalised name            "yoshida (jpn)"
+    • the ``slugify_sire`` variant   "yoshida-jpn"
+    • the canonical BloodHorse slug  (once resolved)
+
+Positive answers never expire.  Negative answers ("not found") are recorded
+too, with their own expiry (``NEGATIVE_TTL``) so a sire that was missing is
+retried later but not on every run.  Only a search that was actually answered
+can say "not found": a resolver whose request failed (retries exhausted, a
+cache miss under ``--offline``) raises ``ResolveFailed`` and nothing is
+recorded, so the sire is resolved again on the next run.  An index opened
+``read_only`` (``--offline`` crawls) never records anything.
+
+Usage
+-----
+    index = StallionIndex("stallion_index.sqlite")
+    hit = index.resolve(sire, lambda s: bloodhorse_search(s, crawler),
+                        source="search")
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# CONFIGURABLE CONSTANTS
+# ---------------------------------------------------------------------------
+DEFAULT_INDEX_PATH = "stallion_index.sqlite"
+NEGATIVE_TTL = 7 * 24 * 3600        # retry "not found" sires after a week
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sire_keys (
+    key          TEXT PRIMARY KEY,
+    sire         TEXT NOT NULL,       -- name as first seen
+    stallion_id  TEXT,                -- NULL = negative result
+    slug         TEXT,
+    source       TEXT,                -- search | probe | ddg | …
+    resolved_at  REAL NOT NULL,
+    expires_at   REAL                 -- NULL = never expires
+);
+"""
+
+Resolution = Optional[Tuple[str, str]]      # (stallion_id, slug) or None
+
+
+class ResolveFailed(Exception):
+    """The resolver could not ask (fetch failed): neither a hit nor a miss."""
+
+# ---------------------------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------------------------
+def slugify_sire(sire: str) -> str:
+    """
+    Convert "Yoshida (JPN)" -> "yoshida-jpn", "Gio Ponti" -> "gio-ponti".
+    Matches BloodHorse slug style.
+    """
+    sire = sire.strip()
+    # capture "(ABC)" country code if present
+    m = re.match(r"^(.*?)\s*\((\w{2,4})\)$", sire)
+    if m:
+        name, country = m.groups()
+        base = name.strip()
+        slug = re.sub(r"[^\w\s-]", "", base).lower()
+        slug = re.sub(r"\s+", "-", slug)
+        return f"{slug}-{country.lower()}"
+    # USA horses—just hyphenate & lower
+    slug = re.sub(r"[^\w\s-]", "", sire).lower()
+    slug = re.sub(r"\s+", "-", slug)
+    return slug
+
+
+def canonical_slug(slug: str) -> str:
+    """The slug path segment alone: ``"tapit/auctions/2020"`` -> ``"tapit"``."""
+    return re.split(r"[/?#]", slug.strip().strip("/"), maxsplit=1)[0]
+
+
+def normalize_sire(sire: str) -> str:
+    """Case‑fold, straighten quotes and collapse whitespace."""
+    sire = sire.replace("’", "'").replace("‘", "'")
+    return re.sub(r"\s+", " ", sire).strip().casefold()
+
+
+def sire_keys(sire: str) -> List[str]:
+    """All lookup keys for a sire, most specific first, no duplicates."""
+    keys = [normalize_sire(sire), slugify_sire(sire)]
+    return list(dict.fromkeys(k for k in keys if k))
+
+# ---------------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------------
+class StallionIndex:
+    """SQLite‑backed resolution cache with negative‑result expiry."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, negative_ttl: float = NEGATIVE_TTL,
+                 refresh: bool = False, read_only: bool = False):
+        self.path = Path(path)
+        self.negative_ttl = negative_ttl
+        self.refresh = refresh          # treat every lookup as a miss
+        self.read_only = read_only      # resolve() never records
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(SCHEMA)
+
+    def lookup(self, sire: str) -> Tuple[bool, Resolution]:
+        """
+        Return ``(known, resolution)``.  ``known`` is False on a miss or an
+        expired negative entry – i.e. when the caller should hit the network.
+        """
+        if self.refresh:
+            return False, None
+        now = time.time()
+        for key in sire_keys(sire):
+            row = self._db.execute(
+                "SELECT stallion_id, slug, expires_at FROM sire_keys WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                continue
+            stallion_id, slug, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                return False, None
+            return True, (stallion_id, canonical_slug(slug)) if stallion_id else None
+        return False, None
+
+    def record(self, sire: str, resolution: Resolution, source: str = "") -> None:
+        """Store a positive or negative answer under every key for ``sire``."""
+        now = time.time()
+        keys = sire_keys(sire)
+        if resolution:
+            stallion_id, slug = resolution
+            slug = canonical_slug(slug)
+            keys.append(slug.lower())
+            expires_at = None
+        else:
+            stallion_id = slug = None
+            expires_at = now + self.negative_ttl
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sire_keys VALUES (?,?,?,?,?,?,?)",
+                [(k, sire, stallion_id, slug, source, now, expires_at)
+                 for k in dict.fromkeys(keys)])
+
+    def resolve(self, sire: str, resolver: Callable[[str], Resolution],
+                source: str = "") -> Resolution:
+        """
+        Index first; on a miss call ``resolver`` and remember its answer.
+        ``None`` if the resolver raised ``ResolveFailed`` (nothing recorded).
+        """
+        known, resolution = self.lookup(sire)
+        if known:
+            return resolution
+        try:
+            resolution = resolver(sire)
+        except ResolveFailed:
+            return None
+        if not self.read_only:
+            self.record(sire, resolution, source)
+        return resolution
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def add_index_args(ap) -> None:
+    """Register the resolution‑index flags on an argparse parser."""
+    ap.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                    help="SQLite sire -> stallion‑ID index (default %(default)s)")
+    ap.add_argument("--refresh-index", action="store_true",
+                    help="Ignore indexed answers and resolve every sire again")
+
+
+def index_from_args(args) -> StallionIndex:
+    """
+    Build a StallionIndex from the flags registered by ``add_index_args``;
+    read‑only under the crawler's ``--offline``.
+    """
+    return StallionIndex(args.index, refresh=args.refresh_index,
+                         read_only=getattr(args, "offline", False))
@@ -1,11 +1,13 @@
+import argparse
 import re, time, csv, pathlib, requests
-from ratelimit import limits, sleep_and_retry
 from urllib.parse import quote, quote_plus
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Dict, Iterable, Optional
 import pandas as pd
 from tqdm import tqdm
 
+from crawler import Crawler, add_crawler_args, crawler_from_args
+
 # ---------- CONFIG ----------------------------------------------------------
 INPUT  = "stud_fee_incomplete.csv"
 OUTPUT = "stud_fee_complete.csv"
@@ -23,55 +25,92 @@ PAULICK_TEMPLATE = "https://www.google.com/search?q={name_url}+{year}+stud+fee+P
 
 # seconds between calls to the same host
 REQUEST_INTERVAL = 1
+# reruns read unchanged pages from here instead of the network
+CACHE_DIR = "http_cache"
+# latency / retry / cache / parse-time summary written at the end of a run
+METRICS_JSON = "crawl_metrics.json"
+# one BloodHorse lookup per sire (all its breeding years from one fee table)
+# instead of one per input row; False restores the row-by-row lookup
+GROUPED = True
 # ---------------------------------------------------------------------------
 
 
-@sleep_and_retry
-@limits(calls=1, period=REQUEST_INTERVAL)
-def fetch(url):
-    """GET a page with polite throttling."""
-    r = requests.get(url, headers=HEADERS, timeout=15)
+def fetch(url, crawler: Crawler):
+    """GET a page with polite throttling (served from the cache when fresh)."""
+    r = crawler.get(url)
+    if r is None:
+        raise requests.ConnectionError(f"no response for {url}")
     r.raise_for_status()
     return r.text
 
 
-def parse_bloodhorse_fee(html: str, year: int) -> Optional[float]:
-    """Return stud-fee (USD) if the year appears on the page; else None."""
+def parse_bloodhorse_fees(html: str) -> Dict[int, Optional[float]]:
+    """Every year in the page's fee table -> stud-fee (USD), None if private."""
     soup = BeautifulSoup(html, "html.parser")
     fee_table = soup.find("table", class_="stallion__profile-fees")
     if not fee_table:
-        return None
+        return {}
 
+    fees: Dict[int, Optional[float]] = {}
     for row in fee_table.find_all("tr"):
         cols = [c.get_text(strip=True) for c in row.find_all("td")]
         if len(cols) != 2:
             continue
         yr, fee = cols
-        if yr.isdigit() and int(yr) == year:
-            # fees are like '$150,000' or 'Private'
+        if yr.isdigit():
+            # fees are like '$150,000' or 'Private'; first row for a year wins
             fee_num = re.sub(r"[^\d.]", "", fee)
-            return float(fee_num) if fee_num else None
-    return None
+            fees.setdefault(int(yr), float(fee_num) if fee_num else None)
+    return fees
 
 
-def get_fee(sire: str, year: int) -> Optional[float]:
-    """Query BloodHorse first; fall back to Paulick/google snippet."""
+def parse_bloodhorse_fee(html: str, year: int) -> Optional[float]:
+    """Return stud-fee (USD) if the year appears on the page; else None."""
+    return parse_bloodhorse_fees(html).get(year)
+
+
+def bloodhorse_fees(sire: str, crawler: Crawler) -> Dict[int, Optional[float]]:
+    """Every fee year on the sire's BloodHorse page ({} if unavailable)."""
     url = BLOODHORSE_TEMPLATE.format(name_url=quote(sire))
     try:
-        html = fetch(url)
-        fee = parse_bloodhorse_fee(html, year)
-        if fee:
-            return fee
+        html = fetch(url, crawler)
+        with crawler.metrics.parsing("search"):
+            return parse_bloodhorse_fees(html)
     except Exception:
-        pass
+        return {}
+
 
-    # Fallback quick-and-dirty Google snippet parse (best-effort)
+def get_fee(sire: str, year: int, crawler: Crawler) -> Optional[float]:
+    """Query BloodHorse first; fall back to Paulick/google snippet."""
+    fee = bloodhorse_fees(sire, crawler).get(year)
+    if fee:
+        return fee
+    return fallback_fee(sire, year, crawler)
+
+
+def get_fees(sire: str, years: Iterable[int],
+             crawler: Crawler) -> Dict[int, Optional[float]]:
+    """
+    ``get_fee`` for every year in ``years`` with one BloodHorse lookup: the
+    fallback only runs for the years its fee table does not answer.
+    """
+    table = bloodhorse_fees(sire, crawler)
+    fees: Dict[int, Optional[float]] = {}
+    for year in years:
+        fee = table.get(year)
+        fees[year] = fee if fee else fallback_fee(sire, year, crawler)
+    return fees
+
+
+def fallback_fee(sire: str, year: int, crawler: Crawler) -> Optional[float]:
+    """Quick-and-dirty Google snippet parse (best-effort)."""
     url = PAULICK_TEMPLATE.format(
         name_url=quote_plus(sire), year=year
     )
     try:
-        html = fetch(url)
-        snippet_fee = re.search(r"\$(\d[\d,]+)", html)
+        html = fetch(url, crawler)
+        with crawler.metrics.parsing("google"):
+            snippet_fee = re.search(r"\$(\d[\d,]+)", html)
         if snippet_fee:
             return float(snippet_fee.group(1).replace(",", ""))
     except Exception:
@@ -81,18 +120,34 @@ def get_fee(sire: str, year: int) -> Optional[float]:
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Stud-fee gap filler")
+    add_crawler_args(ap)
+    ap.set_defaults(rate=1 / REQUEST_INTERVAL, burst=1, max_in_flight=1,
+                    cache_dir=CACHE_DIR, metrics_json=METRICS_JSON)
+    args = ap.parse_args()
+    crawler = crawler_from_args(args, tries=1, timeout=15, headers=HEADERS)
+
     df = pd.read_csv(INPUT)
     if not {"Sire", "breeding_year"}.issubset(df.columns):
         raise ValueError("CSV must contain 'Sire' and 'breeding_year' columns.")
 
-    fees = []
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="Fetching stud fees"):
-        sire = row["Sire"].strip()
-        year = int(row["breeding_year"])
-        fee = get_fee(sire, year)
-        fees.append(fee)
-
-    df["Fee"] = fees
+    if GROUPED:
+        # request volume scales with unique sires, not rows
+        df["Fee"] = float("nan")
+        by_sire = df.groupby(df["Sire"].str.strip(), sort=False)["breeding_year"]
+        for sire, years in tqdm(by_sire, total=by_sire.ngroups, desc="Fetching stud fees"):
+            fees = get_fees(sire, dict.fromkeys(int(y) for y in years), crawler)
+            df.loc[years.index, "Fee"] = years.astype(int).map(fees).astype(float)
+    else:
+        fees = []
+        for _, row in tqdm(df.iterrows(), total=len(df), desc="Fetching stud fees"):
+            sire = row["Sire"].strip()
+            year = int(row["breeding_year"])
+            fee = get_fee(sire, year, crawler)
+            fees.append(fee)
+        df["Fee"] = fees
+
+    crawler.close()                     # also writes --metrics-json
     df.to_csv(OUTPUT, index=False)
     print(f"✅  Wrote {OUTPUT}")
     missing = df["Fee"].isna().sum()
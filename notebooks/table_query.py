@@ -0,0 +1,111 @@
+"""
+table_query.py
+--------------
+Query‑backed, paginated "Interactive Data Table".
+
+The dashboard used to copy twelve columns of ``all_data`` into a per‑session
+frame, split and re‑``concat`` it to apply the price filter and hand all of
+it to ``st.dataframe``.  ``TableQuery`` instead keeps the table on disk
+(``all_data.parquet`` from ``data_store``) and pushes every filter, the sort
+and the page window down to DuckDB as a single statement:
+
+    SELECT <columns> FROM read_parquet(...)
+    WHERE  Sire IN (?, …)
+      AND  (status <> 'Sold' OR Price BETWEEN ? AND ?)   -- price filters sold lots only
+      AND  sale_year BETWEEN ? AND ?
+      AND  status IN (?, …)
+    ORDER  BY <column> [DESC], file_row_number
+    LIMIT  ? OFFSET ?
+
+plus a ``COUNT(*)`` over the same predicate for the pager.  A session only
+ever holds the visible page.  All user values travel as bound parameters;
+sort columns are checked against ``COLUMNS``.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# CONSTANTS
+# ---------------------------------------------------------------------------
+COLUMNS = ["Sire", "Dam", "Description", "Price", "Sex", "Color", "sale_year",
+           "Session", "Hip", "Purchaser", "PropertyLine1", "status"]
+DEFAULT_PAGE_SIZE = 100
+
+Range = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class TableFilters:
+    """Normalised filter state; empty selections mean "no filter"."""
+    sires: Tuple[str, ...] = ()
+    price_range: Optional[Range] = None
+    year_range: Optional[Range] = None
+    statuses: Tuple[str, ...] = ()
+
+    def where(self) -> Tuple[str, list]:
+        """One ``WHERE`` clause for every active filter, plus its parameters."""
+        clauses: List[str] = []
+        params: list = []
+        if self.sires:
+            clauses.append(f"Sire IN ({', '.join('?' * len(self.sires))})")
+            params += self.sires
+        if self.price_range:
+            clauses.append("(status <> 'Sold' OR Price BETWEEN ? AND ?)")
+            params += self.price_range
+        if self.year_range:
+            clauses.append("sale_year BETWEEN ? AND ?")
+            params += self.year_range
+        if self.statuses:
+            clauses.append(f"status IN ({', '.join('?' * len(self.statuses))})")
+            params += self.statuses
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+@dataclass
+class TableQuery:
+    """Paginated reads over one Parquet file, safe to share between sessions."""
+    path: Path
+    columns: List[str] = field(default_factory=lambda: list(COLUMNS))
+
+    def __post_init__(self):
+        self._con = duckdb.connect()
+        self._local = threading.local()
+        self._source = f"read_parquet('{Path(self.path).as_posix()}', file_row_number = true)"
+
+    def _cursor(self):
+        # DuckDB connections are not thread‑safe; each thread gets its own cursor
+        if not hasattr(self._local, "cur"):
+            self._local.cur = self._con.cursor()
+        return self._local.cur
+
+    def count(self, filters: TableFilters) -> int:
+        where, params = filters.where()
+        return self._cursor().execute(
+            f"SELECT COUNT(*) FROM {self._source}{where}", params).fetchone()[0]
+
+    def page(self, filters: TableFilters, page: int = 0,
+             page_size: int = DEFAULT_PAGE_SIZE, sort_by: Optional[str] = None,
+             descending: bool = False) -> Tuple[pd.DataFrame, int]:
+        """``(rows, total)`` for 0‑based ``page`` of the filtered, sorted table."""
+        if sort_by is not None and sort_by not in self.columns:
+            raise ValueError(f"Unknown sort column: {sort_by!r}")
+        where, params = filters.where()
+        order = "file_row_number"
+        if sort_by:
+            order = f'"{sort_by}" {"DESC" if descending else "ASC"} NULLS LAST, {order}'
+        cols = ", ".join(f'"{c}"' for c in self.columns)
+        rows = self._cursor().execute(
+            f"SELECT {cols} FROM {self._source}{where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [page_size, page * page_size]).df()
+        return rows, self.count(filters)
+
+    def close(self) -> None:
+        self._con.close()